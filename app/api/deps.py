@@ -0,0 +1,52 @@
+from typing import Callable, Iterable, List, Optional, Type
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from app.core.exceptions import ValidationException
+from app.core.fields import FieldSet
+
+MAX_BATCH_IDS = 100
+
+
+def batch_ids(
+    ids: str = Query(..., description=f"Comma-separated IDs (max {MAX_BATCH_IDS})")
+) -> List[str]:
+    """Parse a comma-separated ID list, dropping blanks and duplicates but keeping order."""
+    parsed = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not parsed:
+        raise HTTPException(status_code=400, detail="At least one id is required")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return parsed
+
+
+def field_set(model: Type[BaseModel]) -> Callable[..., Optional[FieldSet]]:
+    """Dependency factory for a `?fields=` sparse fieldset validated against `model`."""
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated fields to return, nested paths with dots (e.g. name,links.patch.small)"
+        )
+    ) -> Optional[FieldSet]:
+        try:
+            return FieldSet.parse(fields, model)
+        except ValidationException as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return dependency
+
+
+def expand_fields(allowed: Iterable[str]) -> Callable[..., List[str]]:
+    """Dependency factory for `?expand=`: comma-separated reference fields, each one of `allowed`."""
+    allowed = tuple(allowed)
+
+    def dependency(
+        expand: Optional[str] = Query(
+            None,
+            description=f"Comma-separated references to embed ({', '.join(allowed)})"
+        )
+    ) -> List[str]:
+        parsed = list(dict.fromkeys(f.strip() for f in (expand or "").split(",") if f.strip()))
+        unknown = [f for f in parsed if f not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Cannot expand '{unknown[0]}'")
+        return parsed
+    return dependency
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.models.core import CoreDetail, CoreListResponse, FleetReuseResponse
+from app.services.cores import get_core_index
+
+router = APIRouter(prefix="/cores", tags=["cores"])
+
+@router.get("/", response_model=CoreListResponse)
+async def get_cores(
+    sort: str = Query("flights", pattern="^(flights|last_flight|turnaround)$", description="flights (most flown), last_flight (most recent) or turnaround (fastest)"),
+    limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    offset: int = Query(0, ge=0, description="Items to skip")
+):
+    """
+    Resumen por core (vuelos, turnaround, aterrizajes) servido desde el índice de cores.
+    """
+    try:
+        index = await get_core_index()
+        return CoreListResponse(
+            docs=index.list(sort, limit, offset),
+            totalDocs=index.count(sort),
+            limit=limit,
+            offset=offset
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/reuse", response_model=FleetReuseResponse)
+async def get_fleet_reuse():
+    """
+    Tendencias de reutilización por año y éxito de aterrizaje por tipo y landpad.
+    """
+    try:
+        index = await get_core_index()
+        return index.fleet
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{core_id}", response_model=CoreDetail)
+async def get_core(core_id: str):
+    try:
+        index = await get_core_index()
+        core = index.get(core_id)
+        if core is None:
+            raise HTTPException(status_code=404, detail="Core not found")
+        return core
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,18 +1,20 @@
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, Query
-from app.services.dashboard import DashboardService
+import asyncio
+import json
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from app.clients.cache import CachedOutput, dashboard_cache, mirror
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+from app.services.dashboard import (
+    SECTIONS, DashboardService, omitted_sections, parse_sections, section_collections
+)
+from app.services.dashboard_stream import broadcaster
 from app.models.dashboard import DashboardResponse
-from app.clients.spacex import SpaceXClient
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
-@router.get(
-    "/",
-    response_model=DashboardResponse,
-    summary="Get dashboard data",
-    description="Retrieve aggregated statistics and metrics for the SpaceX dashboard with optional filters."
-)
-async def get_dashboard_data(
+def dashboard_params(
     rocket_id: Optional[str] = Query(None, description="Filter launches by rocket ID"),
     start_year: Optional[int] = Query(None, description="Filter launches from this year onward", alias="startYear"),
     end_year: Optional[int] = Query(None, description="Filter launches up to this year", alias="endYear"),
@@ -21,23 +23,143 @@ async def get_dashboard_data(
     starlink_page: int = Query(1, description="starlink page number (1-based)"),
     starlink_limit: int = Query(300, description="starlink limit number (1-based)"),
     starlink_version: Optional[str] = Query(None, description="Filter launches by starlink version"),
+    sections: Optional[str] = Query(None, description=f"Comma-separated sections to compute ({', '.join(SECTIONS)}); all by default"),
+) -> Dict[str, Any]:
+    try:
+        parsed_sections = parse_sections(sections)
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Parámetros normalizados: peticiones equivalentes comparten caché y canal
+    return {
+        "rocket_id": (rocket_id or "").strip() or None,
+        "start_year": start_year,
+        "end_year": end_year,
+        "limit": limit,
+        "page": max(page, 1),
+        "starlink_page": max(starlink_page, 1),
+        "starlink_limit": starlink_limit,
+        "starlink_version": (starlink_version or "").strip() or None,
+        "sections": parsed_sections,
+    }
+
+def _query_int(request: Request, name: str, default: Optional[int]) -> Optional[int]:
+    value = request.query_params.get(name)
+    return default if value is None else int(value)
+
+async def serve_stale(request: Request) -> Optional[Response]:
+    """
+    Admission-control fallback: the last encoded dashboard for these
+    parameters, even from an older dataset version, or None if there is none.
+    """
+    if request.url.path.rstrip("/") != f"{settings.API_V1_STR}/dashboard":
+        return None
+    try:
+        params = dashboard_params(
+            rocket_id=request.query_params.get("rocket_id"),
+            start_year=_query_int(request, "startYear", None),
+            end_year=_query_int(request, "endYear", None),
+            limit=_query_int(request, "limit", 100),
+            page=_query_int(request, "page", 1),
+            starlink_page=_query_int(request, "starlink_page", 1),
+            starlink_limit=_query_int(request, "starlink_limit", 300),
+            starlink_version=request.query_params.get("starlink_version"),
+            sections=request.query_params.get("sections"),
+        )
+    except (ValueError, HTTPException):
+        return None
+    entry = dashboard_cache.get_stale(dashboard_cache.key(params))
+    if entry is None:
+        return None
+    response = _cached_response(entry, request)
+    response.headers["X-Cache"] = "stale"
+    return response
 
-    spacex_client: SpaceXClient = Depends()
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip; `gzip;q=0` rejects it, `*` covers it when not listed."""
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            qualities[coding.strip()] = quality
+    quality = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return quality > 0
+
+def _cached_response(entry: CachedOutput, request: Request) -> Response:
+    # Vary en todas las variantes, para que un proxy no sirva gzip a quien no lo pidió
+    headers = {"ETag": entry.etag, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers=headers)
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+@router.get(
+    "/",
+    response_model=DashboardResponse,
+    summary="Get dashboard data",
+    description="Retrieve aggregated statistics and metrics for the SpaceX dashboard with optional filters."
+)
+async def get_dashboard_data(
+    request: Request,
+    params: Dict[str, Any] = Depends(dashboard_params)
 ) -> DashboardResponse:
     """
     Endpoint para obtener la información del dashboard con filtros opcionales.
+    Las respuestas ya serializadas se cachean por parámetros y versión del dataset.
     """
     try:
-        service = DashboardService(spacex_client)
-        return await service.get_dashboard_data(
-            rocket_id=rocket_id,
-            start_year=start_year,
-            end_year=end_year,
-            limit=limit,
-            page=page,
-            starlink_page=starlink_page,
-            starlink_limit=starlink_limit,
-            starlink_version=starlink_version
-        )
+        # Solo las colecciones de las secciones pedidas cuentan para la versión
+        version = await mirror.version(section_collections(params["sections"]))
+        key = dashboard_cache.key(params)
+        entry = dashboard_cache.get(key, version)
+        if entry is None:
+            service = DashboardService()
+            response = await service.get_dashboard_data(**params)
+            body = response.model_dump_json(exclude=omitted_sections(params["sections"]))
+            entry = dashboard_cache.put(key, version, body.encode())
+        return _cached_response(entry, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching dashboard data: {e}")
+
+@router.get(
+    "/stream",
+    summary="Subscribe to dashboard updates",
+    description=(
+        "Server-sent events: a `snapshot` event with the full dashboard, then `delta` "
+        "events carrying only the sections that changed when the underlying data changes."
+    ),
+    response_class=StreamingResponse
+)
+async def stream_dashboard_data(
+    request: Request,
+    params: Dict[str, Any] = Depends(dashboard_params)
+):
+    async def events():
+        async with broadcaster.subscribe(params) as queue:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=settings.DASHBOARD_STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comentario SSE para que proxies no cierren la conexión
+                    yield ": keep-alive\n\n"
+                    continue
+                data = json.dumps({"version": event["version"], "sections": event["sections"]})
+                yield f"event: {event['event']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
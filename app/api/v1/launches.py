@@ -1,99 +1,278 @@
-from fastapi import APIRouter, HTTPException, Query
+import logging
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional
-from app.models.launch import Launch, LaunchResponse
-from app.clients.spacex import SpaceXClient
+from app.api.deps import batch_ids, expand_fields, field_set
+from app.core.fields import FieldSet
+from app.models.batch import BatchItem, BatchResponse
+from app.models.launch import (
+    Launch, LaunchIntervalsResponse, LaunchResponse, LaunchRollupResponse, LaunchSearchHit, LaunchSearchResponse
+)
+from app.clients.spacex import OBJECT_ID, SpaceXClient
+from app.core.exceptions import ValidationException
+from app.core.dates import days_from_civil
+from app.services.launches import get_launch_engine, get_launches_by_ids
+from app.services.rollups import get_launch_rollups
+from app.services.distributions import get_launch_intervals
+from app.services.search import get_launch_search
+from app.services.expand import EXPANDABLE, expand_launches
+from app.services.export import MEDIA_TYPES, export_chunks, get_launch_table, select_columns
 
 router = APIRouter(prefix="/launches", tags=["launches"])
+logger = logging.getLogger(__name__)
 
 @router.get("/", response_model=LaunchResponse)
 async def get_launches(
-    page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
-    sort: str = Query("date_utc", description="Sort field"),
-    order: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's nextCursor"),
+    sort: str = Query("date_unix", pattern="^(date_unix|date_utc|flight_number)$", description="Sort field (date_unix/flight_number)"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order (asc/desc)"),
     upcoming: Optional[bool] = Query(None, description="Filter upcoming launches"),
-    success: Optional[bool] = Query(None, description="Filter by launch success")
+    success: Optional[bool] = Query(None, description="Filter by launch success"),
+    rocket: Optional[str] = Query(None, description="Filter by rocket ID"),
+    launchpad: Optional[str] = Query(None, description="Filter by launchpad ID"),
+    year: Optional[int] = Query(None, description="Filter by launch year (UTC)"),
+    fields: Optional[FieldSet] = Depends(field_set(Launch)),
+    expand: List[str] = Depends(expand_fields(EXPANDABLE))
 ):
-    async with SpaceXClient() as client:
-        try:
-            # Construct query and options
-            query = {}
-            if upcoming is not None:
-                query["upcoming"] = upcoming
-            if success is not None:
-                query["success"] = success
+    try:
+        engine = await get_launch_engine()
+        result = engine.query(
+            filters={
+                "upcoming": upcoming,
+                "success": success,
+                "rocket": rocket,
+                "launchpad": launchpad,
+                "year": year
+            },
+            # date_utc y date_unix ordenan igual; se mantiene por compatibilidad
+            sort="date_unix" if sort == "date_utc" else sort,
+            order=order,
+            limit=limit,
+            cursor=cursor
+        )
+        response = LaunchResponse(
+            totalDocs=result.total,
+            limit=limit,
+            hasNextPage=result.next_cursor is not None,
+            nextCursor=result.next_cursor
+        )
+        if fields is None and not expand:
+            response.docs = result.docs
+            return response
 
-            options = {
-                "page": page,
-                "limit": limit,
-                "sort": {
-                    sort: 1 if order == "asc" else -1
-                },
-                "pagination": True
-            }
-
-            # Get launches from SpaceX API
-            response = await client.get_launches(query=query, options=options)
-            
-            # Handle different response formats
-            if isinstance(response, list):
-                # If response is a list, convert it to LaunchResponse format
-                return LaunchResponse.from_api_response(response)
-            elif isinstance(response, dict):
-                # If response is already paginated, process the docs
-                if "docs" in response:
-                    # Ensure each launch in docs is properly validated
-                    validated_launches = []
-                    for launch_data in response["docs"]:
-                        try:
-                            validated_launch = Launch(**launch_data)
-                            validated_launches.append(validated_launch)
-                        except Exception as e:
-                            print(f"Error validating launch: {str(e)}")
-                            continue
-                    
-                    # Update the docs with validated launches
-                    response["docs"] = validated_launches
-                    return LaunchResponse(**response)
-                else:
-                    # Single launch response
-                    return LaunchResponse(
-                        docs=[Launch(**response)],
-                        totalDocs=1,
-                        limit=1,
-                        totalPages=1,
-                        page=1,
-                        pagingCounter=1
-                    )
-            
-            raise HTTPException(
-                status_code=500,
-                detail="Invalid response format from SpaceX API"
-            )
-            
-        except Exception as e:
-            print(f"Error fetching launches: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error fetching launches: {str(e)}"
-            )
+        # Solo se serializan los campos pedidos
+        content = response.model_dump(mode="json")
+        content["docs"] = [
+            launch.model_dump(mode="json", include=fields.include if fields else None)
+            for launch in result.docs
+        ]
+        await expand_launches(content["docs"], expand)
+        return JSONResponse(content=content)
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error fetching launches: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching launches: {str(e)}"
+        )
 
 @router.get("/upcoming", response_model=List[Launch])
-async def get_upcoming_launches():
+async def get_upcoming_launches(
+    fields: Optional[FieldSet] = Depends(field_set(Launch)),
+    expand: List[str] = Depends(expand_fields(EXPANDABLE))
+):
     async with SpaceXClient() as client:
         try:
+            if fields is not None:
+                # Un ID que no es ObjectId haría fallar la consulta upstream: no existe
+                if not OBJECT_ID.match(launch_id):
+                    raise HTTPException(status_code=404, detail="Launch not found")
+                launches_data = await client.get_launches(
+                    query={"upcoming": True},
+                    options={"select": fields.select, "pagination": False}
+                )
+                content = fields.project(launches_data)
+                return JSONResponse(content=await expand_launches(content, expand))
+
             launches_data = await client.get_upcoming_launches()
-            return [Launch(**launch) for launch in launches_data]
+            launches = [Launch(**launch) for launch in launches_data]
+            if expand:
+                content = [launch.model_dump(mode="json") for launch in launches]
+                return JSONResponse(content=await expand_launches(content, expand))
+            return launches
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
             
+@router.get("/batch", response_model=BatchResponse[Launch])
+async def get_launches_batch(
+    ids: List[str] = Depends(batch_ids),
+    expand: List[str] = Depends(expand_fields(EXPANDABLE))
+):
+    try:
+        found = await get_launches_by_ids(ids)
+        response = BatchResponse[Launch](docs=[
+            BatchItem[Launch](id=launch_id, found=launch_id in found, data=found.get(launch_id))
+            for launch_id in ids
+        ])
+        if not expand:
+            return response
+        content = response.model_dump(mode="json")
+        await expand_launches([item["data"] for item in content["docs"] if item["found"]], expand)
+        return JSONResponse(content=content)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+async def export_launches(
+    format: str = Query("csv", pattern="^(csv|arrow)$", description="csv or arrow (Arrow IPC stream)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns; a nested prefix such as cores selects all its columns")
+):
+    """
+    Dataset completo desde el mirror, aplanado y en chunks; no se construyen
+    modelos por fila.
+    """
+    try:
+        table = await get_launch_table()
+        selected = select_columns(table, columns)
+        chunks = export_chunks(table, format, selected)
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error exporting launches: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error exporting launches: {str(e)}")
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="launches.{format}"'}
+    )
+
+@router.get("/rollups", response_model=LaunchRollupResponse)
+async def get_launch_rollups_endpoint(
+    resolution: str = Query("month", pattern="^(week|month|quarter|year)$", description="Bucket size (week/month/quarter/year)"),
+    start: Optional[date] = Query(None, description="First day of the range (YYYY-MM-DD, UTC)"),
+    end: Optional[date] = Query(None, description="Last day of the range (YYYY-MM-DD, UTC)"),
+    rocket: Optional[str] = Query(None, description="Only count launches of this rocket ID")
+):
+    """
+    Serie de lanzamientos completados (total/exitosos) precalculada por resolución.
+    Los buckets que tocan el rango se devuelven completos.
+    """
+    try:
+        rollups = await get_launch_rollups()
+        buckets = rollups.query(
+            resolution,
+            start_days=days_from_civil(start.year, start.month, start.day) if start else None,
+            end_days=days_from_civil(end.year, end.month, end.day) if end else None,
+            rocket=rocket
+        )
+        return LaunchRollupResponse(resolution=resolution, buckets=buckets)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/intervals", response_model=LaunchIntervalsResponse)
+async def get_launch_intervals_endpoint():
+    """
+    Distribución (p5/p50/p95/p99) de los días entre lanzamientos completados
+    consecutivos de cada cohete, precalculada por versión del dataset.
+    """
+    try:
+        intervals = await get_launch_intervals()
+        return LaunchIntervalsResponse(
+            relative_accuracy=intervals.relative_accuracy,
+            all=intervals.summary,
+            rockets=intervals.summaries
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/search", response_model=LaunchSearchResponse)
+async def search_launches(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in the mission name, details or failure reasons; the last letters of a word may be omitted"),
+    limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    offset: int = Query(0, ge=0, description="Results to skip"),
+    upcoming: Optional[bool] = Query(None, description="Filter upcoming launches"),
+    success: Optional[bool] = Query(None, description="Filter by launch success"),
+    rocket: Optional[str] = Query(None, description="Filter by rocket ID"),
+    year: Optional[int] = Query(None, description="Filter by launch year (UTC)"),
+    fields: Optional[FieldSet] = Depends(field_set(Launch)),
+    expand: List[str] = Depends(expand_fields(EXPANDABLE))
+):
+    """
+    Búsqueda de texto sobre el índice invertido del mirror, ordenada por relevancia.
+    Los filtros se resuelven con los índices del motor de consultas antes de puntuar.
+    """
+    try:
+        engine, index = await get_launch_search()
+        candidates = engine.filter_rows({
+            "upcoming": upcoming,
+            "success": success,
+            "rocket": rocket,
+            "year": year
+        })
+        hits = index.search(q, candidates)
+        response = LaunchSearchResponse(
+            query=q,
+            totalDocs=len(hits),
+            limit=limit,
+            offset=offset,
+            docs=[
+                LaunchSearchHit(score=round(hit.score, 4), launch=engine.launches[hit.row])
+                for hit in hits[offset:offset + limit]
+            ]
+        )
+        if fields is None and not expand:
+            return response
+
+        content = response.model_dump(mode="json", exclude={"docs"})
+        content["docs"] = [
+            {
+                "score": hit.score,
+                "launch": hit.launch.model_dump(mode="json", include=fields.include if fields else None)
+            }
+            for hit in response.docs
+        ]
+        await expand_launches([hit["launch"] for hit in content["docs"]], expand)
+        return JSONResponse(content=content)
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{launch_id}", response_model=Launch)
-async def get_launch(launch_id: str):
+async def get_launch(
+    launch_id: str,
+    fields: Optional[FieldSet] = Depends(field_set(Launch)),
+    expand: List[str] = Depends(expand_fields(EXPANDABLE))
+):
     async with SpaceXClient() as client:
         try:
+            if fields is not None:
+                # Un ID que no es ObjectId haría fallar la consulta upstream: no existe
+                if not OBJECT_ID.match(launch_id):
+                    raise HTTPException(status_code=404, detail="Launch not found")
+                launches_data = await client.get_launches(
+                    query={"_id": launch_id},
+                    options={"select": fields.select, "pagination": False}
+                )
+                if not launches_data:
+                    raise HTTPException(status_code=404, detail="Launch not found")
+                content = fields.project(launches_data[0])
+                await expand_launches([content], expand)
+                return JSONResponse(content=content)
+
             launch_data = await client.get_launch(launch_id)
             if not launch_data:
                 raise HTTPException(status_code=404, detail="Launch not found")
-            return Launch(**launch_data)
+            launch = Launch(**launch_data)
+            if expand:
+                content = launch.model_dump(mode="json")
+                await expand_launches([content], expand)
+                return JSONResponse(content=content)
+            return launch
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,26 +1,65 @@
-from fastapi import  APIRouter, HTTPException 
-from typing import List 
+from fastapi import  APIRouter, Depends, HTTPException 
+from fastapi.responses import JSONResponse
+from typing import List, Optional
+from app.api.deps import batch_ids, field_set
+from app.core.fields import FieldSet
+from app.models.batch import BatchItem, BatchResponse
 from app.models.rocket import Rocket
-from app.clients.spacex import SpaceXClient
+from app.clients.spacex import OBJECT_ID, SpaceXClient
+from app.services.rockets import get_rockets_by_ids
 
 router = APIRouter(prefix="/rockets", tags=["rockets"])
 
 @router.get("/", response_model=List[Rocket])
-async def get_rockets():
+async def get_rockets(fields: Optional[FieldSet] = Depends(field_set(Rocket))):
     async with SpaceXClient() as client:
         try:
+            if fields is not None:
+                # Un ID que no es ObjectId haría fallar la consulta upstream: no existe
+                if not OBJECT_ID.match(rocket_id):
+                    raise HTTPException(status_code=404, detail="Rocket not found")
+                rockets = await client.query_rockets(
+                    options={"select": fields.select, "pagination": False}
+                )
+                return JSONResponse(content=fields.project(rockets))
+
             rockets = await client.get_rockets()
             return rockets
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/batch", response_model=BatchResponse[Rocket])
+async def get_rockets_batch(ids: List[str] = Depends(batch_ids)):
+    try:
+        found = await get_rockets_by_ids(ids)
+        return BatchResponse[Rocket](docs=[
+            BatchItem[Rocket](id=rocket_id, found=rocket_id in found, data=found.get(rocket_id))
+            for rocket_id in ids
+        ])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{rocket_id}", response_model=Rocket)
-async def get_rocket(rocket_id: str):
+async def get_rocket(rocket_id: str, fields: Optional[FieldSet] = Depends(field_set(Rocket))):
     async with SpaceXClient() as client: 
         try:
+            if fields is not None:
+                # Un ID que no es ObjectId haría fallar la consulta upstream: no existe
+                if not OBJECT_ID.match(rocket_id):
+                    raise HTTPException(status_code=404, detail="Rocket not found")
+                rockets = await client.query_rockets(
+                    query={"_id": rocket_id},
+                    options={"select": fields.select, "pagination": False}
+                )
+                if not rockets:
+                    raise HTTPException(status_code=404, detail="Rocket not found")
+                return JSONResponse(content=fields.project(rockets[0]))
+
             rocket = await client.get_rocket(rocket_id)
             return rocket
+        except HTTPException:
+            raise
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,24 +1,351 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from app.models.startlink import StarlinkResponse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.api.deps import batch_ids, field_set
+from app.core.fields import FieldSet
+from app.models.startlink import (
+    ConjunctionResponse, DecayHistoryResponse, ElementSetAtResponse, EphemerisResponse, PassesResponse,
+    StarlinkDistributionsResponse, StarlinkResponse, StarlinkSatellite, StarlinkShellsResponse
+)
 from app.clients.spacex import SpaceXClient
+from app.core.config import settings
+from app.core.dates import unix_seconds
+from app.core.exceptions import ValidationException
+from app.core.log import ErrorBatch
+from app.core.offload import offload
+from app.services.conjunctions import screen_conjunctions
+from app.services.distributions import get_starlink_distributions
+from app.services.export import MEDIA_TYPES, export_chunks, get_starlink_table, select_columns
+from app.services.ephemeris import get_ephemeris_cache, positions_at
+from app.services.history import decay_history, element_set_at, get_tle_history
+from app.services.orbits import ALTITUDE_STEPS_KM, INCLINATION_STEPS_DEG, get_starlink_shells
+from app.services.passes import predict_passes
+from app.services.propagation import get_constellation
+from app.services.starlink import encode_satellites
 
 router = APIRouter(prefix="/starlink", tags=["starlink"])
+logger = logging.getLogger(__name__)
+
+# Fin del stream; None no sirve porque upstream puede mandar un null dentro de docs
+_END = object()
 
 @router.get("/", response_model=StarlinkResponse)
 async def get_starlink(
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(100, ge=1, le=1000, description="Items per page")
+    limit: int = Query(100, ge=1, le=1000, description="Items per page"),
+    fields: Optional[FieldSet] = Depends(field_set(StarlinkSatellite))
 ):
-    async with SpaceXClient() as client:
+    """
+    Los satélites se validan y reenvían en lotes de OFFLOAD_BATCH_ITEMS a
+    medida que llegan de la API, sin armar la página completa en memoria.
+    """
+    client = SpaceXClient()
+    options = {
+        "page": page,
+        "limit": limit,
+        "sort": {"spaceTrack.CREATION_DATE": "desc"}
+    }
+    if fields is not None:
+        # La proyección se hace upstream; no se descargan los campos no pedidos
+        options["select"] = fields.select
+
+    meta: Dict[str, Any] = {}
+    satellites = client.iter_starlink_satellites(options=options, meta=meta)
+
+    # Esperar el primer satélite antes de responder, así los errores de la API siguen siendo un 500
+    try:
+        first = await anext(satellites, _END)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Un solo log por página con los satélites que no validaron
+    errors = ErrorBatch(logger, "starlink_validation")
+
+    async def encode(batch: List[Dict[str, Any]]) -> List[bytes]:
+        if fields is not None:
+            return [json.dumps(fields.project(sat)).encode() for sat in batch]
+        # Validar lotes grandes fuera del event loop
+        encoded, failed = await offload(encode_satellites, batch, size=len(batch))
+        for kind, sat_id in failed:
+            errors.add_kind(kind, sat_id)
+        return encoded
+
+    async def body() -> AsyncIterator[bytes]:
         try:
-            options = {
-                "page": page,
-                "limit": limit,
-                "sort": {"spaceTrack.CREATION_DATE": "desc"}
-            }
-            
-            starlink = await client.get_starlink_satellites(options=options)
-            return starlink
+            yield b'{"docs":['
+            separator = b""
+            batch: List[Dict[str, Any]] = []
+            sat = first
+            while sat is not _END:
+                if isinstance(sat, dict):
+                    batch.append(sat)
+                else:
+                    errors.add(TypeError("satellite is not a JSON object"))
+                sat = await anext(satellites, _END)
+                if batch and (sat is _END or len(batch) >= settings.OFFLOAD_BATCH_ITEMS):
+                    encoded = await encode(batch)
+                    batch = []
+                    if encoded:
+                        yield separator + b",".join(encoded)
+                        separator = b","
+            yield b"]"
+            for key, value in meta.items():
+                yield f",{json.dumps(key)}:{json.dumps(value)}".encode()
+            yield b"}"
         except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+            # Con el status ya enviado solo queda cortar el cuerpo
+            logger.error("Error streaming Starlink satellites: %s", e)
+            raise
+        finally:
+            errors.flush()
+            await satellites.aclose()
+
+    return StreamingResponse(body(), media_type="application/json")
+
+@router.get("/export")
+async def export_starlink(
+    format: str = Query("csv", pattern="^(csv|arrow)$", description="csv or arrow (Arrow IPC stream)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns; a nested prefix such as spaceTrack selects all its columns")
+):
+    """
+    Dataset completo desde el mirror, aplanado y en chunks; no se construyen
+    modelos por fila.
+    """
+    try:
+        table = await get_starlink_table()
+        selected = select_columns(table, columns)
+        chunks = export_chunks(table, format, selected)
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error exporting Starlink satellites: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error exporting Starlink satellites: {str(e)}")
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="starlink.{format}"'}
+    )
+
+@router.get(
+    "/distributions",
+    response_model=StarlinkDistributionsResponse,
+    summary="Orbital distributions",
+    description=(
+        "p5/p50/p95/p99 of height, velocity and period per version or per shell, "
+        "from quantile sketches maintained per dataset version."
+    )
+)
+async def get_starlink_distributions_endpoint(
+    group_by: str = Query("version", pattern="^(version|shell)$", description="Group by version or shell"),
+    altitude_step_km: float = Query(
+        10, description=f"Width of the altitude bands (km, shell grouping): {', '.join(f'{s:g}' for s in ALTITUDE_STEPS_KM)}"
+    ),
+    inclination_step_deg: float = Query(
+        1, description=f"Width of the inclination bands (degrees, shell grouping): {', '.join(f'{s:g}' for s in INCLINATION_STEPS_DEG)}"
+    )
+):
+    try:
+        distributions = await get_starlink_distributions()
+        return StarlinkDistributionsResponse(
+            group_by=group_by,
+            relative_accuracy=distributions.relative_accuracy,
+            groups=distributions.summaries(group_by, altitude_step_km, inclination_step_deg)
+        )
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get(
+    "/shells",
+    response_model=StarlinkShellsResponse,
+    summary="Orbital shells",
+    description=(
+        "Clusters the constellation into shells by mean altitude and inclination "
+        "bands, with per-shell counts, decay status and element distributions."
+    )
+)
+async def get_starlink_shells_endpoint(
+    altitude_step_km: float = Query(
+        10, description=f"Width of the altitude bands (km): {', '.join(f'{s:g}' for s in ALTITUDE_STEPS_KM)}"
+    ),
+    inclination_step_deg: float = Query(
+        1, description=f"Width of the inclination bands (degrees): {', '.join(f'{s:g}' for s in INCLINATION_STEPS_DEG)}"
+    ),
+    include_decayed: bool = Query(False, description="Include satellites already decayed"),
+    min_satellites: int = Query(1, ge=1, description="Hide shells with fewer satellites")
+):
+    try:
+        shells = await get_starlink_shells(
+            altitude_step_km=altitude_step_km,
+            inclination_step_deg=inclination_step_deg,
+            include_decayed=include_decayed,
+            min_satellites=min_satellites
+        )
+        return StarlinkShellsResponse(
+            total_satellites=sum(shell.satellites for shell in shells),
+            altitude_step_km=altitude_step_km,
+            inclination_step_deg=inclination_step_deg,
+            shells=shells
+        )
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get(
+    "/conjunctions",
+    response_model=ConjunctionResponse,
+    summary="Close-approach screening",
+    description=(
+        "Propagates the active constellation from its TLEs over a time window and "
+        "returns pairs that come closer than `threshold_km`, ranked by miss distance."
+    )
+)
+async def get_starlink_conjunctions(
+    start: Optional[datetime] = Query(None, description="Window start (ISO 8601, UTC unless a zone is given; defaults to now)"),
+    hours: float = Query(1, gt=0, le=24, description="Window length in hours"),
+    step_seconds: int = Query(20, ge=5, le=120, description="Screening time step"),
+    threshold_km: float = Query(5, gt=0, le=50, description="Report approaches closer than this"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of conjunctions")
+):
+    start_unix = unix_seconds(start) if start else time.time()
+    duration = hours * 3600
+    try:
+        constellation = await get_constellation()
+        # Cálculo pesado fuera del event loop
+        conjunctions, refined = await asyncio.to_thread(
+            screen_conjunctions, constellation, start_unix, duration, step_seconds, threshold_km, limit
+        )
+        return ConjunctionResponse(
+            start_unix=int(start_unix),
+            end_unix=int(start_unix + duration),
+            step_seconds=step_seconds,
+            threshold_km=threshold_km,
+            satellites_screened=len(constellation),
+            encounters_refined=refined,
+            conjunctions=conjunctions
+        )
+    except ValidationException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get(
+    "/passes",
+    response_model=PassesResponse,
+    summary="Visible passes for an observer",
+    description=(
+        "Starlink satellites that rise above `min_elevation` for an observer in the "
+        "next `hours`, with rise, culmination and set times and azimuths."
+    )
+)
+async def get_starlink_passes(
+    lat: float = Query(..., ge=-90, le=90, description="Observer latitude (degrees)"),
+    lon: float = Query(..., ge=-180, le=180, description="Observer longitude (degrees)"),
+    alt_km: float = Query(0, ge=-0.5, le=10, description="Observer altitude above the ellipsoid (km)"),
+    hours: float = Query(6, gt=0, le=settings.PASSES_MAX_HOURS, description="Look-ahead window in hours"),
+    start: Optional[datetime] = Query(None, description="Window start (ISO 8601, UTC unless a zone is given; defaults to now)"),
+    min_elevation: float = Query(10, ge=0, le=89, description="Minimum elevation (degrees)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of passes")
+):
+    """
+    Las efemérides se cachean por bloques horarios en coordenadas terrestres,
+    así que observadores cercanos y consultas repetidas no vuelven a propagar.
+    """
+    start_unix = unix_seconds(start) if start else time.time()
+    end_unix = start_unix + hours * 3600
+    try:
+        ephemeris = await get_ephemeris_cache()
+        passes, visible = await asyncio.to_thread(
+            predict_passes, ephemeris, lat, lon, alt_km, start_unix, end_unix, min_elevation, limit
+        )
+        return PassesResponse(
+            lat=lat,
+            lon=lon,
+            start_unix=int(start_unix),
+            end_unix=int(end_unix),
+            min_elevation=min_elevation,
+            satellites_visible=visible,
+            passes=passes
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get(
+    "/positions",
+    response_model=EphemerisResponse,
+    summary="Satellite positions at any time",
+    description=(
+        "Earth-fixed position, latitude, longitude and height of the given satellites "
+        "at `time`, interpolated from the precomputed ephemeris when available."
+    )
+)
+async def get_starlink_positions(
+    ids: List[str] = Depends(batch_ids),
+    at: Optional[datetime] = Query(None, alias="time", description="Timestamp (ISO 8601, UTC unless a zone is given; defaults to now)")
+):
+    time_unix = unix_seconds(at) if at else time.time()
+    try:
+        ephemeris = await get_ephemeris_cache()
+        return await asyncio.to_thread(positions_at, ephemeris, ids, time_unix)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get(
+    "/history/{norad_id}",
+    response_model=ElementSetAtResponse,
+    summary="Element set valid at a past time",
+    description=(
+        "The element set in force at `time` (latest epoch not after it) from the "
+        "append-only history of every sync, and the SGP4 position it gives at `time`."
+    )
+)
+async def get_starlink_element_set_at(
+    norad_id: int,
+    at: Optional[datetime] = Query(None, alias="time", description="Timestamp (ISO 8601, UTC unless a zone is given; defaults to now)")
+):
+    time_unix = unix_seconds(at) if at else time.time()
+    try:
+        history = await get_tle_history()
+        result = element_set_at(history, norad_id, time_unix)
+        if result is None:
+            raise HTTPException(status_code=404, detail="No element set recorded for this satellite before that time")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get(
+    "/history/{norad_id}/decay",
+    response_model=DecayHistoryResponse,
+    summary="Altitude decay history",
+    description="Mean, perigee and apogee altitude of every recorded element set, with the decay trend."
+)
+async def get_starlink_decay_history(
+    norad_id: int,
+    start: Optional[datetime] = Query(None, description="First epoch to include (ISO 8601, UTC unless a zone is given)"),
+    end: Optional[datetime] = Query(None, description="Last epoch to include (ISO 8601, UTC unless a zone is given)"),
+    max_points: int = Query(500, ge=2, le=5000, description="Points returned; longer histories are thinned evenly")
+):
+    try:
+        history = await get_tle_history()
+        if not history.rows(norad_id):
+            raise HTTPException(status_code=404, detail="No element sets recorded for this satellite")
+        return decay_history(
+            history,
+            norad_id,
+            start_unix=unix_seconds(start) if start else None,
+            end_unix=unix_seconds(end) if end else None,
+            max_points=max_points
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,300 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.clients.spacex import SpaceXClient
+from app.clients.starlink_store import StarlinkStore
+from app.core.config import settings
+from app.core.exceptions import CacheException
+from app.core.log import ErrorBatch
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Snapshot:
+    """
+    A full copy of one upstream collection, as fetched at `fetched_at`.
+    `docs` is the list of raw documents, or the compact store the loader
+    built instead (see StarlinkStore).
+    """
+    docs: Any
+    version: int
+    fetched_at: float
+    checksum: str
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def derive(self, key: str, builder: Callable[["Snapshot"], Any]) -> Any:
+        """
+        Build a structure (index, aggregate...) from this snapshot once and
+        reuse it until the snapshot is replaced by a newer version.
+        """
+        if key not in self._derived:
+            self._derived[key] = builder(self)
+        return self._derived[key]
+
+    def derived(self, key: str) -> Any:
+        """What derive() already built under `key`, or None (for builders that must be awaited)."""
+        return self._derived.get(key)
+
+    def by_id(self) -> Dict[str, Dict[str, Any]]:
+        """Lookup table id -> document for this snapshot."""
+        return self.derive("by_id", lambda s: {doc.get("id"): doc for doc in s.docs})
+
+
+def _checksum(docs: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(docs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class MirroredCollection:
+    """
+    Keeps a local copy of an upstream collection and refreshes it at most
+    once per TTL. The version only changes when the content does.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int
+    ):
+        self.name = name
+        self.ttl = ttl
+        self._loader = loader
+        self._refresh_hooks: List[Callable[[Snapshot], Awaitable[None]]] = []
+        self._snapshot: Optional[Snapshot] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        """Current snapshot without triggering a refresh (may be None or stale)."""
+        return self._snapshot
+
+    def on_refresh(self, hook: Callable[[Snapshot], Awaitable[None]]) -> None:
+        """Run `hook` with every new snapshot version, before it is returned. Hook errors are logged."""
+        if hook not in self._refresh_hooks:
+            self._refresh_hooks.append(hook)
+
+    def is_fresh(self) -> bool:
+        return self._snapshot is not None and self._snapshot.age < self.ttl
+
+    def status(self) -> Dict[str, Any]:
+        if self._snapshot is None:
+            return {"warm": False}
+        return {
+            "warm": True,
+            "version": self._snapshot.version,
+            "age_seconds": round(self._snapshot.age, 1),
+            "fresh": self.is_fresh()
+        }
+
+    async def get_or_none(self) -> Optional[Snapshot]:
+        """Like get(), but returns None instead of raising when nothing can be loaded."""
+        try:
+            return await self.get()
+        except CacheException as e:
+            logger.warning("%s mirror unavailable: %s", self.name, e)
+            return None
+
+    async def get(self) -> Snapshot:
+        if self.is_fresh():
+            return self._snapshot
+
+        async with self._lock:
+            # Otro request pudo refrescar mientras esperábamos el lock
+            if self.is_fresh():
+                return self._snapshot
+
+            try:
+                docs = await self._loader()
+            except Exception as e:
+                if self._snapshot is not None:
+                    # Mejor servir datos viejos que fallar
+                    logger.warning("Error refreshing %s mirror, serving stale copy: %s", self.name, e)
+                    return self._snapshot
+                raise CacheException(f"Error loading {self.name} mirror: {e}")
+
+            # Los stores compactos calculan su hash mientras se llenan
+            checksum = getattr(docs, "checksum", None) or _checksum(docs)
+            if self._snapshot is not None and self._snapshot.checksum == checksum:
+                self._snapshot.fetched_at = time.time()
+                return self._snapshot
+
+            self._version += 1
+            self._snapshot = Snapshot(
+                docs=docs,
+                version=self._version,
+                fetched_at=time.time(),
+                checksum=checksum
+            )
+            for hook in self._refresh_hooks:
+                try:
+                    await hook(self._snapshot)
+                except Exception as e:
+                    logger.error("Error in %s refresh hook %s: %s", self.name, getattr(hook, "__name__", hook), e)
+            return self._snapshot
+
+
+async def _load_launches() -> List[Dict[str, Any]]:
+    async with SpaceXClient() as client:
+        return await client.get_launches(options={"pagination": False})
+
+
+async def _load_rockets() -> List[Dict[str, Any]]:
+    async with SpaceXClient() as client:
+        return await client.get_rockets()
+
+
+async def _load_starlink() -> StarlinkStore:
+    # La constelación se parsea en streaming y cada satélite va directo al store compacto
+    store = StarlinkStore()
+    errors = ErrorBatch(logger, "starlink_validation")
+    async with SpaceXClient() as client:
+        async for sat in client.iter_starlink_satellites(options={"pagination": False}):
+            if isinstance(sat, dict):
+                store.append(sat, errors)
+    errors.flush()
+    return store
+
+
+class DatasetMirror:
+    """Local copies of the upstream collections served by the API."""
+
+    def __init__(self, ttl: int = settings.MIRROR_TTL_SECONDS):
+        self.launches = MirroredCollection("launches", _load_launches, ttl)
+        self.rockets = MirroredCollection("rockets", _load_rockets, ttl)
+        self.starlink = MirroredCollection("starlink", _load_starlink, ttl)
+
+    @property
+    def collections(self) -> List[MirroredCollection]:
+        return [self.launches, self.rockets, self.starlink]
+
+    async def warm(self) -> None:
+        """Load (or refresh) every collection; failures are logged, not raised."""
+        for collection in self.collections:
+            await collection.get_or_none()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {collection.name: collection.status() for collection in self.collections}
+
+    async def version(self, names: Optional[Iterable[str]] = None) -> str:
+        """
+        Dataset version: changes whenever any mirrored collection changes.
+        Refreshes the collections whose TTL expired. With `names`, only those
+        collections are considered (and fetched).
+        """
+        parts = []
+        for collection in self.collections:
+            if names is not None and collection.name not in names:
+                continue
+            snapshot = await collection.get()
+            parts.append(f"{collection.name}:{snapshot.version}")
+        return ",".join(parts)
+
+
+mirror = DatasetMirror()
+
+
+# Colecciones que los lanzamientos referencian por ID (rockets ya está en el mirror)
+REFERENCE_COLLECTIONS = ("launchpads", "payloads", "crew", "ships", "capsules")
+
+
+def _collection_loader(name: str) -> Callable[[], Awaitable[List[Dict[str, Any]]]]:
+    async def load() -> List[Dict[str, Any]]:
+        async with SpaceXClient() as client:
+            return await client.get_collection(name)
+    return load
+
+
+class ReferenceTables:
+    """
+    Lookup tables for the small collections launches point to. Each one is
+    loaded the first time it is needed and refreshed with the mirror TTL;
+    they are not part of the dataset version.
+    """
+
+    def __init__(self, ttl: int = settings.MIRROR_TTL_SECONDS):
+        self.tables = {
+            name: MirroredCollection(name, _collection_loader(name), ttl)
+            for name in REFERENCE_COLLECTIONS
+        }
+
+    def __getitem__(self, name: str) -> MirroredCollection:
+        return self.tables[name]
+
+
+references = ReferenceTables()
+
+
+@dataclass
+class CachedOutput:
+    """A fully encoded response body, plus its pre-compressed variant."""
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    version: str
+    created_at: float
+
+
+class OutputCache:
+    """
+    LRU cache of encoded response bodies keyed by normalized request
+    parameters. Every entry belongs to the version of the collections it was
+    computed from (which depends on the parameters, e.g. ?sections=) and is
+    only served for that version; outdated entries are overwritten or age
+    out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = settings.OUTPUT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedOutput]" = OrderedDict()
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> str:
+        return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, key: str, version: str) -> Optional[CachedOutput]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_stale(self, key: str) -> Optional[CachedOutput]:
+        """
+        Latest entry for `key` even if it belongs to an older dataset
+        version. Used when shedding load.
+        """
+        return self._entries.get(key)
+
+    def put(self, key: str, version: str, body: bytes) -> CachedOutput:
+        entry = CachedOutput(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=6),
+            etag=f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"',
+            version=version,
+            created_at=time.time()
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+dashboard_cache = OutputCache()
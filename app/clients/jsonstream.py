@@ -0,0 +1,139 @@
+import codecs
+import json
+import re
+from typing import Any, Dict, List
+
+from app.core.exceptions import SpaceXAPIException
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Un documento individual nunca debería acercarse a esto; si pasa, el cuerpo está roto
+MAX_PENDING_CHARS = 8 * 1024 * 1024
+
+
+class DocsStreamParser:
+    """
+    Incremental parser for paginated upstream bodies (`{"docs": [...], ...}`)
+    or bare JSON arrays.
+
+    Bytes are fed as they arrive and every completed element of `docs` is
+    returned right away, so only the element being received is buffered
+    instead of the whole page. The remaining top-level keys (totalDocs,
+    page...) are collected in `meta`.
+    """
+
+    def __init__(self):
+        self.meta: Dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+        self._top_array = False
+
+    def _skip_ws(self) -> bool:
+        """Advance past whitespace; False if the buffer ran out."""
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+        return self._pos < len(self._buffer)
+
+    def _value(self, final: bool) -> Any:
+        """
+        Decode the value at the cursor. Raises IndexError when it may still be
+        incomplete (a number or literal is only complete once followed by
+        another character).
+        """
+        delimited = self._buffer[self._pos] in '{["'
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            raise IndexError
+        if end >= len(self._buffer) and not (final or delimited):
+            raise IndexError
+        self._pos = end
+        return value
+
+    def _expect(self, char: str) -> None:
+        if self._buffer[self._pos] != char:
+            raise SpaceXAPIException(
+                f"Unexpected '{self._buffer[self._pos]}' in upstream response, expected '{char}'"
+            )
+        self._pos += 1
+
+    def _parse(self, final: bool) -> List[Any]:
+        docs = []
+        try:
+            while self._skip_ws():
+                char = self._buffer[self._pos]
+
+                if self._state == "start":
+                    if char == "[":
+                        self._top_array = True
+                        self._state = "items"
+                    else:
+                        self._expect("{")
+                        self._state = "key"
+                        continue
+                    self._pos += 1
+
+                elif self._state == "key":
+                    if char == ",":
+                        self._pos += 1
+                    elif char == "}":
+                        self._pos += 1
+                        self._state = "done"
+                    else:
+                        self._key = self._value(final)
+                        self._state = "colon"
+
+                elif self._state == "colon":
+                    self._expect(":")
+                    self._state = "value"
+
+                elif self._state == "value":
+                    if self._key == "docs":
+                        self._expect("[")
+                        self._state = "items"
+                    else:
+                        self.meta[self._key] = self._value(final)
+                        self._state = "key"
+
+                elif self._state == "items":
+                    if char == ",":
+                        self._pos += 1
+                    elif char == "]":
+                        self._pos += 1
+                        self._state = "done" if self._top_array else "key"
+                    else:
+                        docs.append(self._value(final))
+
+                else:
+                    raise SpaceXAPIException("Unexpected data after the end of the upstream response")
+        except IndexError:
+            # Falta el resto del valor actual; se retoma con el próximo chunk
+            pass
+
+        # Descartar lo ya consumido para que el buffer no crezca con la página
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        if len(self._buffer) > MAX_PENDING_CHARS:
+            raise SpaceXAPIException("Upstream document too large to stream")
+        return docs
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Feed raw bytes; returns the documents completed by this chunk."""
+        self._buffer += self._text.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """Signal the end of the body; returns any last document."""
+        self._buffer += self._text.decode(b"", final=True)
+        try:
+            docs = self._parse(final=True)
+        except json.JSONDecodeError as e:
+            raise SpaceXAPIException(f"Malformed upstream response: {e}")
+        if self._state != "done":
+            raise SpaceXAPIException("Truncated upstream response")
+        return docs
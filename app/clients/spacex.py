@@ -1,20 +1,111 @@
-from httpx import AsyncClient
-from typing import Optional, List, Dict, Any 
+import re
+import time
+from httpx import AsyncClient, HTTPStatusError
+from typing import Optional, List, Dict, Any, AsyncIterator
+from app.clients.jsonstream import DocsStreamParser
 from app.core.config import settings
 from app.core.exceptions import SpaceXAPIException 
+from app.core.subsystems import subsystems
+
+# Los IDs de la API son ObjectIds de Mongo; otro valor en un `$in` hace fallar toda la consulta
+OBJECT_ID = re.compile(r"^[0-9a-f]{24}$")
+
+class CircuitBreaker:
+    """
+    Stops calling the SpaceX API after `threshold` consecutive failures.
+    Once `reset_seconds` have passed requests go through again (half-open):
+    a success closes the breaker, another failure reopens it.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+def _is_upstream_failure(error: Exception) -> bool:
+    # Un 4xx es un error del request, no de la API
+    if isinstance(error, HTTPStatusError):
+        return error.response.status_code >= 500
+    return True
+
+breaker = CircuitBreaker(settings.BREAKER_FAILURE_THRESHOLD, settings.BREAKER_RESET_SECONDS)
 
 class SpaceXClient:
-    def __init__(self):
+    def __init__(self, http: Optional[AsyncClient] = None):
         self.base_url = settings.SPACEX_API_URL
-        self.client = AsyncClient(base_url=self.base_url)
+        # Por defecto se comparte el pool de conexiones de la app
+        self.client = http or subsystems.http.get()
+
+    def _check_breaker(self) -> None:
+        if not breaker.allow():
+            raise SpaceXAPIException("SpaceX API circuit breaker is open")
 
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> Any:
+        self._check_breaker()
         try:
             response = await self.client.request(method, endpoint, **kwargs)
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+        except Exception as e:
+            if _is_upstream_failure(e):
+                breaker.record_failure()
+            raise SpaceXAPIException(f"Error making request to SpaceX API: {e}")
+        breaker.record_success()
+        return data
+
+    async def _stream_docs(
+        self,
+        method: str,
+        endpoint: str,
+        meta: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield the items of a paginated response's 'docs' array as they are
+        parsed from the byte stream, instead of buffering the whole body.
+        Pagination fields (totalDocs, page...) are stored in `meta` once the
+        body is complete.
+        """
+        self._check_breaker()
+        parser = DocsStreamParser()
+        try:
+            async with self.client.stream(method, endpoint, **kwargs) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    for doc in parser.feed(chunk):
+                        yield doc
+            for doc in parser.close():
+                yield doc
+        except SpaceXAPIException:
+            raise
         except Exception as e:
+            if _is_upstream_failure(e):
+                breaker.record_failure()
             raise SpaceXAPIException(f"Error making request to SpaceX API: {e}")
+        breaker.record_success()
+        if meta is not None:
+            meta.update(parser.meta)
     #Rockets
     async def get_rockets(self) -> List[Dict]:
         """Get all rockets""" 
@@ -23,6 +114,39 @@ class SpaceXClient:
     async def get_rocket(self, rocket_id: str) -> Dict:
         """Get a specific rocket by ID"""
         return await self._make_request("GET", f"/rockets/{rocket_id}")
+
+    async def query_rockets(self, query: Optional[Dict] = None, options: Optional[Dict] = None) -> List[Dict]:
+        """
+        Query rockets (e.g. {"_id": {"$in": [...]}})
+        Returns the 'docs' array from the paginated response
+        """
+        payload = {
+            "query": query or {},
+            "options": options or {}
+        }
+        response = await self._make_request("POST", "/rockets/query", json=payload)
+        return response.get("docs", [])
+    #Reference collections (launchpads, payloads, crew, ships, capsules)
+    async def get_collection(self, collection: str) -> List[Dict]:
+        """Get every document of a collection"""
+        return await self._make_request("GET", f"/{collection}")
+
+    async def query_collection(
+        self,
+        collection: str,
+        query: Optional[Dict] = None,
+        options: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Query any collection (e.g. {"_id": {"$in": [...]}})
+        Returns the 'docs' array from the paginated response
+        """
+        payload = {
+            "query": query or {},
+            "options": options or {}
+        }
+        response = await self._make_request("POST", f"/{collection}/query", json=payload)
+        return response.get("docs", [])
     #Launches 
     async def get_launches(self, query: Optional[Dict] = None, options: Optional[Dict] = None) -> List[Dict]:
         """
@@ -59,9 +183,29 @@ class SpaceXClient:
         }
         return await self._make_request("POST", "/starlink/query", json=payload)
 
+    async def iter_starlink_satellites(
+        self,
+        query: Optional[Dict] = None,
+        options: Optional[Dict] = None,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream Starlink satellites one at a time as the response arrives.
+        Pagination fields are written to `meta` when the stream ends.
+        """
+        payload = {
+            "query": query or {},
+            "options": options or {
+                "limit": 100,
+                "page": 1
+            }
+        }
+        async for doc in self._stream_docs("POST", "/starlink/query", meta=meta, json=payload):
+            yield doc
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        # El pool es compartido; se cierra al apagar la app (subsystems.shutdown)
+        pass
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from app.core.log import ErrorBatch
+from app.models.startlink import SpaceTrack, StarlinkSatellite
+
+logger = logging.getLogger(__name__)
+
+# Elementos numéricos del spaceTrack: un array tipado por columna
+SPACETRACK_FLOATS = (
+    "MEAN_MOTION", "ECCENTRICITY", "INCLINATION", "RA_OF_ASC_NODE",
+    "ARG_OF_PERICENTER", "MEAN_ANOMALY", "BSTAR", "MEAN_MOTION_DOT",
+    "MEAN_MOTION_DDOT", "SEMIMAJOR_AXIS", "PERIOD", "APOAPSIS", "PERIAPSIS",
+)
+SPACETRACK_INTS = (
+    "EPHEMERIS_TYPE", "NORAD_CAT_ID", "ELEMENT_SET_NO", "REV_AT_EPOCH",
+    "DECAYED", "FILE", "GP_ID",
+)
+# Strings con pocos valores distintos en toda la constelación: diccionario + códigos
+SPACETRACK_CATEGORIES = (
+    "CCSDS_OMM_VERS", "COMMENT", "CREATION_DATE", "ORIGINATOR", "CENTER_NAME",
+    "REF_FRAME", "TIME_SYSTEM", "MEAN_ELEMENT_THEORY", "CLASSIFICATION_TYPE",
+    "OBJECT_TYPE", "RCS_SIZE", "COUNTRY_CODE", "LAUNCH_DATE", "SITE", "DECAY_DATE",
+)
+# Strings únicos por satélite: bytes contiguos + offsets
+SPACETRACK_TEXTS = (
+    "OBJECT_NAME", "OBJECT_ID", "EPOCH", "TLE_LINE0", "TLE_LINE1", "TLE_LINE2",
+)
+
+REQUIRED_CATEGORIES = tuple(
+    name for name in SPACETRACK_CATEGORIES if SpaceTrack.model_fields[name].is_required()
+)
+
+SATELLITE_FLOATS = ("height_km", "latitude", "longitude", "velocity_kms")
+SATELLITE_CATEGORIES = ("version", "launch")
+SATELLITE_TEXTS = ("id",)
+
+
+class CategoryColumn:
+    """Dictionary-encoded strings: each distinct value is stored once."""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes = array("H")
+        self._lookup: Dict[Optional[str], int] = {None: 0}
+
+    def append(self, value: Optional[str]) -> None:
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+            if code > 0xFFFF and self.codes.typecode == "H":
+                self.codes = array("I", self.codes)
+        self.codes.append(code)
+
+    def code(self, value: Optional[str]) -> Optional[int]:
+        return self._lookup.get(value)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        return self.values[self.codes[row]]
+
+    def nbytes(self) -> int:
+        return self.codes.itemsize * len(self.codes) + sum(len(v or "") for v in self.values)
+
+
+class TextColumn:
+    """High-cardinality strings packed into one UTF-8 buffer."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("I", [0])
+
+    def append(self, value: Optional[str]) -> None:
+        # Los textos de esta tabla son obligatorios; None se guarda como ""
+        self.data += (value or "").encode()
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, row: int) -> str:
+        return self.data[self.offsets[row]:self.offsets[row + 1]].decode()
+
+    def nbytes(self) -> int:
+        return len(self.data) + self.offsets.itemsize * len(self.offsets)
+
+
+class StarlinkStore:
+    """
+    Column store for the whole Starlink constellation.
+
+    Numeric elements live in typed arrays (NaN for missing optionals),
+    repeated strings are dictionary-encoded and unique strings are packed in
+    a single buffer. Pydantic models are only built when a row is returned
+    by the API (`satellite()`).
+    """
+
+    def __init__(self):
+        self.floats: Dict[str, array] = {
+            name: array("d") for name in SPACETRACK_FLOATS + SATELLITE_FLOATS
+        }
+        self.ints: Dict[str, array] = {name: array("q") for name in SPACETRACK_INTS}
+        self.categories: Dict[str, CategoryColumn] = {
+            name: CategoryColumn() for name in SPACETRACK_CATEGORIES + SATELLITE_CATEGORIES
+        }
+        self.texts: Dict[str, TextColumn] = {
+            name: TextColumn() for name in SPACETRACK_TEXTS + SATELLITE_TEXTS
+        }
+        self._size = 0
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def checksum(self) -> str:
+        """Content hash of every record appended, in order."""
+        return self._hash.hexdigest()
+
+    @classmethod
+    def from_docs(cls, docs: Iterable[Dict[str, Any]]) -> "StarlinkStore":
+        store = cls()
+        errors = ErrorBatch(logger, "starlink_validation")
+        for doc in docs:
+            store.append(doc, errors)
+        errors.flush()
+        return store
+
+    def append(self, doc: Dict[str, Any], errors: Optional[ErrorBatch] = None) -> bool:
+        """
+        Add one raw upstream record. Returns False (and skips it) if it is
+        malformed; the error goes to `errors`, or is logged on its own.
+        """
+        try:
+            track = doc["spaceTrack"]
+            floats = [float(track[name]) for name in SPACETRACK_FLOATS]
+            floats += [
+                math.nan if doc.get(name) is None else float(doc[name])
+                for name in SATELLITE_FLOATS
+            ]
+            ints = [int(track[name]) for name in SPACETRACK_INTS]
+            texts = [str(track[name]) for name in SPACETRACK_TEXTS] + [str(doc["id"])]
+            missing = [name for name in REQUIRED_CATEGORIES if track.get(name) is None]
+            if missing:
+                raise KeyError(", ".join(missing))
+        except (KeyError, TypeError, ValueError) as e:
+            batch = errors or ErrorBatch(logger, "starlink_validation")
+            batch.add(e, doc.get("id") if isinstance(doc, dict) else None)
+            if errors is None:
+                batch.flush()
+            return False
+
+        for name, value in zip(SPACETRACK_FLOATS + SATELLITE_FLOATS, floats):
+            self.floats[name].append(value)
+        for name, value in zip(SPACETRACK_INTS, ints):
+            self.ints[name].append(value)
+        for name in SPACETRACK_CATEGORIES:
+            self.categories[name].append(track.get(name))
+        for name in SATELLITE_CATEGORIES:
+            self.categories[name].append(doc.get(name))
+        for name, value in zip(SPACETRACK_TEXTS + SATELLITE_TEXTS, texts):
+            self.texts[name].append(value)
+
+        self._hash.update(json.dumps(doc, sort_keys=True, separators=(",", ":"), default=str).encode())
+        self._size += 1
+        return True
+
+    def column(self, name: str) -> Sequence:
+        for columns in (self.floats, self.ints, self.categories, self.texts):
+            if name in columns:
+                return columns[name]
+        raise KeyError(name)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Rebuild the raw upstream dict for one row."""
+        track: Dict[str, Any] = {}
+        for name in SPACETRACK_CATEGORIES:
+            track[name] = self.categories[name][row]
+        for name in SPACETRACK_TEXTS:
+            track[name] = self.texts[name][row]
+        for name in SPACETRACK_FLOATS:
+            track[name] = self.floats[name][row]
+        for name in SPACETRACK_INTS:
+            track[name] = self.ints[name][row]
+
+        doc: Dict[str, Any] = {"spaceTrack": track}
+        for name in SATELLITE_CATEGORIES:
+            doc[name] = self.categories[name][row]
+        for name in SATELLITE_FLOATS:
+            value = self.floats[name][row]
+            doc[name] = None if math.isnan(value) else value
+        doc["id"] = self.texts["id"][row]
+        return doc
+
+    def satellite(self, row: int) -> StarlinkSatellite:
+        """Pydantic model for one row, built on demand at the API boundary."""
+        doc = self.record(row)
+        doc["spaceTrack"] = SpaceTrack.model_construct(**doc["spaceTrack"])
+        return StarlinkSatellite.model_construct(**doc)
+
+    def satellites(self, rows: Iterable[int]) -> Iterator[StarlinkSatellite]:
+        for row in rows:
+            yield self.satellite(row)
+
+    def nbytes(self) -> int:
+        """Approximate payload size of the store (excluding Python object headers)."""
+        total = sum(len(col) * col.itemsize for col in self.floats.values())
+        total += sum(len(col) * col.itemsize for col in self.ints.values())
+        total += sum(col.nbytes() for col in self.categories.values())
+        total += sum(col.nbytes() for col in self.texts.values())
+        return total
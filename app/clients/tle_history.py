@@ -0,0 +1,219 @@
+import logging
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.clients.starlink_store import StarlinkStore
+from app.core.dates import unix_seconds
+from app.core.log import ErrorBatch, error_kind
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TLEHIST1"
+# Elementos numéricos guardados junto a las líneas TLE (para historiales sin parsear el TLE)
+HISTORY_FLOATS = (
+    "SEMIMAJOR_AXIS", "PERIAPSIS", "APOAPSIS", "INCLINATION", "ECCENTRICITY", "MEAN_MOTION", "BSTAR",
+)
+TLE_LINE_LENGTH = 69
+# NORAD, ELEMENT_SET_NO, epoch (unix), HISTORY_FLOATS, TLE_LINE1, TLE_LINE2: 210 bytes
+RECORD = struct.Struct(f"<IId{len(HISTORY_FLOATS)}d{TLE_LINE_LENGTH}s{TLE_LINE_LENGTH}s")
+
+
+def epoch_unix(epoch: str) -> float:
+    """Space-Track EPOCH (ISO 8601 without zone, UTC) as unix seconds."""
+    return unix_seconds(datetime.fromisoformat(epoch))
+
+
+def encode_element_sets(
+    store: StarlinkStore
+) -> Tuple[List[Tuple[Any, ...]], List[Tuple[str, Optional[str]]]]:
+    """
+    History records (RECORD fields) for every row of a synced store, plus
+    (error kind, id) for the rows that cannot be stored. Pure and read-only,
+    so it can run in a thread while the store is being served.
+    """
+    records = []
+    failed = []
+    for row in range(len(store)):
+        try:
+            line1 = store.texts["TLE_LINE1"][row].encode()
+            line2 = store.texts["TLE_LINE2"][row].encode()
+            if len(line1) != TLE_LINE_LENGTH or len(line2) != TLE_LINE_LENGTH:
+                raise ValueError(f"TLE lines must be {TLE_LINE_LENGTH} characters")
+            records.append((
+                store.ints["NORAD_CAT_ID"][row],
+                store.ints["ELEMENT_SET_NO"][row],
+                epoch_unix(store.texts["EPOCH"][row]),
+                *(store.floats[name][row] for name in HISTORY_FLOATS),
+                line1,
+                line2,
+            ))
+        except ValueError as e:
+            failed.append((error_kind(e), store.texts["id"][row]))
+    return records, failed
+
+
+class TleHistory:
+    """
+    Append-only log of every element set seen across Starlink syncs.
+
+    Each element set is one fixed-size record (RECORD), deduplicated by
+    NORAD_CAT_ID + ELEMENT_SET_NO (plus epoch, since set numbers wrap at
+    999). Records are kept in typed arrays like StarlinkStore, with a per
+    satellite index sorted by epoch, so "the element set valid at t" is
+    one bisect. With a `path`, new records are appended to that file and
+    reloaded on start; a torn record at the end of the file is dropped.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.norad = array("I")
+        self.element_set = array("I")
+        self.epochs = array("d")
+        self.floats: Dict[str, array] = {name: array("d") for name in HISTORY_FLOATS}
+        self.lines = bytearray()
+        # NORAD -> (epochs ordenadas, filas)
+        self._index: Dict[int, Tuple[array, array]] = {}
+        self._file: Any = None
+        self._write_lock = threading.Lock()
+        self._extend_lock = threading.Lock()
+        if path:
+            self._open(path)
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def _open(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a+b") as f:
+            f.seek(0)
+            data = f.read()
+        if not data:
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+        elif not data.startswith(MAGIC):
+            raise ValueError(f"{path} is not a TLE history file")
+        else:
+            body = memoryview(data)[len(MAGIC):]
+            complete = len(body) - len(body) % RECORD.size
+            for record in RECORD.iter_unpack(body[:complete]):
+                self._add(*record)
+            if complete != len(body):
+                logger.warning("Dropping torn record at the end of %s", path)
+                with open(path, "r+b") as f:
+                    f.truncate(len(MAGIC) + complete)
+        self._file = open(path, "ab")
+
+    def _add(self, norad: int, element_set: int, epoch: float, *rest: Any) -> bool:
+        epochs, rows = self._index.get(norad) or self._index.setdefault(norad, (array("d"), array("I")))
+        position = bisect_right(epochs, epoch)
+        # Duplicado = mismo NORAD, mismo epoch y mismo número de element set
+        duplicate = position
+        while duplicate and epochs[duplicate - 1] == epoch:
+            duplicate -= 1
+            if self.element_set[rows[duplicate]] == element_set:
+                return False
+
+        row = len(self.epochs)
+        self.norad.append(norad)
+        self.element_set.append(element_set)
+        self.epochs.append(epoch)
+        for name, value in zip(HISTORY_FLOATS, rest):
+            self.floats[name].append(value)
+        self.lines += rest[-2] + rest[-1]
+        # extend() corre en un hilo mientras el event loop lee el índice: la fila ya está
+        # completa antes de publicarla, y rows crece antes que epochs para que un bisect
+        # sobre epochs nunca apunte fuera de rows
+        if position == len(epochs):
+            rows.append(row)
+            epochs.append(epoch)
+        else:
+            # Un element set que llega tarde se inserta en orden sobre copias, publicadas de una vez
+            epochs, rows = array("d", epochs), array("I", rows)
+            epochs.insert(position, epoch)
+            rows.insert(position, row)
+            self._index[norad] = (epochs, rows)
+        return True
+
+    def extend(self, records: List[Tuple[Any, ...]]) -> bytes:
+        """
+        Add the records (from encode_element_sets) not in the history yet.
+        Returns them encoded, to be appended to the file with write(). Can
+        run in a thread while lookups are served; one extend() at a time.
+        """
+        with self._extend_lock:
+            return self._extend(records)
+
+    def _extend(self, records: List[Tuple[Any, ...]]) -> bytes:
+        payload = bytearray()
+        errors = ErrorBatch(logger, "tle_history")
+        for record in records:
+            # Se empaqueta antes de indexar: un registro que no cabe en RECORD no entra al índice
+            try:
+                packed = RECORD.pack(*record)
+            except struct.error as e:
+                errors.add(e, str(record[0]))
+                continue
+            if self._add(*record):
+                payload += packed
+        errors.flush()
+        return bytes(payload)
+
+    def write(self, payload: bytes) -> None:
+        """Append encoded records to the log file (no-op without a path). Blocking: call from a thread."""
+        if self._file is None or not payload:
+            return
+        with self._write_lock:
+            self._file.write(payload)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def rows(self, norad: int) -> List[int]:
+        """Rows of one satellite, oldest epoch first."""
+        return self._index[norad][1].tolist() if norad in self._index else []
+
+    def valid_at(self, norad: int, time_unix: float) -> Optional[int]:
+        """Row of the latest element set with epoch <= time_unix, or None."""
+        if norad not in self._index:
+            return None
+        epochs, rows = self._index[norad]
+        position = bisect_right(epochs, time_unix)
+        return rows[position - 1] if position else None
+
+    def between(self, norad: int, start_unix: Optional[float], end_unix: Optional[float]) -> List[int]:
+        """Rows with epoch in [start_unix, end_unix], oldest first."""
+        if norad not in self._index:
+            return []
+        epochs, rows = self._index[norad]
+        lo = 0 if start_unix is None else bisect_left(epochs, start_unix)
+        hi = len(epochs) if end_unix is None else bisect_right(epochs, end_unix)
+        return rows[lo:hi].tolist()
+
+    def tle(self, row: int) -> Tuple[str, str]:
+        start = row * 2 * TLE_LINE_LENGTH
+        line1 = self.lines[start:start + TLE_LINE_LENGTH].decode()
+        line2 = self.lines[start + TLE_LINE_LENGTH:start + 2 * TLE_LINE_LENGTH].decode()
+        return line1, line2
+
+    @property
+    def satellites(self) -> int:
+        return len(self._index)
+
+    def nbytes(self) -> int:
+        """Approximate in-memory size, epoch index included (on disk: len(self) * RECORD.size)."""
+        columns = [self.norad, self.element_set, self.epochs, *self.floats.values()]
+        columns += [column for pair in list(self._index.values()) for column in pair]
+        return sum(len(column) * column.itemsize for column in columns) + len(self.lines)
+
+    def status(self) -> Dict[str, Any]:
+        return {"records": len(self), "satellites": self.satellites, "path": self.path}
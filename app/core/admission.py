@@ -0,0 +1,205 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Peso de la media corta de latencia y velocidad a la que el límite sigue al objetivo
+SHORT_WINDOW_WEIGHT = 0.2
+LIMIT_SMOOTHING = 0.2
+# La latencia base sube despacio para olvidar mínimos viejos
+BASELINE_DRIFT = 0.01
+
+Fallback = Callable[[Request], Awaitable[Optional[Response]]]
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit for one route prefix that adapts to observed latency.
+
+    While latency stays near its baseline (the best recently seen) the limit
+    grows; when requests slow down the limit shrinks in proportion, so the
+    extra work waits here, in a bounded queue, instead of piling up on a
+    slow upstream. Requests that find the queue full are rejected at once.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        max_limit: int,
+        min_limit: int = 1,
+        queue_depth: int = 16,
+        queue_timeout: float = 2.0
+    ):
+        self.prefix = prefix
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.queue_depth = queue_depth
+        self.queue_timeout = queue_timeout
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.rejected = 0
+        self.baseline: Optional[float] = None
+        self.latency: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if there is room. False means rejected."""
+        if self.try_acquire():
+            return True
+        if len(self._waiters) >= self.queue_depth:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # El slot llegó justo al vencer el timeout (o al cancelarse): devolverlo
+                self._hand_off()
+            else:
+                waiter.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            return False
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _hand_off(self) -> None:
+        """Give the slot being released to the next waiter, or free it."""
+        while self._waiters and self.in_flight <= int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def release(self, latency: float, ok: bool = True) -> None:
+        """Free a slot and feed the request latency (errors count as slow)."""
+        if not ok:
+            latency = max(latency, (self.latency or latency) * 2)
+        self._update_limit(latency)
+        self._hand_off()
+
+    def _update_limit(self, latency: float) -> None:
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * BASELINE_DRIFT
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += (latency - self.latency) * SHORT_WINDOW_WEIGHT
+
+        gradient = max(0.5, min(1.0, self.baseline / self.latency)) if self.latency > 0 else 1.0
+        # sqrt(limit) de margen para no estrangularse con la latencia base
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self.limit += (target - self.limit) * LIMIT_SMOOTHING
+        self.limit = max(self.min_limit, min(self.max_limit, self.limit))
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the current latency and backlog."""
+        latency = self.latency or 1.0
+        backlog = (self.in_flight + len(self._waiters)) / max(int(self.limit), 1)
+        return max(1, math.ceil(latency * backlog))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "rejected": self.rejected,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "baseline_ms": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that runs each request under the limiter of the longest
+    matching route prefix, until its response starts (the body of a
+    streaming response is not counted). When no slot is free, the route's fallback (e.g.
+    a stale cached response) is served first; otherwise the request waits in
+    the bounded queue, and once that is full it gets a fast 503 with
+    Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        limiters: Iterable[AdaptiveLimiter],
+        fallbacks: Optional[Dict[str, Fallback]] = None,
+        exempt: Iterable[str] = ()
+    ):
+        self.app = app
+        self.limiters: List[AdaptiveLimiter] = sorted(limiters, key=lambda l: len(l.prefix), reverse=True)
+        self.fallbacks = fallbacks or {}
+        self.exempt = tuple(exempt)
+
+    def _limiter(self, path: str) -> Optional[AdaptiveLimiter]:
+        if self.exempt and path.startswith(self.exempt):
+            return None
+        for limiter in self.limiters:
+            if path.startswith(limiter.prefix):
+                return limiter
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            # Los preflight CORS no hacen trabajo: no cuentan contra el límite
+            return await self.app(scope, receive, send)
+        limiter = self._limiter(scope["path"])
+        if limiter is None:
+            return await self.app(scope, receive, send)
+
+        if not limiter.try_acquire():
+            fallback = self.fallbacks.get(limiter.prefix)
+            if fallback is not None:
+                response = await fallback(Request(scope, receive))
+                if response is not None:
+                    return await response(scope, receive, send)
+            if not await limiter.acquire():
+                response = Response(
+                    content=json.dumps({"detail": "Server is over capacity, retry later"}),
+                    status_code=503,
+                    media_type="application/json",
+                    headers={"Retry-After": str(limiter.retry_after())}
+                )
+                return await response(scope, receive, send)
+
+        started = time.perf_counter()
+        released = False
+
+        def release(ok: bool) -> None:
+            nonlocal released
+            if not released:
+                released = True
+                limiter.release(time.perf_counter() - started, ok=ok)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # El slot y la latencia llegan hasta los headers: un stream largo (exports,
+                # páginas de Starlink) o un cliente lento no ocupan el límite del grupo
+                release(ok=message["status"] < 500)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release(ok=False)
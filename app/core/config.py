@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # API Config
@@ -7,10 +7,86 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "SpaceX Dashboard API"
     
     SPACEX_API_URL: str = "https://api.spacexdata.com/v4"
+    SPACEX_TIMEOUT_SECONDS: float = 10.0
+
+    # Circuit breaker for the SpaceX API
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_SECONDS: int = 30
+
+    # Local mirror of upstream collections
+    MIRROR_TTL_SECONDS: int = 300
+    OUTPUT_CACHE_MAX_ENTRIES: int = 256
+
+    # Dashboard push (SSE)
+    DASHBOARD_STREAM_INTERVAL_SECONDS: int = 30
+    DASHBOARD_STREAM_KEEPALIVE_SECONDS: int = 15
+
+    # Orbital computations (SGP4 evaluations allowed per request)
+    CONJUNCTION_MAX_PROPAGATIONS: int = 5_000_000
+    # Ephemeris cache: Earth-fixed positions in aligned blocks
+    EPHEMERIS_STEP_SECONDS: int = 60
+    EPHEMERIS_BLOCK_SECONDS: int = 3600
+    # Memory: one block is satellites x BLOCK/STEP samples x 13 bytes (float32 xyz + valid), about
+    # 4.7 MB for 6,000 satellites at the defaults. The precomputed horizon holds HORIZON_HOURS + 1
+    # blocks (~33 MB); blocks built for requests outside it go to a separate LRU of this many (~28 MB)
+    EPHEMERIS_REQUEST_BLOCKS: int = 6
+    # Longest /starlink/passes window (hours)
+    PASSES_MAX_HOURS: int = 24
+    EPHEMERIS_INTERPOLATION_POINTS: int = 8
+    # Por encima de este error medido se propaga directamente
+    EPHEMERIS_MAX_ERROR_KM: float = 0.5
+    # Background job keeping the next hours propagated
+    EPHEMERIS_PRECOMPUTE: bool = True
+    EPHEMERIS_HORIZON_HOURS: int = 6
+    EPHEMERIS_PRECOMPUTE_INTERVAL_SECONDS: int = 300
+
+    # Admission control: max concurrency per route prefix (the limit adapts below it)
+    ADMISSION_CONTROL: bool = True
+    ADMISSION_ROUTES: Dict[str, int] = {
+        "/api/v1/dashboard": 32,
+        "/api/v1/starlink": 16,
+        "/api/v1": 128,
+    }
+    ADMISSION_EXEMPT: List[str] = ["/api/v1/dashboard/stream"]
+    ADMISSION_MIN_LIMIT: int = 2
+    ADMISSION_QUEUE_DEPTH: int = 16
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+
+    # Bulk export: rows encoded per streamed chunk
+    EXPORT_CHUNK_ROWS: int = 1000
+
+    # CPU-bound parsing/aggregation: "thread", "process" or "off" (always inline)
+    OFFLOAD_MODE: str = "thread"
+    # Trabajo con menos elementos que esto se queda en el event loop
+    OFFLOAD_MIN_ITEMS: int = 200
+    OFFLOAD_BATCH_ITEMS: int = 250
+    OFFLOAD_WORKERS: int = 2
+
+    # Quantile sketches: relative error of the quantiles and chunks (by satellite id) sketched apart
+    SKETCH_RELATIVE_ACCURACY: float = 0.01
+    SKETCH_CHUNKS: int = 8
+    # Sketches por chunk reutilizados entre versiones si el chunk no cambió
+    SKETCH_CHUNK_CACHE: int = 64
+
+    # Launch search: tokenized launches reused across versions when their text is unchanged
+    SEARCH_TERM_CACHE: int = 4096
+
+    # Append-only history of Starlink element sets; None keeps it in memory only
+    TLE_HISTORY_PATH: Optional[str] = None
+
+    # Logging: JSON lines written from a background thread
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10_000
+    # Lotes de errores idénticos: como mucho una línea por ventana
+    LOG_SAMPLE_WINDOW_SECONDS: float = 60.0
+
+    # Readiness
+    WARM_ON_STARTUP: bool = True
+    READY_MAX_DATASET_AGE_SECONDS: int = 1800
     
-    # AWS Config
-    AWS_ACCESS_KEY_ID: str
-    AWS_SECRET_ACCESS_KEY: str
+    # AWS Config (solo se usan si se configura S3_BUCKET)
+    AWS_ACCESS_KEY_ID: Optional[str] = None
+    AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_REGION: str = "us-east-1"
     S3_BUCKET: Optional[str] = None
     
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from typing import Tuple
+
+SECONDS_PER_DAY = 86400
+
+
+def unix_seconds(at: datetime) -> float:
+    """Unix time of `at`; a datetime without timezone is taken as UTC, not server local time."""
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.timestamp()
+
+
+def civil_from_days(days: int) -> Tuple[int, int, int]:
+    """(year, month, day) for a count of days since 1970-01-01, integer-only."""
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+def days_from_civil(year: int, month: int, day: int) -> int:
+    """Inverse of civil_from_days."""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
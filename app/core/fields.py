@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from app.core.exceptions import ValidationException
+
+# Siempre se devuelve el id para que el cliente pueda identificar cada documento
+ALWAYS_INCLUDED = ("id",)
+
+
+def _unwrap(annotation: Any) -> Tuple[Any, bool]:
+    """Strip Optional/List from an annotation. Returns (inner type, is_list)."""
+    is_list = False
+    while True:
+        origin = get_origin(annotation)
+        if origin is Union:
+            args = [arg for arg in get_args(annotation) if arg is not type(None)]
+            annotation = args[0] if len(args) == 1 else Any
+        elif origin in (list, List):
+            annotation = get_args(annotation)[0]
+            is_list = True
+        else:
+            return annotation, is_list
+
+
+class FieldSet:
+    """
+    A parsed `?fields=` parameter (comma-separated dotted paths, e.g.
+    `name,links.patch.small,cores.core`), validated against a model.
+
+    The same selection is exposed in the three shapes it gets pushed down
+    to: an upstream projection (`select`), a pydantic include tree for
+    serialization (`include`) and a trimmer for raw documents (`project`).
+    """
+
+    def __init__(self, paths: List[Tuple[str, ...]], model: Type[BaseModel]):
+        self.paths = paths
+        self.include: Dict[str, Any] = {}
+        self._tree: Dict[str, Any] = {}
+
+        for path in paths:
+            self._add(path, model)
+
+    @classmethod
+    def parse(cls, fields: Optional[str], model: Type[BaseModel]) -> Optional["FieldSet"]:
+        if not fields:
+            return None
+        paths = [
+            tuple(part for part in field.strip().split(".") if part)
+            for field in fields.split(",")
+        ]
+        paths = [path for path in paths if path]
+        if not paths:
+            return None
+        paths += [(name,) for name in ALWAYS_INCLUDED if name in model.model_fields]
+        return cls(paths, model)
+
+    def _add(self, path: Tuple[str, ...], model: Type[BaseModel]) -> None:
+        include = self.include
+        tree = self._tree
+        current: Any = model
+
+        for depth, name in enumerate(path):
+            if not (isinstance(current, type) and issubclass(current, BaseModel)) \
+                    or name not in current.model_fields:
+                raise ValidationException(f"Unknown field '{'.'.join(path[:depth + 1])}'")
+
+            inner, is_list = _unwrap(current.model_fields[name].annotation)
+            last = depth == len(path) - 1
+
+            if last:
+                include[name] = True
+                tree[name] = True
+                break
+
+            # Un campo ya pedido completo no se recorta
+            if include.get(name) is True:
+                break
+
+            tree = tree.setdefault(name, {})
+            if is_list:
+                include = include.setdefault(name, {"__all__": {}})["__all__"]
+            else:
+                include = include.setdefault(name, {})
+            current = inner
+
+    @property
+    def select(self) -> Dict[str, int]:
+        """Upstream (mongoose) projection, e.g. {"links.patch.small": 1}."""
+        selected = set(self.paths)
+        # Mongo rechaza un camino y su padre a la vez (path collision); el padre ya lo incluye
+        return {
+            ".".join(path): 1
+            for path in self.paths
+            if not any(path[:depth] in selected for depth in range(1, len(path)))
+        }
+
+    def project(self, doc: Any) -> Any:
+        """Trim a raw document (or list of documents) to the selected paths."""
+        return _project(doc, self._tree)
+
+
+def _project(doc: Any, tree: Union[Dict[str, Any], bool]) -> Any:
+    if tree is True or doc is None:
+        return doc
+    if isinstance(doc, list):
+        return [_project(item, tree) for item in doc]
+    if not isinstance(doc, dict):
+        return doc
+    return {
+        name: _project(doc[name], subtree)
+        for name, subtree in tree.items()
+        if name in doc
+    }
@@ -0,0 +1,194 @@
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Errores distintos que se incluyen como muestra en la línea de un lote
+BATCH_SAMPLES = 3
+NUMBER = re.compile(r"\b[0-9]+\b")
+
+
+class Counters:
+    """Process-wide event counters (errors per event, dropped log lines...)."""
+
+    def __init__(self):
+        self._values: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._values[name] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._values)
+
+
+metrics = Counters()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured fields come from `extra={"fields": {...}}`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the queue is full the record is dropped and counted."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("log.dropped")
+
+
+class Sampler:
+    """
+    Lets the first occurrence of a key through and then at most one per
+    window, reporting how many were suppressed in between.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._last: Dict[Any, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: Any) -> Optional[int]:
+        """None if this occurrence should be dropped, else the number suppressed since the last one."""
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._last.get(key, (None, 0))
+            if last is not None and now - last < self.window:
+                self._last[key] = (last, suppressed + 1)
+                return None
+            self._last[key] = (now, 0)
+            return suppressed
+
+
+sampler = Sampler(settings.LOG_SAMPLE_WINDOW_SECONDS)
+
+
+def error_kind(error: BaseException) -> str:
+    """Stable description of an error, without the values that vary per record."""
+    errors = getattr(error, "errors", None)
+    if callable(errors):
+        # ValidationError de pydantic: campo + tipo de error
+        try:
+            details = ",".join(
+                f"{'.'.join(str(part) for part in item['loc'])}:{item['type']}"
+                for item in errors()[:BATCH_SAMPLES]
+            )
+            return f"{type(error).__name__}({details})"
+        except Exception:
+            pass
+    message = str(error).splitlines()[0] if str(error) else ""
+    # Números sueltos (ids, posiciones) no distinguen un error de otro
+    message = NUMBER.sub("N", message)[:200]
+    return f"{type(error).__name__}: {message}"
+
+
+class ErrorBatch:
+    """
+    Collects the errors of one pass over records (a page, a snapshot...)
+    and logs them as a single line on flush(): how many, which
+    kinds and a sample record id per kind. Every error is counted in
+    `metrics`; identical batches repeated within LOG_SAMPLE_WINDOW_SECONDS
+    are sampled.
+
+        errors = ErrorBatch(logger, "launch_validation")
+        for doc in docs:
+            try:
+                ...
+            except Exception as e:
+                errors.add(e, doc.get("id"))
+        errors.flush()
+    """
+
+    def __init__(self, logger: logging.Logger, event: str):
+        self.logger = logger
+        self.event = event
+        self.total = 0
+        self.kinds: Counter = Counter()
+        self.samples: Dict[str, Optional[str]] = {}
+
+    def add(self, error: BaseException, record_id: Optional[str] = None) -> None:
+        self.add_kind(error_kind(error), record_id)
+
+    def add_kind(self, kind: str, record_id: Optional[str] = None) -> None:
+        """Record an error already reduced to its kind (e.g. by a worker process)."""
+        self.total += 1
+        self.kinds[kind] += 1
+        self.samples.setdefault(kind, record_id)
+
+    def flush(self) -> None:
+        if not self.total:
+            return
+        metrics.incr(f"{self.event}.errors", self.total)
+        top = self.kinds.most_common(BATCH_SAMPLES)
+        suppressed = sampler.allow((self.event, top[0][0]))
+        if suppressed is not None:
+            self.logger.warning(
+                "%s: %d records failed", self.event, self.total,
+                extra={"fields": {
+                    "event": self.event,
+                    "errors": self.total,
+                    "distinct": len(self.kinds),
+                    "top": [
+                        {"error": kind, "count": count, "sample_id": self.samples[kind]}
+                        for kind, count in top
+                    ],
+                    "suppressed_batches": suppressed,
+                }}
+            )
+        self.total = 0
+        self.kinds.clear()
+        self.samples.clear()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging() -> None:
+    """
+    Route the `app` loggers through a bounded queue to a background thread
+    that writes JSON lines to stderr, so logging never blocks the event loop.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter())
+    log_queue: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+
+    app_logger = logging.getLogger("app")
+    app_logger.handlers = [DroppingQueueHandler(log_queue)]
+    app_logger.setLevel(settings.LOG_LEVEL)
+    app_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush what is queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,25 @@
+import asyncio
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+from app.core.subsystems import subsystems
+
+T = TypeVar("T")
+
+
+async def offload(fn: Callable[..., T], *args: Any, size: int) -> T:
+    """
+    Run CPU-bound `fn(*args)` off the event loop when `size` (records to
+    process) reaches OFFLOAD_MIN_ITEMS; smaller jobs run inline, where a
+    hop to a thread or process would cost more than the work itself.
+
+    With OFFLOAD_MODE="process", `fn` must be a module-level function and
+    its arguments and result are pickled, so pass compact inputs (tuples,
+    lists of scalars) and build models from the result in the caller.
+    """
+    if settings.OFFLOAD_MODE == "off" or size < settings.OFFLOAD_MIN_ITEMS:
+        return fn(*args)
+    if settings.OFFLOAD_MODE == "process":
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(subsystems.workers.get(), fn, *args)
+    return await asyncio.to_thread(fn, *args)
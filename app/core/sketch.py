@@ -0,0 +1,124 @@
+import math
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+
+# Cuantiles que se precalculan para cada sketch
+SUMMARY_QUANTILES = {"p5": 0.05, "p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch (DDSketch).
+
+    Values go into logarithmically sized buckets, so any quantile is
+    returned within `relative_accuracy` of the true value whatever the
+    distribution, memory depends on the value range rather than the count,
+    and two sketches built over different chunks (or in different worker
+    processes) merge exactly by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: Optional[float] = None, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy or settings.SKETCH_RELATIVE_ACCURACY
+        self.max_buckets = max_buckets
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value != value:
+            # NaN = dato ausente
+            return
+        if value > 0:
+            index = self._index(value)
+            self.positive[index] = self.positive.get(index, 0) + count
+        elif value < 0:
+            index = self._index(-value)
+            self.negative[index] = self.negative.get(index, 0) + count
+        else:
+            self.zeros += count
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self.positive) + len(self.negative) > self.max_buckets:
+            self._collapse()
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add `other` into this sketch (same accuracy required); returns self."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.positive.items():
+            self.positive[index] = self.positive.get(index, 0) + count
+        for index, count in other.negative.items():
+            self.negative[index] = self.negative.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.positive) + len(self.negative) > self.max_buckets:
+            self._collapse()
+        return self
+
+    def _collapse(self) -> None:
+        # Se juntan los buckets de menor magnitud: se pierde precisión sólo en el extremo bajo
+        store = self.positive if len(self.positive) >= len(self.negative) else self.negative
+        keep = self.max_buckets - (len(self.positive) + len(self.negative) - len(store))
+        indices = sorted(store)
+        excess = indices[:max(len(indices) - keep + 1, 0)]
+        if not excess:
+            return
+        target = excess[-1]
+        store[target] = sum(store.pop(index) for index in excess)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        value = self.max
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                value = -self._value(index)
+                break
+        else:
+            seen += self.zeros
+            if seen > rank:
+                return 0.0
+            for index in sorted(self.positive):
+                seen += self.positive[index]
+                if seen > rank:
+                    value = self._value(index)
+                    break
+        # El representante del bucket puede quedar fuera del rango observado
+        return min(max(value, self.min), self.max)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """count/min/max/mean plus SUMMARY_QUANTILES."""
+        if not self.count:
+            return {"count": 0, "min": None, "max": None, "mean": None, **{name: None for name in SUMMARY_QUANTILES}}
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count,
+            **{name: self.quantile(q) for name, q in SUMMARY_QUANTILES.items()},
+        }
@@ -0,0 +1,135 @@
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from httpx import AsyncClient, Limits, Timeout
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LazySubsystem:
+    """
+    A client that is only created the first time something asks for it, so
+    app startup does not pay for connections (or imports) nobody uses.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        closer: Optional[Callable[[Any], Any]] = None,
+        enabled: bool = True
+    ):
+        self.name = name
+        self.enabled = enabled
+        self._factory = factory
+        self._closer = closer
+        self._instance: Any = None
+        self.startup_ms: Optional[float] = None
+
+    @property
+    def started(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        if not self.enabled:
+            raise RuntimeError(f"{self.name} is not configured")
+        if self._instance is None:
+            started = time.perf_counter()
+            self._instance = self._factory()
+            self.startup_ms = (time.perf_counter() - started) * 1000
+        return self._instance
+
+    async def close(self) -> None:
+        if self._instance is None:
+            return
+        instance, self._instance = self._instance, None
+        if self._closer is not None:
+            result = self._closer(instance)
+            if inspect.isawaitable(result):
+                await result
+
+    def status(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"state": "disabled"}
+        if not self.started:
+            return {"state": "idle"}
+        return {"state": "started", "startup_ms": round(self.startup_ms, 2)}
+
+
+def _http_pool() -> AsyncClient:
+    return AsyncClient(
+        base_url=settings.SPACEX_API_URL,
+        timeout=Timeout(settings.SPACEX_TIMEOUT_SECONDS),
+        limits=Limits(max_connections=50, max_keepalive_connections=20)
+    )
+
+
+def _worker_pool() -> Any:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # spawn: el proceso padre ya tiene hilos (logging, to_thread) y fork no es seguro
+    return ProcessPoolExecutor(
+        max_workers=settings.OFFLOAD_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _tle_history() -> Any:
+    from app.clients.tle_history import TleHistory
+    return TleHistory(settings.TLE_HISTORY_PATH)
+
+
+def _redis_client() -> Any:
+    import redis.asyncio as redis
+    return redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+
+
+def _s3_client() -> Any:
+    import boto3
+    return boto3.client(
+        "s3",
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
+    )
+
+
+class Subsystems:
+    """Registry of the lazily started clients shared across requests."""
+
+    def __init__(self):
+        self.http = LazySubsystem("http", _http_pool, lambda client: client.aclose())
+        self.redis = LazySubsystem(
+            "redis", _redis_client, lambda client: client.close(),
+            enabled=bool(settings.REDIS_HOST)
+        )
+        self.s3 = LazySubsystem(
+            "s3", _s3_client, lambda client: client.close(),
+            enabled=bool(settings.S3_BUCKET)
+        )
+        self.workers = LazySubsystem(
+            "workers", _worker_pool, lambda pool: pool.shutdown(wait=False, cancel_futures=True),
+            enabled=settings.OFFLOAD_MODE == "process"
+        )
+        self.tle_history = LazySubsystem("tle_history", _tle_history, lambda history: history.close())
+
+    @property
+    def all(self):
+        return [self.http, self.redis, self.s3, self.workers, self.tle_history]
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {subsystem.name: subsystem.status() for subsystem in self.all}
+
+    async def shutdown(self) -> None:
+        for subsystem in self.all:
+            try:
+                await subsystem.close()
+            except Exception as e:
+                logger.error("Error closing %s: %s", subsystem.name, e)
+
+
+subsystems = Subsystems()
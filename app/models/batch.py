@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class BatchItem(BaseModel, Generic[T]):
+    id: str
+    found: bool
+    data: Optional[T] = None
+
+class BatchResponse(BaseModel, Generic[T]):
+    docs: List[BatchItem[T]]
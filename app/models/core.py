@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class LandingStats(BaseModel):
+    attempts: int = 0
+    successes: int = 0
+    rate: float = 0
+
+class CoreFlight(BaseModel):
+    launch: str = Field(..., description="Launch ID")
+    name: str
+    date_unix: int
+    flight: Optional[int] = Field(None, description="Flight number of this core as reported upstream")
+    reused: Optional[bool] = None
+    landing_attempt: Optional[bool] = None
+    landing_success: Optional[bool] = None
+    landing_type: Optional[str] = None
+    landpad: Optional[str] = None
+    turnaround_days: Optional[float] = Field(None, description="Days since this core's previous flight")
+
+class CoreSummary(BaseModel):
+    core: str
+    flights: int
+    first_flight_unix: int
+    last_flight_unix: int
+    mean_turnaround_days: Optional[float] = None
+    min_turnaround_days: Optional[float] = None
+    landings: LandingStats
+
+class CoreDetail(CoreSummary):
+    history: List[CoreFlight]
+    landings_by_type: Dict[str, LandingStats] = Field(default_factory=dict)
+
+class CoreListResponse(BaseModel):
+    docs: List[CoreSummary]
+    totalDocs: int
+    limit: int
+    offset: int
+
+class ReuseTrend(BaseModel):
+    year: int
+    core_flights: int
+    reused_flights: int
+    reuse_rate: float
+    median_turnaround_days: Optional[float] = None
+    landings: LandingStats
+
+class FleetReuseResponse(BaseModel):
+    cores: int
+    core_flights: int
+    max_flights_per_core: int
+    trends: List[ReuseTrend]
+    by_landing_type: Dict[str, LandingStats]
+    by_landpad: Dict[str, LandingStats]
@@ -56,10 +56,11 @@ class StarlinkData(BaseModel):
     satellite_positions: List[SatellitePosition]
 
 class DashboardResponse(BaseModel):
-    summary_metrics: SummaryMetrics
-    rocket_comparison: RocketComparison
-    launch_metrics: LaunchMetrics
-    starlink_data: StarlinkData
+    # Las secciones no pedidas con ?sections= quedan en None y se omiten
+    summary_metrics: Optional[SummaryMetrics] = None
+    rocket_comparison: Optional[RocketComparison] = None
+    launch_metrics: Optional[LaunchMetrics] = None
+    starlink_data: Optional[StarlinkData] = None
 
     class Config:
             schema_extra = {
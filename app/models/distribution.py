@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class DistributionSummary(BaseModel):
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    p5: Optional[float] = None
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
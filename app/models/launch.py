@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict
 from datetime import datetime
+from app.models.distribution import DistributionSummary
 
 class PatchLinks(BaseModel):
     small: Optional[str] = None
@@ -157,27 +158,38 @@ class Launch(BaseModel):
 class LaunchResponse(BaseModel):
     docs: List[Launch] = Field(default_factory=list)
     totalDocs: int = Field(default=0)
-    offset: int = Field(default=0)
     limit: int = Field(default=0)
-    totalPages: int = Field(default=0)
-    page: int = Field(default=0)
-    pagingCounter: int = Field(default=0)
-    hasPrevPage: bool = Field(default=False)
     hasNextPage: bool = Field(default=False)
-    prevPage: Optional[int] = None
-    nextPage: Optional[int] = None
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Opaque cursor to pass as `cursor` to fetch the next page"
+    )
+
+class LaunchSearchHit(BaseModel):
+    score: float = Field(..., description="Relevance; higher is better")
+    launch: Launch
+
+class LaunchSearchResponse(BaseModel):
+    query: str
+    totalDocs: int = Field(default=0)
+    limit: int = Field(default=0)
+    offset: int = Field(default=0)
+    docs: List[LaunchSearchHit] = Field(default_factory=list)
+
+class LaunchRollupBucket(BaseModel):
+    bucket: str = Field(..., description="Bucket label: YYYY-MM-DD (week start), YYYY-MM, YYYY-Qn or YYYY")
+    start_unix: int
+    total: int
+    successful: int
+    rate: float
+    by_rocket: Dict[str, int] = Field(default_factory=dict, description="Completed launches per rocket ID")
+
+class LaunchRollupResponse(BaseModel):
+    resolution: str
+    buckets: List[LaunchRollupBucket]
 
-    @classmethod
-    def from_api_response(cls, response: List[dict]):
-        """
-        Create LaunchResponse from API response when it's a list
-        """
-        if isinstance(response, list):
-            return cls(
-                docs=response,
-                totalDocs=len(response),
-                limit=len(response),
-                totalPages=1,
-                page=1
-            )
-        return cls(**response)
\ No newline at end of file
+class LaunchIntervalsResponse(BaseModel):
+    unit: str = "days"
+    relative_accuracy: float
+    all: DistributionSummary = Field(..., description="Intervals of every rocket merged")
+    rockets: Dict[str, DistributionSummary] = Field(..., description="Rocket ID -> days between its consecutive launches")
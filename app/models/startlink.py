@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
+from app.models.distribution import DistributionSummary
 
 class SpaceTrack(BaseModel):
     CCSDS_OMM_VERS: str
@@ -123,4 +124,129 @@ class StarlinkResponse(BaseModel):
                 "velocity_kms": None,
                 "id": "5eed770f096e59000698560d"
             }
-        }
\ No newline at end of file
+        }
+
+class ElementDistribution(BaseModel):
+    min: float
+    p25: float
+    median: float
+    p75: float
+    max: float
+    mean: float
+
+class OrbitalShell(BaseModel):
+    altitude_km: List[float] = Field(..., description="[lower, upper) mean-altitude band of the shell")
+    inclination_deg: List[float] = Field(..., description="[lower, upper) inclination band of the shell")
+    satellites: int
+    active: int
+    decayed: int
+    by_version: Dict[str, int] = Field(default_factory=dict)
+    elements: Dict[str, ElementDistribution] = Field(
+        default_factory=dict,
+        description="Distribution of each spaceTrack element over the shell members"
+    )
+
+class StarlinkShellsResponse(BaseModel):
+    total_satellites: int
+    altitude_step_km: float
+    inclination_step_deg: float
+    shells: List[OrbitalShell]
+
+class Conjunction(BaseModel):
+    satellites: List[str] = Field(..., description="IDs of the two satellites")
+    names: List[str]
+    tca_unix: float = Field(..., description="Time of closest approach (unix seconds)")
+    miss_distance_km: float
+    relative_speed_kms: float
+
+class ConjunctionResponse(BaseModel):
+    start_unix: int
+    end_unix: int
+    step_seconds: int
+    threshold_km: float
+    satellites_screened: int
+    encounters_refined: int
+    conjunctions: List[Conjunction]
+
+class SatellitePass(BaseModel):
+    satellite: str
+    name: str
+    rise_unix: Optional[float] = Field(None, description="None if already above the horizon at the window start")
+    rise_azimuth: Optional[float] = None
+    culmination_unix: float
+    max_elevation: float
+    culmination_azimuth: float
+    set_unix: Optional[float] = Field(None, description="None if still above the horizon at the window end")
+    set_azimuth: Optional[float] = None
+
+class PassesResponse(BaseModel):
+    lat: float
+    lon: float
+    start_unix: int
+    end_unix: int
+    min_elevation: float
+    satellites_visible: int
+    passes: List[SatellitePass]
+
+class EphemerisPosition(BaseModel):
+    satellite: str
+    name: str
+    latitude: float
+    longitude: float
+    height_km: float
+    ecef_km: List[float] = Field(..., description="Earth-fixed position [x, y, z]")
+
+class EphemerisResponse(BaseModel):
+    time_unix: float
+    source: str = Field(..., description="interpolated (precomputed ephemeris) or propagated (direct SGP4)")
+    error_bound_km: Optional[float] = Field(None, description="Interpolation error measured for the blocks used")
+    positions: List[EphemerisPosition]
+    not_found: List[str] = Field(default_factory=list)
+
+class StarlinkDistributionsResponse(BaseModel):
+    group_by: str = Field(..., description="version or shell")
+    relative_accuracy: float = Field(..., description="Quantiles are within this relative error of the exact value")
+    groups: Dict[str, Dict[str, DistributionSummary]] = Field(
+        ..., description="Group -> metric (height_km, velocity_kms, period_min) -> distribution"
+    )
+
+class HistoricalElementSet(BaseModel):
+    norad_id: int
+    element_set_no: int
+    epoch: str = Field(..., description="Epoch of the element set (ISO 8601, UTC)")
+    epoch_unix: float
+    altitude_km: float = Field(..., description="Mean altitude (semi-major axis minus Earth radius)")
+    perigee_km: float
+    apogee_km: float
+    inclination: float
+    eccentricity: float
+    mean_motion: float
+    bstar: float
+    tle_line1: str
+    tle_line2: str
+
+class HistoricalPosition(BaseModel):
+    latitude: float
+    longitude: float
+    height_km: float
+    ecef_km: List[float] = Field(..., description="Earth-fixed position [x, y, z]")
+
+class ElementSetAtResponse(BaseModel):
+    time_unix: float
+    age_days: float = Field(..., description="Days between the element set epoch and `time`")
+    element_set: HistoricalElementSet
+    position: Optional[HistoricalPosition] = Field(None, description="SGP4 position at `time` from this element set")
+
+class DecayPoint(BaseModel):
+    epoch_unix: float
+    element_set_no: int
+    altitude_km: float
+    perigee_km: float
+    apogee_km: float
+
+class DecayHistoryResponse(BaseModel):
+    norad_id: int
+    element_sets: int = Field(..., description="Element sets in the range (points may be a subsample)")
+    altitude_change_km: Optional[float] = Field(None, description="Last minus first mean altitude in the range")
+    decay_rate_km_per_day: Optional[float] = Field(None, description="Least-squares slope of the mean altitude")
+    points: List[DecayPoint]
@@ -0,0 +1,212 @@
+from typing import Any, List, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+from app.models.startlink import Conjunction
+from app.services.propagation import Constellation
+
+# Cotas físicas para LEO: velocidad relativa (órbitas opuestas) y diferencia de aceleraciones
+MAX_RELATIVE_SPEED_KMS = 16.0
+MAX_RELATIVE_ACCEL_KMS2 = 0.02
+
+REFINE_ITERATIONS = 4
+
+# Vecinos "hacia adelante" de una celda: cada par de celdas adyacentes se visita una sola vez
+_HALF_NEIGHBOURS = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+_CELL_BITS = 20
+
+
+def _cell_keys(np: Any, cells: Any) -> Any:
+    # Empaquetado sin acarreo: clave(celda + delta) == clave(celda) + clave(delta)
+    offset = 1 << (_CELL_BITS - 1)
+    shifted = cells + offset
+    return (shifted[:, 0] << (2 * _CELL_BITS)) + (shifted[:, 1] << _CELL_BITS) + shifted[:, 2]
+
+
+def _delta_key(delta: Tuple[int, int, int]) -> int:
+    dx, dy, dz = delta
+    return (dx << (2 * _CELL_BITS)) + (dy << _CELL_BITS) + dz
+
+
+def _expand_ranges(np: Any, lo: Any, hi: Any) -> Tuple[Any, Any]:
+    """For each query q with matches sorted[lo[q]:hi[q]], return (q, position) pairs."""
+    counts = hi - lo
+    total = int(counts.sum())
+    if not total:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    queries = np.repeat(np.arange(len(lo)), counts)
+    within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return queries, lo[queries] + within
+
+
+def _hash_pairs(np: Any, positions: Any, cell_km: float) -> Tuple[Any, Any]:
+    """
+    Index pairs whose points fall in the same or adjacent cells of a uniform
+    grid, each unordered pair once. Every pair closer than `cell_km` is
+    included, without comparing all n² pairs.
+    """
+    cells = np.floor(positions / cell_km).astype(np.int64)
+    keys = _cell_keys(np, cells)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    # Se trabaja en el orden de las claves: las búsquedas con agujas ordenadas son mucho más rápidas
+    lo = np.searchsorted(sorted_keys, sorted_keys, side="left")
+    hi = np.searchsorted(sorted_keys, sorted_keys, side="right")
+    first, second = _expand_ranges(np, lo, hi)
+    # Misma celda: sólo i < j
+    keep = first < second
+    firsts, seconds = [first[keep]], [second[keep]]
+
+    for delta in _HALF_NEIGHBOURS:
+        neighbours = sorted_keys + _delta_key(delta)
+        lo = np.searchsorted(sorted_keys, neighbours, side="left")
+        hi = np.searchsorted(sorted_keys, neighbours, side="right")
+        first, second = _expand_ranges(np, lo, hi)
+        firsts.append(first)
+        seconds.append(second)
+    return order[np.concatenate(firsts)], order[np.concatenate(seconds)]
+
+
+def screen_conjunctions(
+    constellation: Constellation,
+    start_unix: float,
+    duration_seconds: float,
+    step_seconds: float,
+    threshold_km: float,
+    limit: int
+) -> Tuple[List[Conjunction], int]:
+    """
+    Close approaches under `threshold_km` between constellation members in
+    [start, start + duration]. Returns the closest approach of each pair,
+    ranked by miss distance, and the number of encounters that were refined.
+
+    Positions are propagated in batch over a time grid. At each step a
+    spatial hash proposes pairs near enough to meet before the next step,
+    pairs whose perigee/apogee ranges cannot overlap are dropped, and a
+    linear relative-motion model picks the ones worth refining. Only those
+    are propagated again, individually, to converge on the exact TCA.
+    """
+    import numpy as np
+
+    n = len(constellation)
+    steps = int(duration_seconds // step_seconds) + 1
+    if n * steps > settings.CONJUNCTION_MAX_PROPAGATIONS:
+        raise ValidationException(
+            f"Screening {n} satellites over {steps} steps exceeds the request budget; "
+            "use a shorter window or a larger step"
+        )
+    if n < 2:
+        return [], 0
+
+    half_step = step_seconds / 2
+    # Error máximo del modelo lineal dentro de medio paso
+    linear_margin = 0.5 * MAX_RELATIVE_ACCEL_KMS2 * half_step ** 2
+    cell_km = threshold_km + linear_margin + MAX_RELATIVE_SPEED_KMS * half_step
+
+    times = start_unix + np.arange(steps) * step_seconds
+    chunk = max(1, settings.CONJUNCTION_MAX_PROPAGATIONS // (10 * n))
+    found_pairs, found_times, found_distances = [], [], []
+
+    for chunk_start in range(0, steps, chunk):
+        chunk_times = times[chunk_start:chunk_start + chunk]
+        positions, velocities, ok = constellation.propagate(chunk_times)
+        for k, time_unix in enumerate(chunk_times):
+            valid = np.flatnonzero(ok[:, k])
+            first, second = _hash_pairs(np, positions[valid, k], cell_km)
+            first, second = valid[first], valid[second]
+
+            # Filtro radial: las bandas perigeo-apogeo tienen que solaparse
+            overlap = (
+                (constellation.perigee_km[first] - threshold_km <= constellation.apogee_km[second])
+                & (constellation.perigee_km[second] - threshold_km <= constellation.apogee_km[first])
+            )
+            first, second = first[overlap], second[overlap]
+            if not len(first):
+                continue
+
+            dr = positions[second, k] - positions[first, k]
+            dv = velocities[second, k] - velocities[first, k]
+            speed2 = np.einsum("ij,ij->i", dv, dv)
+            tau = -np.einsum("ij,ij->i", dr, dv) / np.where(speed2 > 0, speed2, 1)
+            tau = np.clip(tau, -half_step, half_step)
+            miss = np.linalg.norm(dr + dv * tau[:, None], axis=1)
+            close = miss <= threshold_km + linear_margin
+            if close.any():
+                low, high = np.minimum(first, second)[close], np.maximum(first, second)[close]
+                found_pairs.append(low * n + high)
+                found_times.append(time_unix + tau[close])
+                found_distances.append(miss[close])
+
+    if not found_pairs:
+        return [], 0
+
+    pairs = np.concatenate(found_pairs)
+    tcas = np.concatenate(found_times)
+    distances = np.concatenate(found_distances)
+    # Muestras del mismo par a menos de un paso son el mismo encuentro; un par
+    # puede cruzarse varias veces en la ventana (una por órbita)
+    order = np.lexsort((tcas, pairs))
+    pairs, tcas, distances = pairs[order], tcas[order], distances[order]
+    new_encounter = np.concatenate(([True], (pairs[1:] != pairs[:-1]) | (np.diff(tcas) > step_seconds)))
+    encounter = np.cumsum(new_encounter) - 1
+    best = np.lexsort((distances, encounter))
+    best = best[np.concatenate(([True], encounter[best][1:] != encounter[best][:-1]))]
+
+    closest = {}
+    for pair, tca in zip(pairs[best].tolist(), tcas[best].tolist()):
+        refined = _refine(constellation, pair // n, pair % n, tca, half_step)
+        if refined is None:
+            continue
+        tca, miss, speed = refined
+        if miss > threshold_km or not start_unix <= tca <= start_unix + duration_seconds:
+            continue
+        if pair not in closest or miss < closest[pair][1]:
+            closest[pair] = (tca, miss, speed)
+
+    conjunctions = []
+    for pair, (tca, miss, speed) in closest.items():
+        first, second = pair // n, pair % n
+        conjunctions.append(
+            Conjunction(
+                satellites=[constellation.satellite_id(first), constellation.satellite_id(second)],
+                names=[constellation.name(first), constellation.name(second)],
+                tca_unix=tca,
+                miss_distance_km=miss,
+                relative_speed_kms=speed
+            )
+        )
+
+    conjunctions.sort(key=lambda c: c.miss_distance_km)
+    return conjunctions[:limit], len(best)
+
+
+def _refine(constellation: Constellation, first: int, second: int, tca: float, bound: float):
+    """Newton iterations on d/dt |r2 - r1|² = 0 with exact SGP4 states."""
+    import numpy as np
+
+    guess = tca
+    for _ in range(REFINE_ITERATIONS):
+        r1, v1 = constellation.propagate_one(first, tca)
+        r2, v2 = constellation.propagate_one(second, tca)
+        if r1 is None or r2 is None:
+            return None
+        dr, dv = r2 - r1, v2 - v1
+        speed2 = float(dv @ dv)
+        if speed2 == 0:
+            break
+        step = -float(dr @ dv) / speed2
+        # No alejarse de la ventana donde la muestra era válida
+        tca = min(max(tca + step, guess - 2 * bound), guess + 2 * bound)
+        if abs(step) < 1e-3:
+            break
+
+    r1, v1 = constellation.propagate_one(first, tca)
+    r2, v2 = constellation.propagate_one(second, tca)
+    if r1 is None or r2 is None:
+        return None
+    return tca, float(np.linalg.norm(r2 - r1)), float(np.linalg.norm(v2 - v1))
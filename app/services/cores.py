@@ -0,0 +1,152 @@
+from collections import defaultdict
+from statistics import median
+from typing import Dict, List, Optional
+
+from app.clients.cache import DatasetMirror, mirror
+from app.core.dates import SECONDS_PER_DAY, civil_from_days
+from app.models.core import (
+    CoreDetail, CoreFlight, CoreSummary, FleetReuseResponse, LandingStats, ReuseTrend
+)
+from app.models.launch import Launch
+from app.services.launches import launch_engine
+
+CORE_SORTS = ("flights", "last_flight", "turnaround")
+
+
+class _LandingCounter:
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+
+    def add(self, flight: CoreFlight) -> None:
+        if flight.landing_attempt:
+            self.attempts += 1
+            if flight.landing_success:
+                self.successes += 1
+
+    def stats(self) -> LandingStats:
+        rate = self.successes / self.attempts * 100 if self.attempts else 0
+        return LandingStats(attempts=self.attempts, successes=self.successes, rate=rate)
+
+
+def _landing_stats(counters: Dict[str, _LandingCounter]) -> Dict[str, LandingStats]:
+    return {key: counter.stats() for key, counter in sorted(counters.items())}
+
+
+class CoreIndex:
+    """
+    Booster history built once per launches version: every core mapped to
+    its completed flights in date order, with per-core summaries and the
+    fleet-wide aggregates precomputed, so queries never scan the launches.
+    """
+
+    def __init__(self, launches: List[Launch]):
+        history: Dict[str, List[CoreFlight]] = defaultdict(list)
+        for launch in sorted(launches, key=lambda launch: (launch.date_unix, launch.id)):
+            if launch.upcoming:
+                continue
+            for core in launch.cores:
+                if not core.core:
+                    continue
+                history[core.core].append(
+                    CoreFlight(
+                        launch=launch.id,
+                        name=launch.name,
+                        date_unix=launch.date_unix,
+                        flight=core.flight,
+                        reused=core.reused,
+                        landing_attempt=core.landing_attempt,
+                        landing_success=core.landing_success,
+                        landing_type=core.landing_type,
+                        landpad=core.landpad
+                    )
+                )
+
+        by_type: Dict[str, _LandingCounter] = defaultdict(_LandingCounter)
+        by_landpad: Dict[str, _LandingCounter] = defaultdict(_LandingCounter)
+        yearly: Dict[int, Dict] = defaultdict(
+            lambda: {"flights": 0, "reused": 0, "turnarounds": [], "landings": _LandingCounter()}
+        )
+        self._details: Dict[str, CoreDetail] = {}
+
+        for core_id, flights in history.items():
+            core_types: Dict[str, _LandingCounter] = defaultdict(_LandingCounter)
+            core_landings = _LandingCounter()
+            turnarounds = []
+            for previous, flight in zip([None] + flights, flights):
+                if previous is not None:
+                    flight.turnaround_days = (flight.date_unix - previous.date_unix) / SECONDS_PER_DAY
+                    turnarounds.append(flight.turnaround_days)
+                core_landings.add(flight)
+                if flight.landing_attempt:
+                    core_types[flight.landing_type or "unknown"].add(flight)
+                    by_type[flight.landing_type or "unknown"].add(flight)
+                    by_landpad[flight.landpad or "unknown"].add(flight)
+
+                year = yearly[civil_from_days(flight.date_unix // SECONDS_PER_DAY)[0]]
+                year["flights"] += 1
+                # Reutilizado según upstream, o deducido del historial si falta el dato
+                if flight.reused or (flight.reused is None and previous is not None):
+                    year["reused"] += 1
+                if flight.turnaround_days is not None:
+                    year["turnarounds"].append(flight.turnaround_days)
+                year["landings"].add(flight)
+
+            self._details[core_id] = CoreDetail(
+                core=core_id,
+                flights=len(flights),
+                first_flight_unix=flights[0].date_unix,
+                last_flight_unix=flights[-1].date_unix,
+                mean_turnaround_days=sum(turnarounds) / len(turnarounds) if turnarounds else None,
+                min_turnaround_days=min(turnarounds) if turnarounds else None,
+                landings=core_landings.stats(),
+                history=flights,
+                landings_by_type=_landing_stats(core_types)
+            )
+
+        self._summaries = [
+            CoreSummary(**detail.model_dump(include=set(CoreSummary.model_fields)))
+            for detail in self._details.values()
+        ]
+        self._sorted = {
+            "flights": sorted(self._summaries, key=lambda s: (-s.flights, -s.last_flight_unix, s.core)),
+            "last_flight": sorted(self._summaries, key=lambda s: (-s.last_flight_unix, s.core)),
+            "turnaround": sorted(
+                (s for s in self._summaries if s.min_turnaround_days is not None),
+                key=lambda s: (s.min_turnaround_days, s.core)
+            ),
+        }
+        self.fleet = FleetReuseResponse(
+            cores=len(self._details),
+            core_flights=sum(len(flights) for flights in history.values()),
+            max_flights_per_core=max((len(flights) for flights in history.values()), default=0),
+            trends=[
+                ReuseTrend(
+                    year=year,
+                    core_flights=data["flights"],
+                    reused_flights=data["reused"],
+                    reuse_rate=data["reused"] / data["flights"] * 100,
+                    median_turnaround_days=median(data["turnarounds"]) if data["turnarounds"] else None,
+                    landings=data["landings"].stats()
+                )
+                for year, data in sorted(yearly.items())
+            ],
+            by_landing_type=_landing_stats(by_type),
+            by_landpad=_landing_stats(by_landpad)
+        )
+
+    def get(self, core_id: str) -> Optional[CoreDetail]:
+        return self._details.get(core_id)
+
+    def list(self, sort: str = "flights", limit: int = 20, offset: int = 0) -> List[CoreSummary]:
+        return self._sorted[sort][offset:offset + limit]
+
+    def count(self, sort: str = "flights") -> int:
+        return len(self._sorted[sort])
+
+
+async def get_core_index(dataset: DatasetMirror = mirror) -> CoreIndex:
+    """Core index for the current launches snapshot (rebuilt only on new versions)."""
+    snapshot = await dataset.launches.get()
+    engine = launch_engine(snapshot)
+    return snapshot.derive("core_index", lambda _: CoreIndex(engine.launches))
@@ -1,21 +1,57 @@
-from datetime import datetime
-from typing import Dict, List, Optional
+import logging
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from collections import defaultdict
 
 from app.models.dashboard import (
     DashboardResponse, SummaryMetrics, RocketComparison,
     LaunchMetrics, StarlinkData, RocketSpecification,
-    RocketSuccessRate, YearlyLaunchMetric, LaunchFrequency,
-    OrbitalParameters, SatellitePosition
+    RocketSuccessRate, YearlyLaunchMetric, LaunchFrequency
 )
 from app.models.launch import Launch
 from app.models.rocket import Rocket
-from app.models.startlink import StarlinkSatellite
-from app.clients.spacex import SpaceXClient
+from app.clients.cache import DatasetMirror, mirror
+from app.clients.starlink_store import StarlinkStore
+from app.core.dates import SECONDS_PER_DAY, civil_from_days
+from app.core.exceptions import ValidationException
+from app.core.log import ErrorBatch, error_kind
+from app.core.offload import offload
+from app.services.launches import get_launch_engine
+
+logger = logging.getLogger(__name__)
+
+# Colecciones del mirror que necesita cada sección
+SECTION_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "summary_metrics": ("rockets", "launches", "starlink"),
+    "rocket_comparison": ("rockets", "launches"),
+    "launch_metrics": ("launches",),
+    "starlink_data": ("starlink",),
+}
+SECTIONS = tuple(SECTION_DEPENDENCIES)
+STARLINK_FLOATS = ("height_km", "velocity_kms", "latitude", "longitude")
+
+
+def parse_sections(sections: Optional[str]) -> Tuple[str, ...]:
+    """`?sections=` as a tuple in canonical order; empty means every section."""
+    requested = {s.strip() for s in (sections or "").split(",") if s.strip()}
+    unknown = sorted(requested - set(SECTIONS))
+    if unknown:
+        raise ValidationException(f"Unknown dashboard section '{unknown[0]}'")
+    return tuple(s for s in SECTIONS if s in requested) if requested else SECTIONS
+
+
+def section_collections(sections: Iterable[str]) -> Set[str]:
+    """Mirrored collections the given sections depend on."""
+    return {name for section in sections for name in SECTION_DEPENDENCIES[section]}
+
+
+def omitted_sections(sections: Iterable[str]) -> Set[str]:
+    return set(SECTIONS) - set(sections)
+
 
 class DashboardService:
-    def __init__(self, spacex_client: SpaceXClient):
-        self.client = spacex_client
+    def __init__(self, dataset: DatasetMirror = mirror):
+        self.dataset = dataset
 
     async def get_dashboard_data(
         self,
@@ -27,100 +63,79 @@ class DashboardService:
         starlink_page: int = 1,
         starlink_limit: int = 300,
         starlink_version: Optional[str] = None,
+        sections: Iterable[str] = SECTIONS,
     ) -> DashboardResponse:
         """
-        Fetch and aggregate dashboard data from SpaceX API with optional filters.
+        Aggregate dashboard data from the local dataset mirror with optional filters.
+        Only the collections and aggregations the requested `sections` need are touched.
         """
         try:
-            # Construir la query dinámica para lanzamientos
-            launch_query = {}
-            
-            # Filtrar por rocket_id (si se provee)
-            if rocket_id:
-                launch_query["rocket"] = rocket_id
-
-            # Filtrar por rango de años (si se provee)
-            # Se utiliza formato 'YYYY-MM-DD' para la comparación
-            # con un campo 'date_utc' en la base de datos.
-            if start_year or end_year:
-                date_filter = {}
-                if start_year:
-                    date_filter["$gte"] = f"{start_year}-01-01T00:00:00.000Z"
-                if end_year:
-                    date_filter["$lte"] = f"{end_year}-12-31T23:59:59.999Z"
-                launch_query["date_utc"] = date_filter
-
-            # Construir las opciones de paginación y orden
-            launch_options = {
-                "limit": limit,
-                "page": page,
-                "sort": {"date_utc": -1},
-                "pagination": True
-            }
-            if launch_query:
-                launch_options["query"] = launch_query
-
-            # Obtener lista de cohetes
-            rockets_data = await self.client.get_rockets()
-            rockets = [Rocket(**rocket) for rocket in rockets_data]
-
-            # Obtener lanzamientos con las opciones y filtros
-            launches_response = await self.client.get_launches(
-                query=launch_query,
-                options=launch_options
-            )
-            launches_data = (
-                launches_response["docs"] 
-                if isinstance(launches_response, dict) else launches_response
-            )
-            launches = [Launch(**launch) for launch in launches_data]
-
-            starlink_query = {}
-            if starlink_version:
-                starlink_query["version"] = starlink_version
-                
-            starlink_options = {
-                "page": starlink_page,
-                "limit": starlink_limit,
-                "sort": {"launch_date_utc": -1},
-                "pagination": True
-            }
-
-            starlink_response = await self.client.get_starlink_satellites(
-                query=starlink_query,
-                options=starlink_options
-            )
-
-            if isinstance(starlink_response, dict) and "docs" in starlink_response:
-                starlink_data = starlink_response["docs"]
-            else: 
-                starlink_data = starlink_response
-            starlink = []
-
-            for sat in starlink_data:
-                if isinstance(sat, dict):
-                    try:
-                        starlink.append(StarlinkSatellite(**sat))
-                    except Exception as e:
-                        print(f"Error processing Starlink satellite: {e}")
-                    
-            starlink_processed = await self._get_starlink_data(starlink)
-
-            return DashboardResponse(
-                summary_metrics=await self._get_summary_metrics(rockets, launches, starlink),
-                rocket_comparison=await self._get_rocket_comparisons(rockets, launches),
-                launch_metrics=await self._get_launch_metrics(launches),
-                starlink_data= starlink_processed
-            )
+            sections = set(sections)
+            needed = section_collections(sections)
+            response = DashboardResponse()
+
+            rockets: List[Rocket] = []
+            if "rockets" in needed:
+                # Obtener lista de cohetes
+                rockets_snapshot = await self.dataset.rockets.get()
+                rockets = [Rocket(**rocket) for rocket in rockets_snapshot.docs]
+
+            launches: List[Launch] = []
+            if "launches" in needed:
+                # Los lanzamientos se filtran y paginan sobre los índices locales
+                engine = await get_launch_engine(self.dataset)
+                launch_filters = {}
+
+                # Filtrar por rocket_id (si se provee)
+                if rocket_id:
+                    launch_filters["rocket"] = rocket_id
+
+                # Filtrar por rango de años (si se provee)
+                if start_year or end_year:
+                    launch_filters["year"] = engine.years_between(start_year, end_year)
+
+                launches = engine.query(
+                    filters=launch_filters,
+                    sort="date_unix",
+                    order="desc",
+                    limit=limit,
+                    offset=(page - 1) * limit
+                ).docs
+
+            starlink_page_rows: List[int] = []
+            if "starlink" in needed:
+                starlink_snapshot = await self.dataset.starlink.get()
+                store = starlink_snapshot.docs
+                starlink_rows = starlink_snapshot.derive("dashboard_starlink_order", lambda s: starlink_order(s.docs))
+                if starlink_version:
+                    versions = store.categories["version"]
+                    code = versions.code(starlink_version)
+                    starlink_rows = [row for row in starlink_rows if versions.codes[row] == code]
+
+                start = max(starlink_page - 1, 0) * starlink_limit
+                starlink_page_rows = starlink_rows[start:start + starlink_limit]
+
+            if "summary_metrics" in sections:
+                response.summary_metrics = await self._get_summary_metrics(
+                    rockets, launches, len(starlink_page_rows)
+                )
+            if "rocket_comparison" in sections:
+                response.rocket_comparison = await self._get_rocket_comparisons(rockets, launches)
+            if "launch_metrics" in sections:
+                response.launch_metrics = await self._get_launch_metrics(launches)
+            if "starlink_data" in sections:
+                response.starlink_data = await self._get_starlink_data(store, starlink_page_rows)
+
+            return response
         except Exception as e:
-            print(f"Error in get_dashboard_data: {str(e)}")
+            logger.error("Error in get_dashboard_data: %s", e)
             raise
 
     async def _get_summary_metrics(
         self, 
         rockets: List[Rocket], 
         launches: List[Launch], 
-        starlink: List[StarlinkSatellite]
+        starlink_count: int
     ) -> SummaryMetrics:
         completed_launches = [l for l in launches if not l.upcoming]
         successful_launches = [l for l in completed_launches if l.success]
@@ -132,7 +147,7 @@ class DashboardService:
                 if completed_launches else 0
             ),
             active_rockets=len([r for r in rockets if r.active]),
-            total_starlink_satellites=len(starlink)
+            total_starlink_satellites=starlink_count
         )
 
     async def _get_rocket_comparisons(
@@ -143,6 +158,7 @@ class DashboardService:
         specifications = []
         success_rates = []
 
+        errors = ErrorBatch(logger, "dashboard.rocket_comparison")
         for rocket in rockets:
             try:
                 specifications.append(
@@ -170,8 +186,9 @@ class DashboardService:
                     )
                 )
             except Exception as e:
-                print(f"Error processing rocket {rocket.name}: {e}")
+                errors.add(e, rocket.id)
                 continue
+        errors.flush()
 
         return RocketComparison(
             specifications=specifications,
@@ -179,102 +196,166 @@ class DashboardService:
         )
 
     async def _get_launch_metrics(self, launches: List[Launch]) -> LaunchMetrics:
-        launches_by_year = defaultdict(lambda: {"total": 0, "successful": 0})
-        frequency_data = defaultdict(int)
+        rows = [(launch.id, launch.date_unix, launch.success, launch.upcoming) for launch in launches]
+        by_year, frequency, failed = await offload(summarize_launches, rows, size=len(rows))
 
-        for launch in launches:
-            try:
-                if launch.upcoming:
-                    continue
+        errors = ErrorBatch(logger, "dashboard.launch_metrics")
+        for kind, launch_id in failed:
+            errors.add_kind(kind, launch_id)
+        errors.flush()
 
-                date = datetime.fromisoformat(launch.date_utc.replace("Z", "+00:00"))
-                year = date.year
-                
-                launches_by_year[year]["total"] += 1
-                if launch.success:
-                    launches_by_year[year]["successful"] += 1
-                
-                month_key = date.strftime("%Y-%m")
-                frequency_data[month_key] += 1
-            except Exception as e:
-                print(f"Error processing launch {launch.id}: {e}")
+        return LaunchMetrics(
+            by_year=[
+                YearlyLaunchMetric(year=year, total=total, successful=successful, rate=rate)
+                for year, total, successful, rate in by_year
+            ],
+            frequency_data=[
+                LaunchFrequency(date=date, launches=count)
+                for date, count in frequency
+            ]
+        )
+
+    async def _get_starlink_data(self, store: StarlinkStore, rows: Sequence[int]) -> StarlinkData:
+        columns = page_columns(store, rows)
+        orbital, positions = await offload(summarize_starlink, columns, size=len(rows))
+
+        # Una sola validación (en pydantic-core) para toda la sección
+        return StarlinkData.model_validate({
+            "orbital_parameters": [
+                {
+                    "version": version,
+                    "count": count,
+                    "average_height_km": average_height,
+                    "average_velocity_kms": average_velocity
+                }
+                for version, count, average_height, average_velocity in orbital
+            ],
+            "satellite_positions": [
+                {"id": satellite_id, "latitude": latitude, "longitude": longitude, "height_km": height}
+                for satellite_id, latitude, longitude, height in positions
+            ]
+        })
+
+
+def starlink_order(store: StarlinkStore) -> List[int]:
+    """
+    Rows in the order the dashboard pages Starlink: latest launch first
+    (spaceTrack.LAUNCH_DATE, the field the old upstream sort targeted),
+    satellites without a launch date last, ties by id.
+    """
+    ids = store.texts["id"]
+    launch_dates = store.categories["LAUNCH_DATE"]
+    rows = sorted(range(len(store)), key=lambda row: ids[row] or "")
+    # sort() es estable también con reverse=True: los empates quedan por id
+    rows.sort(key=lambda row: launch_dates[row] or "", reverse=True)
+    return rows
+
+
+def page_columns(store: StarlinkStore, rows: Sequence[int]) -> Dict[str, Any]:
+    """
+    The columns the Starlink section reads for `rows`, as typed arrays and
+    packed bytes: cheap to pickle for a worker process.
+    """
+    ids = store.texts["id"]
+    versions = store.categories["version"]
+    packed = bytearray()
+    offsets = array("I", [0])
+    for row in rows:
+        packed += ids.data[ids.offsets[row]:ids.offsets[row + 1]]
+        offsets.append(len(packed))
+    return {
+        "ids": bytes(packed),
+        "id_offsets": offsets,
+        "version_codes": array(versions.codes.typecode, (versions.codes[row] for row in rows)),
+        "version_values": versions.values,
+        **{name: array("d", (store.floats[name][row] for row in rows)) for name in STARLINK_FLOATS},
+    }
+
+
+def summarize_launches(
+    rows: List[Tuple[str, int, Optional[bool], bool]]
+) -> Tuple[List[tuple], List[Tuple[str, int]], List[Tuple[str, str]]]:
+    """
+    Completed launches per year (year, total, successful, rate) and per
+    month ("YYYY-MM", count), from (id, date_unix, success, upcoming) rows.
+    Pure, so offload() can run it in a worker; failures come back as
+    (error kind, launch id).
+    """
+    launches_by_year = defaultdict(lambda: {"total": 0, "successful": 0})
+    frequency_data = defaultdict(int)
+    failed = []
+
+    for launch_id, date_unix, success, upcoming in rows:
+        try:
+            if upcoming:
                 continue
 
-        yearly_data = [
-            YearlyLaunchMetric(
-                year=year,
-                total=data["total"],
-                successful=data["successful"],
-                rate=(
-                    data["successful"] / data["total"] * 100 
-                    if data["total"] > 0 else 0
-                )
-            )
-            for year, data in launches_by_year.items()
-        ]
+            # Aritmética entera sobre date_unix en vez de parsear date_utc
+            year, month, _ = civil_from_days(date_unix // SECONDS_PER_DAY)
 
-        frequency = [
-            LaunchFrequency(date=date, launches=count)
-            for date, count in frequency_data.items()
-        ]
+            launches_by_year[year]["total"] += 1
+            if success:
+                launches_by_year[year]["successful"] += 1
 
-        return LaunchMetrics(
-            by_year=sorted(yearly_data, key=lambda x: x.year),
-            frequency_data=sorted(frequency, key=lambda x: x.date)
+            month_key = f"{year:04d}-{month:02d}"
+            frequency_data[month_key] += 1
+        except Exception as e:
+            failed.append((error_kind(e), launch_id))
+            continue
+
+    yearly_data = [
+        (
+            year,
+            data["total"],
+            data["successful"],
+            data["successful"] / data["total"] * 100 if data["total"] > 0 else 0
         )
+        for year, data in sorted(launches_by_year.items())
+    ]
+    return yearly_data, sorted(frequency_data.items()), failed
 
-    async def _get_starlink_data(self, starlink: List[StarlinkSatellite]) -> StarlinkData:
-        versions = defaultdict(lambda: {
-            "count": 0,
-            "height_sum": 0,
-            "velocity_sum": 0
-        })
 
-        positions = []
+def summarize_starlink(columns: Dict[str, Any]) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Per-version (version, count, average height, average velocity) and the
+    (id, latitude, longitude, height) of satellites with a known position,
+    from page_columns() (NaN = missing). Pure, so offload() can run it in a
+    worker.
+    """
+    versions_data = defaultdict(lambda: {
+        "count": 0,
+        "height_sum": 0,
+        "velocity_sum": 0
+    })
+    positions = []
+    ids, offsets, values = columns["ids"], columns["id_offsets"], columns["version_values"]
 
-        for satellite in starlink:
-            try:
-                if satellite.version:
-                    version_data = versions[satellite.version]
-                    version_data["count"] += 1
-                    
-                    if satellite.height_km:
-                        version_data["height_sum"] += satellite.height_km
-                    if satellite.velocity_kms:
-                        version_data["velocity_sum"] += satellite.velocity_kms
-
-                if all(v is not None for v in [
-                    satellite.latitude,
-                    satellite.longitude,
-                    satellite.height_km
-                ]):
-                    positions.append(
-                        SatellitePosition(
-                            id=satellite.id,
-                            latitude=satellite.latitude,
-                            longitude=satellite.longitude,
-                            height_km=satellite.height_km
-                        )
-                    )
-            except Exception as e:
-                print(f"Error processing satellite {satellite.id}: {e}")
-                continue
+    for row, (code, height, velocity, latitude, longitude) in enumerate(zip(
+        columns["version_codes"], columns["height_km"], columns["velocity_kms"],
+        columns["latitude"], columns["longitude"]
+    )):
+        version = values[code]
+        if version:
+            version_data = versions_data[version]
+            version_data["count"] += 1
 
-        orbital_parameters = [
-            OrbitalParameters(
-                version=version,
-                count=data["count"],
-                average_height_km=(
-                    data["height_sum"] / data["count"] if data["count"] > 0 else 0
-                ),
-                average_velocity_kms=(
-                    data["velocity_sum"] / data["count"] if data["count"] > 0 else 0
-                )
-            )
-            for version, data in versions.items()
-        ]
+            # NaN != NaN: cuenta como ausente, igual que 0
+            if height and height == height:
+                version_data["height_sum"] += height
+            if velocity and velocity == velocity:
+                version_data["velocity_sum"] += velocity
+
+        if latitude == latitude and longitude == longitude and height == height:
+            satellite_id = ids[offsets[row]:offsets[row + 1]].decode()
+            positions.append((satellite_id, latitude, longitude, height))
 
-        return StarlinkData(
-            orbital_parameters=orbital_parameters,
-            satellite_positions=positions
+    orbital_parameters = [
+        (
+            version,
+            data["count"],
+            data["height_sum"] / data["count"] if data["count"] > 0 else 0,
+            data["velocity_sum"] / data["count"] if data["count"] > 0 else 0
         )
+        for version, data in versions_data.items()
+    ]
+    return orbital_parameters, positions
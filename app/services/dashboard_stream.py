@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+from app.clients.cache import DatasetMirror, mirror
+from app.core.config import settings
+from app.services.dashboard import DashboardService, SECTIONS, omitted_sections, section_collections
+
+logger = logging.getLogger(__name__)
+
+# Cuántos eventos puede acumular un suscriptor lento antes de resincronizarlo
+SUBSCRIBER_QUEUE_SIZE = 16
+
+ParamsKey = Tuple[Tuple[str, Any], ...]
+
+
+def params_key(params: Dict[str, Any]) -> ParamsKey:
+    return tuple(sorted(params.items()))
+
+
+class DashboardChannel:
+    """
+    One dashboard computation shared by every subscriber asking for the same
+    parameters. Recomputes only when the dataset version changes and
+    publishes just the sections whose content changed.
+    """
+
+    def __init__(self, params: Dict[str, Any], dataset: DatasetMirror, interval: float):
+        self.params = params
+        self.dataset = dataset
+        self.interval = interval
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.sections: Optional[Dict[str, Any]] = None
+        self.version: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def snapshot_event(self) -> Dict[str, Any]:
+        return {"event": "snapshot", "version": self.version, "sections": self.sections}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def add(self, queue: asyncio.Queue) -> None:
+        self.subscribers.add(queue)
+        if self.sections is not None:
+            queue.put_nowait(self.snapshot_event())
+
+    def _deliver(self, queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # El suscriptor se atrasó: se descartan sus deltas y recibe el estado completo
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(self.snapshot_event())
+
+    async def refresh(self) -> None:
+        requested = self.params.get("sections", SECTIONS)
+        version = await self.dataset.version(section_collections(requested))
+        if version == self.version:
+            return
+
+        response = await DashboardService(self.dataset).get_dashboard_data(**self.params)
+        sections = response.model_dump(mode="json", exclude=omitted_sections(requested))
+        first = self.sections is None
+        changed = {
+            name: value for name, value in sections.items()
+            if first or self.sections.get(name) != value
+        }
+        self.sections, self.version = sections, version
+
+        if first:
+            event = self.snapshot_event()
+        elif changed:
+            event = {"event": "delta", "version": version, "sections": changed}
+        else:
+            return
+
+        for queue in list(self.subscribers):
+            self._deliver(queue, event)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error refreshing dashboard stream: %s", e)
+            await asyncio.sleep(self.interval)
+
+
+class DashboardBroadcaster:
+    """Fans out dashboard updates from one computation per parameter set."""
+
+    def __init__(
+        self,
+        dataset: DatasetMirror = mirror,
+        interval: float = settings.DASHBOARD_STREAM_INTERVAL_SECONDS
+    ):
+        self.dataset = dataset
+        self.interval = interval
+        self._channels: Dict[ParamsKey, DashboardChannel] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, params: Dict[str, Any]) -> AsyncIterator[asyncio.Queue]:
+        key = params_key(params)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = DashboardChannel(params, self.dataset, self.interval)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        channel.add(queue)
+        channel.start()
+        try:
+            yield queue
+        finally:
+            channel.subscribers.discard(queue)
+            if not channel.subscribers:
+                channel.stop()
+                self._channels.pop(key, None)
+
+
+broadcaster = DashboardBroadcaster()
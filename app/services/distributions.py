@@ -0,0 +1,262 @@
+import asyncio
+import hashlib
+import math
+import zlib
+from array import array
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.clients.cache import DatasetMirror, mirror
+from app.clients.starlink_store import StarlinkStore
+from app.core.config import settings
+from app.core.dates import SECONDS_PER_DAY
+from app.core.offload import offload
+from app.core.sketch import QuantileSketch
+from app.models.distribution import DistributionSummary
+from app.models.launch import Launch
+from app.services.launches import launch_engine
+from app.services.orbits import ALTITUDE_STEPS_KM, EARTH_RADIUS_KM, INCLINATION_STEPS_DEG, check_band_steps
+
+GROUPINGS = ("version", "shell")
+# Métrica publicada -> columna del store
+METRICS = {"height_km": "height_km", "velocity_kms": "velocity_kms", "period_min": "PERIOD"}
+CHUNK_FLOATS = tuple(METRICS.values()) + ("SEMIMAJOR_AXIS", "INCLINATION")
+# Grupo que acumula todas las filas en cada agrupación
+ALL = "all"
+
+# agrupación -> grupo -> métrica -> sketch (en "shell", los grupos son bandas finas (altitud, inclinación))
+Sketches = Dict[str, Dict[Any, Dict[str, QuantileSketch]]]
+
+
+def chunk_rows(store: StarlinkStore, chunks: int) -> List[List[int]]:
+    """
+    Rows of the store split into `chunks` groups by a hash of the satellite
+    id, each ordered by id: a satellite stays in the same chunk across
+    syncs, so adding or removing one only changes its own chunk.
+    """
+    ids = store.texts["id"]
+    groups: List[List[int]] = [[] for _ in range(chunks)]
+    for row in sorted(range(len(store)), key=lambda row: ids[row] or ""):
+        groups[zlib.crc32((ids[row] or "").encode()) % chunks].append(row)
+    return groups
+
+
+def chunk_columns(store: StarlinkStore, rows: List[int]) -> Dict[str, Any]:
+    """Compact copy of the columns sketch_starlink_chunk needs for `rows`."""
+    versions = store.categories["version"]
+    # Códigos locales al chunk, en orden de nombre: el digest no depende del orden del store
+    names = sorted({versions[row] or "" for row in rows})
+    local = {name: code for code, name in enumerate(names)}
+    return {
+        "versions": array("I", (local[versions[row] or ""] for row in rows)),
+        "version_names": dict(enumerate(names)),
+        **{name: array("d", (store.floats[name][row] for row in rows)) for name in CHUNK_FLOATS},
+    }
+
+
+def shell_label(altitude_band: int, inclination_band: int, altitude_step_km: float, inclination_step_deg: float) -> str:
+    return (
+        f"{altitude_band * altitude_step_km:g}-{(altitude_band + 1) * altitude_step_km:g}km/"
+        f"{round(inclination_band * inclination_step_deg, 6):g}-{round((inclination_band + 1) * inclination_step_deg, 6):g}deg"
+    )
+
+
+def sketch_starlink_chunk(columns: Dict[str, Any], relative_accuracy: float) -> Sketches:
+    """
+    Sketch height, velocity and period of one chunk per version and per
+    fine shell band (ALTITUDE_STEPS_KM[0] x INCLINATION_STEPS_DEG[0]).
+    Pure, so it can run in a worker process; satellites without orbital
+    elements only count per version.
+    """
+    sketches: Sketches = {grouping: {} for grouping in GROUPINGS}
+
+    def group(grouping: str, name: Any) -> Dict[str, QuantileSketch]:
+        groups = sketches[grouping]
+        if name not in groups:
+            groups[name] = {metric: QuantileSketch(relative_accuracy) for metric in METRICS}
+        return groups[name]
+
+    values = list(zip(*(columns[column] for column in METRICS.values())))
+    for row, code in enumerate(columns["versions"]):
+        targets = [
+            group("version", ALL),
+            group("version", columns["version_names"][code] or "unknown"),
+        ]
+        semimajor_axis, inclination = columns["SEMIMAJOR_AXIS"][row], columns["INCLINATION"][row]
+        if semimajor_axis == semimajor_axis and inclination == inclination:
+            band = (
+                math.floor((semimajor_axis - EARTH_RADIUS_KM) / ALTITUDE_STEPS_KM[0]),
+                math.floor(inclination / INCLINATION_STEPS_DEG[0]),
+            )
+            targets += [group("shell", ALL), group("shell", band)]
+        for metric, value in zip(METRICS, values[row]):
+            for target in targets:
+                target[metric].add(value)
+    return sketches
+
+
+def merge_sketches(target: Dict[Any, Dict[str, QuantileSketch]], name: Any, metrics: Dict[str, QuantileSketch]) -> None:
+    """Add one group's sketches into `target[name]`; `metrics` is left untouched."""
+    if name not in target:
+        target[name] = {metric: QuantileSketch(sketch.relative_accuracy) for metric, sketch in metrics.items()}
+    for metric, sketch in metrics.items():
+        target[name][metric].merge(sketch)
+
+
+class _ChunkCache:
+    """
+    LRU of chunk sketches keyed by a digest of the chunk's columns: a
+    refresh that leaves most of the constellation unchanged only
+    re-sketches the chunks whose rows moved.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: "OrderedDict[str, Sketches]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Sketches]:
+        sketches = self._entries.get(key)
+        if sketches is not None:
+            self._entries.move_to_end(key)
+        return sketches
+
+    def put(self, key: str, sketches: Sketches) -> None:
+        self._entries[key] = sketches
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+
+_chunks = _ChunkCache(settings.SKETCH_CHUNK_CACHE)
+
+
+def chunk_digest(columns: Dict[str, Any], *params: Any) -> str:
+    digest = hashlib.blake2b(repr(params).encode(), digest_size=16)
+    for name, column in columns.items():
+        digest.update(name.encode())
+        digest.update(column.tobytes() if isinstance(column, array) else repr(sorted(column.items())).encode())
+    return digest.hexdigest()
+
+
+def summarize(sketches: Dict[str, QuantileSketch]) -> Dict[str, DistributionSummary]:
+    return {metric: DistributionSummary(**sketch.summary()) for metric, sketch in sketches.items()}
+
+
+class StarlinkDistributions:
+    """
+    Mergeable sketches of one Starlink snapshot. Version summaries are
+    computed once; shell summaries once per accepted band width, merging
+    the fine shell sketches, so a distribution query is a dictionary lookup.
+    """
+
+    def __init__(self, sketches: Sketches, relative_accuracy: float):
+        self.sketches = sketches
+        self.relative_accuracy = relative_accuracy
+        self._summaries: Dict[Tuple[str, float, float], Dict[str, Dict[str, DistributionSummary]]] = {
+            ("version", 0, 0): {name: summarize(metrics) for name, metrics in sorted(sketches["version"].items())}
+        }
+
+    def summaries(
+        self,
+        group_by: str,
+        altitude_step_km: float = 10,
+        inclination_step_deg: float = 1
+    ) -> Dict[str, Dict[str, DistributionSummary]]:
+        """Summaries per group; shell bands must be one of ALTITUDE_STEPS_KM x INCLINATION_STEPS_DEG."""
+        if group_by == "version":
+            return self._summaries[("version", 0, 0)]
+        check_band_steps(altitude_step_km, inclination_step_deg)
+
+        key = (group_by, altitude_step_km, inclination_step_deg)
+        if key not in self._summaries:
+            altitude_factor = round(altitude_step_km / ALTITUDE_STEPS_KM[0])
+            inclination_factor = round(inclination_step_deg / INCLINATION_STEPS_DEG[0])
+            shells: Dict[str, Dict[str, QuantileSketch]] = {}
+            for band, metrics in self.sketches["shell"].items():
+                if band == ALL:
+                    name = ALL
+                else:
+                    name = shell_label(
+                        band[0] // altitude_factor, band[1] // inclination_factor,
+                        altitude_step_km, inclination_step_deg
+                    )
+                merge_sketches(shells, name, metrics)
+            self._summaries[key] = {name: summarize(metrics) for name, metrics in sorted(shells.items())}
+        return self._summaries[key]
+
+
+async def build_starlink_distributions(store: StarlinkStore) -> StarlinkDistributions:
+    """
+    Sketch the store in SKETCH_CHUNKS chunks of stable ids (each offloaded,
+    reused from the chunk cache when its rows did not change) and merge them.
+    """
+    relative_accuracy = settings.SKETCH_RELATIVE_ACCURACY
+    keys: List[str] = []
+    found: Dict[str, Sketches] = {}
+    pending: Dict[str, Any] = {}
+    for rows in chunk_rows(store, settings.SKETCH_CHUNKS):
+        if not rows:
+            continue
+        columns = chunk_columns(store, rows)
+        key = chunk_digest(columns, relative_accuracy)
+        keys.append(key)
+        cached = _chunks.get(key)
+        if cached is not None:
+            found[key] = cached
+        elif key not in pending:
+            pending[key] = offload(sketch_starlink_chunk, columns, relative_accuracy, size=len(rows))
+
+    # Los chunks nuevos se calculan a la vez (en paralelo con OFFLOAD_MODE=process)
+    for key, sketches in zip(pending, await asyncio.gather(*pending.values())):
+        _chunks.put(key, sketches)
+        found[key] = sketches
+
+    merged: Sketches = {grouping: {} for grouping in GROUPINGS}
+    for key in keys:
+        for grouping, groups in found[key].items():
+            for name, metrics in groups.items():
+                merge_sketches(merged[grouping], name, metrics)
+    return StarlinkDistributions(merged, relative_accuracy)
+
+
+async def get_starlink_distributions(dataset: DatasetMirror = mirror) -> StarlinkDistributions:
+    """Distributions of the current Starlink snapshot (rebuilt only on new versions)."""
+    snapshot = await dataset.starlink.get()
+    key = f"distributions:{settings.SKETCH_RELATIVE_ACCURACY}"
+    distributions = snapshot.derived(key)
+    if distributions is None:
+        # Dos peticiones simultáneas pueden construirlo dos veces; la segunda reutiliza los chunks
+        distributions = await build_starlink_distributions(snapshot.docs)
+        distributions = snapshot.derive(key, lambda _: distributions)
+    return distributions
+
+
+class LaunchIntervals:
+    """Sketches of the days between consecutive completed launches, per rocket and overall."""
+
+    def __init__(self, launches: List[Launch], relative_accuracy: Optional[float] = None):
+        self.relative_accuracy = relative_accuracy or settings.SKETCH_RELATIVE_ACCURACY
+        dates: Dict[str, List[int]] = defaultdict(list)
+        for launch in launches:
+            if not launch.upcoming:
+                dates[launch.rocket].append(launch.date_unix)
+
+        self.rockets: Dict[str, QuantileSketch] = {}
+        for rocket, days in dates.items():
+            days.sort()
+            sketch = QuantileSketch(self.relative_accuracy)
+            sketch.extend((later - earlier) / SECONDS_PER_DAY for earlier, later in zip(days, days[1:]))
+            self.rockets[rocket] = sketch
+
+        self.all = QuantileSketch(self.relative_accuracy)
+        for sketch in self.rockets.values():
+            self.all.merge(sketch)
+        self.summaries = {rocket: DistributionSummary(**sketch.summary()) for rocket, sketch in sorted(self.rockets.items())}
+        self.summary = DistributionSummary(**self.all.summary())
+
+
+async def get_launch_intervals(dataset: DatasetMirror = mirror) -> LaunchIntervals:
+    """Launch intervals for the current launches snapshot (rebuilt only on new versions)."""
+    snapshot = await dataset.launches.get()
+    engine = launch_engine(snapshot)
+    return snapshot.derive("launch_intervals", lambda _: LaunchIntervals(engine.launches))
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.clients.cache import DatasetMirror, mirror
+from app.core.config import settings
+from app.models.startlink import EphemerisPosition, EphemerisResponse
+from app.services.propagation import Constellation, ecef_to_geodetic, teme_to_ecef
+
+logger = logging.getLogger(__name__)
+
+# Satélites y tiempos usados para medir el error de interpolación de cada bloque
+ERROR_CHECK_SATELLITES = 32
+ERROR_CHECK_TIMES = 4
+
+
+def lagrange_weights(x: float, points: int) -> Any:
+    """Lagrange basis weights at `x` for nodes 0..points-1 (x in sample units)."""
+    import numpy as np
+
+    nodes = np.arange(points, dtype=np.float64)
+    weights = np.ones(points)
+    for j in range(points):
+        others = np.delete(nodes, j)
+        weights[j] = np.prod((x - others) / (nodes[j] - others))
+    return weights
+
+
+@dataclass
+class EphemerisBlock:
+    """Earth-fixed positions of every satellite over one aligned time block."""
+    start_unix: int
+    step_seconds: int
+    positions: Any  # float32 (satélites, tiempos, 3), km ECEF
+    valid: Any      # bool (satélites, tiempos)
+    max_error_km: float = 0.0
+
+    @property
+    def times(self) -> Any:
+        import numpy as np
+        return self.start_unix + np.arange(self.positions.shape[1]) * self.step_seconds
+
+
+class EphemerisCache:
+    """
+    Propagated positions in fixed, aligned blocks (EPHEMERIS_BLOCK_SECONDS
+    long, one sample every EPHEMERIS_STEP_SECONDS). Blocks of the horizon
+    kept by the background job (`precompute`) are held apart from the ones
+    requests build outside it, which go to a small LRU of `max_blocks`, so
+    a query for another day cannot evict the horizon.
+
+    Positions are stored Earth-fixed, which does not depend on the observer,
+    so every observer and every window overlapping the same blocks reuses
+    them; only the topocentric transform is per request. Positions between
+    samples are answered by Lagrange interpolation (`interpolate`).
+    """
+
+    def __init__(self, constellation: Constellation, max_blocks: int):
+        self.constellation = constellation
+        self.max_blocks = max_blocks
+        self.step_seconds = settings.EPHEMERIS_STEP_SECONDS
+        self.block_seconds = settings.EPHEMERIS_BLOCK_SECONDS
+        self.points = settings.EPHEMERIS_INTERPOLATION_POINTS
+        self._horizon: Dict[int, EphemerisBlock] = {}
+        self._blocks: "OrderedDict[int, EphemerisBlock]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _build(self, start_unix: int) -> EphemerisBlock:
+        import numpy as np
+
+        times = start_unix + np.arange(self.block_seconds // self.step_seconds) * self.step_seconds
+        positions, _, valid = self.constellation.propagate(times)
+        block = EphemerisBlock(
+            start_unix=start_unix,
+            step_seconds=self.step_seconds,
+            positions=teme_to_ecef(positions, times).astype(np.float32),
+            valid=valid
+        )
+        block.max_error_km = self._measure_error(block)
+        return block
+
+    def _measure_error(self, block: EphemerisBlock) -> float:
+        """
+        Largest interpolation error against direct propagation, sampled at
+        mid-step times (the worst case) inside the block.
+        """
+        import numpy as np
+
+        n_satellites, n_times = block.valid.shape
+        half = self.points // 2
+        if not n_satellites or n_times < self.points:
+            return 0.0
+        rng = np.random.default_rng(block.start_unix)
+        satellites = rng.choice(n_satellites, min(ERROR_CHECK_SATELLITES, n_satellites), replace=False)
+        first_nodes = rng.integers(0, n_times - self.points + 1, ERROR_CHECK_TIMES)
+
+        worst = 0.0
+        weights = lagrange_weights(half - 0.5, self.points)
+        for first in first_nodes.tolist():
+            time_unix = block.start_unix + (first + half - 0.5) * self.step_seconds
+            nodes = block.positions[satellites, first:first + self.points].astype(np.float64)
+            interpolated = np.einsum("j,sjk->sk", weights, nodes)
+            for satellite, position in zip(satellites.tolist(), interpolated):
+                exact, _ = self.constellation.propagate_one(satellite, time_unix)
+                if exact is None or not block.valid[satellite, first:first + self.points].all():
+                    continue
+                exact = teme_to_ecef(exact[None, None, :], np.array([time_unix]))[0, 0]
+                worst = max(worst, float(np.linalg.norm(position - exact)))
+        return worst
+
+    def cached(self, start_unix: int) -> Optional[EphemerisBlock]:
+        with self._lock:
+            block = self._horizon.get(start_unix)
+            if block is None:
+                block = self._blocks.get(start_unix)
+                if block is not None:
+                    self._blocks.move_to_end(start_unix)
+            return block
+
+    def block(self, start_unix: int, keep: bool = True) -> EphemerisBlock:
+        """A cached block, or one built for a request (kept in the LRU unless `keep` is False)."""
+        block = self.cached(start_unix)
+        if block is not None:
+            return block
+        # Se propaga fuera del lock; dos peticiones simultáneas pueden calcular el mismo bloque
+        block = self._build(start_unix)
+        if keep:
+            with self._lock:
+                self._blocks[start_unix] = block
+                while len(self._blocks) > self.max_blocks:
+                    self._blocks.popitem(last=False)
+        return block
+
+    def block_starts(self, start_unix: float, end_unix: float) -> List[int]:
+        first = int(start_unix // self.block_seconds) * self.block_seconds
+        return list(range(first, int(end_unix) + 1, self.block_seconds))
+
+    def precompute(self, start_unix: float, end_unix: float) -> int:
+        """
+        Make the blocks covering [start, end] the horizon: build the missing
+        ones (or adopt them from the request LRU) and drop the horizon blocks
+        that are no longer in it. Returns how many were built.
+        """
+        starts = self.block_starts(start_unix, end_unix)
+        built = 0
+        for block_start in starts:
+            with self._lock:
+                block = self._horizon.get(block_start) or self._blocks.pop(block_start, None)
+            if block is None:
+                block = self._build(block_start)
+                built += 1
+            with self._lock:
+                self._horizon[block_start] = block
+        with self._lock:
+            for block_start in [start for start in self._horizon if start < starts[0]]:
+                del self._horizon[block_start]
+        return built
+
+    def window(self, start_unix: float, end_unix: float) -> Tuple[Any, Any, Any]:
+        """Sample times, positions and validity covering [start, end] from cached blocks."""
+        import numpy as np
+
+        starts = self.block_starts(start_unix, end_unix)
+        # Una ventana que no cabe en el LRU lo vaciaría en orden antes de repetirse: no se cachea
+        keep = sum(self.cached(start) is None for start in starts) <= self.max_blocks
+        blocks = [self.block(block_start, keep) for block_start in starts]
+        times = np.concatenate([block.times for block in blocks])
+        inside = (times >= start_unix - self.step_seconds) & (times <= end_unix + self.step_seconds)
+        positions = np.concatenate([block.positions for block in blocks], axis=1)
+        valid = np.concatenate([block.valid for block in blocks], axis=1)
+        return times[inside], positions[:, inside], valid[:, inside]
+
+    def interpolate(self, satellites: Any, time_unix: float) -> Optional[Tuple[Any, Any, float]]:
+        """
+        Earth-fixed positions of `satellites` at any time from the cached
+        samples around it, their validity and the error bound measured for
+        the blocks used. None if those blocks have not been precomputed.
+        """
+        import numpy as np
+
+        first_node = int(time_unix // self.step_seconds) * self.step_seconds
+        first_node -= (self.points // 2 - 1) * self.step_seconds
+        last_node = first_node + (self.points - 1) * self.step_seconds
+
+        blocks = [self.cached(start) for start in self.block_starts(first_node, last_node)]
+        if any(block is None for block in blocks):
+            return None
+        times = np.concatenate([block.times for block in blocks])
+        lo = int(np.searchsorted(times, first_node))
+        positions = np.concatenate([block.positions[satellites] for block in blocks], axis=1)
+        valid = np.concatenate([block.valid[satellites] for block in blocks], axis=1)
+
+        weights = lagrange_weights((time_unix - first_node) / self.step_seconds, self.points)
+        nodes = positions[:, lo:lo + self.points].astype(np.float64)
+        return (
+            np.einsum("j,sjk->sk", weights, nodes),
+            valid[:, lo:lo + self.points].all(axis=1),
+            max(block.max_error_km for block in blocks)
+        )
+
+
+def positions_at(cache: EphemerisCache, ids: List[str], time_unix: float) -> EphemerisResponse:
+    """
+    Positions of the given satellites at any time: interpolated from the
+    precomputed blocks when they cover it and their measured error is within
+    EPHEMERIS_MAX_ERROR_KM, propagated directly otherwise.
+    """
+    import numpy as np
+
+    constellation = cache.constellation
+    found = [sid for sid in ids if sid in constellation.index]
+    not_found = [sid for sid in ids if sid not in constellation.index]
+    indices = np.array([constellation.index[sid] for sid in found], dtype=np.int64)
+
+    result = cache.interpolate(indices, time_unix) if len(indices) else None
+    if result is not None and result[2] <= settings.EPHEMERIS_MAX_ERROR_KM:
+        positions, valid, error_bound = result
+        source = "interpolated"
+    else:
+        positions = np.zeros((len(indices), 3))
+        valid = np.zeros(len(indices), dtype=bool)
+        for i, index in enumerate(indices.tolist()):
+            position, _ = constellation.propagate_one(index, time_unix)
+            if position is not None:
+                positions[i] = teme_to_ecef(position[None, None, :], np.array([time_unix]))[0, 0]
+                valid[i] = True
+        source, error_bound = "propagated", None
+
+    latitude, longitude, height = ecef_to_geodetic(positions)
+    response = EphemerisResponse(
+        time_unix=time_unix, source=source, error_bound_km=error_bound, positions=[], not_found=not_found
+    )
+    for i, sid in enumerate(found):
+        if not valid[i]:
+            # SGP4 no pudo propagar (p. ej. reentrada)
+            response.not_found.append(sid)
+            continue
+        response.positions.append(
+            EphemerisPosition(
+                satellite=sid,
+                name=constellation.name(indices[i]),
+                latitude=float(latitude[i]),
+                longitude=float(longitude[i]),
+                height_km=float(height[i]),
+                ecef_km=positions[i].tolist()
+            )
+        )
+    return response
+
+
+async def get_ephemeris_cache(dataset: DatasetMirror = mirror) -> EphemerisCache:
+    """Ephemeris cache of the current Starlink snapshot (dropped with the version)."""
+    snapshot = await dataset.starlink.get()
+    constellation = snapshot.derive("constellation", lambda s: Constellation(s.docs))
+    return snapshot.derive("ephemeris", lambda _: EphemerisCache(constellation, settings.EPHEMERIS_REQUEST_BLOCKS))
+
+
+async def run_ephemeris_precompute(dataset: DatasetMirror = mirror) -> None:
+    """
+    Background job: keep the blocks from the current one up to
+    EPHEMERIS_HORIZON_HOURS ahead propagated for the current dataset version.
+    """
+    while True:
+        try:
+            cache = await get_ephemeris_cache(dataset)
+            now = time.time()
+            started = time.perf_counter()
+            built = await asyncio.to_thread(
+                cache.precompute, now, now + settings.EPHEMERIS_HORIZON_HOURS * 3600
+            )
+            if built:
+                logger.info("Precomputed %d ephemeris blocks in %.1fs", built, time.perf_counter() - started)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Error precomputing ephemeris: %s", e)
+        await asyncio.sleep(settings.EPHEMERIS_PRECOMPUTE_INTERVAL_SECONDS)
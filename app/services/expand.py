@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set
+
+from app.clients.cache import MirroredCollection, mirror, references
+from app.clients.spacex import SpaceXClient
+
+logger = logging.getLogger(__name__)
+
+# Campo del lanzamiento -> colección upstream
+EXPANDABLE = {
+    "rocket": "rockets",
+    "launchpad": "launchpads",
+    "payloads": "payloads",
+    "crew": "crew",
+    "ships": "ships",
+    "capsules": "capsules",
+}
+
+
+def _table(collection: str) -> MirroredCollection:
+    return mirror.rockets if collection == "rockets" else references[collection]
+
+
+async def resolve_references(collection: str, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Documents for `ids` from the local lookup table; whatever is not there is
+    fetched with a single upstream `$in` query. Unknown IDs are absent.
+    """
+    ids = list(ids)
+    docs: Dict[str, Dict[str, Any]] = {}
+    snapshot = await _table(collection).get_or_none()
+    if snapshot is not None:
+        by_id = snapshot.by_id()
+        docs.update({ref_id: by_id[ref_id] for ref_id in ids if ref_id in by_id})
+
+    missing = [ref_id for ref_id in ids if ref_id not in docs]
+    if missing:
+        try:
+            async with SpaceXClient() as client:
+                fetched = await client.query_collection(
+                    collection,
+                    query={"_id": {"$in": missing}},
+                    options={"pagination": False}
+                )
+            docs.update({doc["id"]: doc for doc in fetched if "id" in doc})
+        except Exception as e:
+            # Sin upstream se devuelven los IDs sin expandir
+            logger.warning("Error expanding %s: %s", collection, e)
+    return docs
+
+
+async def expand_launches(docs: List[Dict[str, Any]], expand: List[str]) -> List[Dict[str, Any]]:
+    """
+    Replace the referenced IDs of serialized launches with the documents they
+    point to, in place. IDs are deduplicated across all `docs`, so each
+    collection is resolved once per call; unresolved IDs are left as they are.
+    """
+    wanted: Dict[str, Set[str]] = defaultdict(set)
+    for doc in docs:
+        for field in expand:
+            value = doc.get(field)
+            if isinstance(value, str):
+                wanted[EXPANDABLE[field]].add(value)
+            elif isinstance(value, list):
+                wanted[EXPANDABLE[field]].update(v for v in value if isinstance(v, str))
+
+    collections = list(wanted)
+    resolved = dict(zip(
+        collections,
+        await asyncio.gather(*(resolve_references(c, wanted[c]) for c in collections))
+    ))
+
+    for doc in docs:
+        for field in expand:
+            lookup = resolved.get(EXPANDABLE[field], {})
+            value = doc.get(field)
+            if isinstance(value, str):
+                doc[field] = lookup.get(value, value)
+            elif isinstance(value, list):
+                doc[field] = [lookup.get(v, v) if isinstance(v, str) else v for v in value]
+    return docs
@@ -0,0 +1,235 @@
+import csv
+import io
+import math
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.clients.cache import DatasetMirror, mirror
+from app.clients.starlink_store import (
+    SATELLITE_CATEGORIES, SATELLITE_FLOATS, SATELLITE_TEXTS, SPACETRACK_CATEGORIES,
+    SPACETRACK_FLOATS, SPACETRACK_INTS, SPACETRACK_TEXTS, StarlinkStore
+)
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+
+FORMATS = ("csv", "arrow")
+MEDIA_TYPES = {"csv": "text/csv", "arrow": "application/vnd.apache.arrow.stream"}
+# Listas de escalares (payloads, ships...) van en una sola celda
+LIST_SEPARATOR = "|"
+
+# Tipo de cada columna: bool, int, float o str
+Column = Tuple[str, str]
+
+
+def _flatten(value: Any, prefix: str, out: Dict[str, Any]) -> None:
+    """
+    Nested document -> dotted columns: objects recurse (`links.patch.small`),
+    lists of objects are numbered (`cores.0.core`) and lists of scalars are
+    joined into one cell.
+    """
+    if isinstance(value, dict):
+        for name, item in value.items():
+            _flatten(item, f"{prefix}.{name}" if prefix else name, out)
+    elif isinstance(value, list):
+        if any(isinstance(item, dict) for item in value):
+            for index, item in enumerate(value):
+                _flatten(item, f"{prefix}.{index}", out)
+        else:
+            out[prefix] = LIST_SEPARATOR.join(str(item) for item in value)
+    else:
+        out[prefix] = value
+
+
+def _kind(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "str"
+
+
+def _merge_kinds(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    if current is None or current == new:
+        return new or current
+    if new is None:
+        return current
+    if {current, new} == {"int", "float"}:
+        return "float"
+    return "str"
+
+
+class LaunchTable:
+    """
+    Launch documents exported as flat columns. The column list and types
+    are inferred once per snapshot; rows are flattened chunk by chunk.
+    """
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+        kinds: Dict[str, Optional[str]] = {}
+        for doc in docs:
+            flat: Dict[str, Any] = {}
+            _flatten(doc, "", flat)
+            for name, value in flat.items():
+                kinds[name] = _merge_kinds(kinds.get(name), _kind(value))
+        # Columnas siempre nulas se exportan como texto
+        self.columns: List[Column] = [(name, kind or "str") for name, kind in kinds.items()]
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def chunk(self, columns: Sequence[Column], lo: int, hi: int) -> List[List[Any]]:
+        rows = []
+        for doc in self.docs[lo:hi]:
+            flat: Dict[str, Any] = {}
+            _flatten(doc, "", flat)
+            rows.append(flat)
+        values = []
+        for name, kind in columns:
+            column = [row.get(name) for row in rows]
+            if kind == "str":
+                column = [None if value is None else str(value) for value in column]
+            values.append(column)
+        return values
+
+
+class StarlinkTable:
+    """The Starlink column store exported as is, reading its typed columns by slice."""
+
+    def __init__(self, store: StarlinkStore):
+        self.store = store
+        self.columns: List[Column] = (
+            [(name, "str") for name in SATELLITE_TEXTS + SATELLITE_CATEGORIES]
+            + [(name, "float") for name in SATELLITE_FLOATS]
+            + [(f"spaceTrack.{name}", "str") for name in SPACETRACK_TEXTS + SPACETRACK_CATEGORIES]
+            + [(f"spaceTrack.{name}", "float") for name in SPACETRACK_FLOATS]
+            + [(f"spaceTrack.{name}", "int") for name in SPACETRACK_INTS]
+        )
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def chunk(self, columns: Sequence[Column], lo: int, hi: int) -> List[List[Any]]:
+        values = []
+        for name, _ in columns:
+            field = name.split(".", 1)[-1]
+            if field in self.store.floats:
+                # NaN = opcional ausente
+                values.append([None if math.isnan(v) else v for v in self.store.floats[field][lo:hi]])
+            elif field in self.store.ints:
+                values.append(self.store.ints[field][lo:hi].tolist())
+            elif field in self.store.categories:
+                category = self.store.categories[field]
+                values.append([category.values[code] for code in category.codes[lo:hi]])
+            else:
+                values.append([self.store.texts[field][row] for row in range(lo, min(hi, len(self.store)))])
+        return values
+
+
+def select_columns(table: Any, columns: Optional[str]) -> List[Column]:
+    """
+    Columns named in `?columns=` (comma separated), in the order given. A
+    nested prefix selects all its columns (`cores` -> `cores.0.core`, ...).
+    """
+    if not columns:
+        return list(table.columns)
+    selected: Dict[str, str] = {}
+    for requested in (part.strip() for part in columns.split(",")):
+        if not requested:
+            continue
+        matches = [
+            (name, kind) for name, kind in table.columns
+            if name == requested or name.startswith(requested + ".")
+        ]
+        if not matches:
+            raise ValidationException(f"Unknown column '{requested}'")
+        selected.update(matches)
+    return list(selected.items())
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def csv_chunks(table: Any, columns: List[Column], chunk_rows: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    bools = [i for i, (_, kind) in enumerate(columns) if kind == "bool"]
+    for lo in range(0, len(table), chunk_rows):
+        values = table.chunk(columns, lo, lo + chunk_rows)
+        for i in bools:
+            values[i] = [_csv_cell(value) for value in values[i]]
+        writer.writerows(zip(*values))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _Drain:
+    """Write-only file object whose contents are taken after every batch."""
+
+    closed = False
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data: Any) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data, self._buffer = bytes(self._buffer), bytearray()
+        return data
+
+
+def arrow_schema(columns: List[Column]) -> Any:
+    import pyarrow as pa
+
+    types = {"bool": pa.bool_(), "int": pa.int64(), "float": pa.float64(), "str": pa.string()}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def arrow_chunks(table: Any, columns: List[Column], chunk_rows: int, schema: Any) -> Iterator[bytes]:
+    """Arrow IPC stream: the schema, then one record batch per chunk."""
+    import pyarrow as pa
+
+    sink = _Drain()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for lo in range(0, len(table), chunk_rows):
+            values = table.chunk(columns, lo, lo + chunk_rows)
+            arrays = [pa.array(column, type=field.type) for column, field in zip(values, schema)]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+
+def export_chunks(table: Any, format: str, columns: List[Column]) -> Iterator[bytes]:
+    """Encoded chunks of EXPORT_CHUNK_ROWS rows; only one chunk is in memory at a time."""
+    chunk_rows = settings.EXPORT_CHUNK_ROWS
+    if format == "arrow":
+        # El schema (y el import de pyarrow) antes de empezar a responder
+        return arrow_chunks(table, columns, chunk_rows, arrow_schema(columns))
+    return csv_chunks(table, columns, chunk_rows)
+
+
+async def get_launch_table(dataset: DatasetMirror = mirror) -> LaunchTable:
+    snapshot = await dataset.launches.get()
+    return snapshot.derive("export_table", lambda s: LaunchTable(s.docs))
+
+
+async def get_starlink_table(dataset: DatasetMirror = mirror) -> StarlinkTable:
+    snapshot = await dataset.starlink.get()
+    return snapshot.derive("export_table", lambda s: StarlinkTable(s.docs))
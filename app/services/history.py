@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from app.clients.cache import DatasetMirror, Snapshot, mirror
+from app.clients.tle_history import TleHistory, encode_element_sets
+from app.core.dates import SECONDS_PER_DAY
+from app.core.log import ErrorBatch
+from app.core.subsystems import subsystems
+from app.models.startlink import (
+    DecayHistoryResponse, DecayPoint, ElementSetAtResponse, HistoricalElementSet, HistoricalPosition
+)
+from app.services.orbits import EARTH_RADIUS_KM
+from app.services.propagation import ecef_to_geodetic, julian_dates, teme_to_ecef
+
+logger = logging.getLogger(__name__)
+
+
+async def record_starlink_history(snapshot: Snapshot) -> None:
+    """
+    Add the element sets of a new Starlink snapshot to the history. Parsing,
+    packing and the disk write run in threads; registered as a Starlink
+    refresh hook in the app lifespan.
+    """
+    history = subsystems.tle_history.get()
+    records, failed = await asyncio.to_thread(encode_element_sets, snapshot.docs)
+    errors = ErrorBatch(logger, "tle_history")
+    for kind, sat_id in failed:
+        errors.add_kind(kind, sat_id)
+    errors.flush()
+    payload = await asyncio.to_thread(history.extend, records)
+    await asyncio.to_thread(history.write, payload)
+
+
+async def get_tle_history(dataset: DatasetMirror = mirror) -> TleHistory:
+    """The element set history, after making sure the current Starlink sync was recorded."""
+    await dataset.starlink.get_or_none()
+    return subsystems.tle_history.get()
+
+
+def element_set(history: TleHistory, row: int) -> HistoricalElementSet:
+    line1, line2 = history.tle(row)
+    epoch = datetime.fromtimestamp(history.epochs[row], tz=timezone.utc)
+    return HistoricalElementSet(
+        norad_id=history.norad[row],
+        element_set_no=history.element_set[row],
+        epoch=epoch.replace(tzinfo=None).isoformat(),
+        epoch_unix=history.epochs[row],
+        altitude_km=history.floats["SEMIMAJOR_AXIS"][row] - EARTH_RADIUS_KM,
+        perigee_km=history.floats["PERIAPSIS"][row],
+        apogee_km=history.floats["APOAPSIS"][row],
+        inclination=history.floats["INCLINATION"][row],
+        eccentricity=history.floats["ECCENTRICITY"][row],
+        mean_motion=history.floats["MEAN_MOTION"][row],
+        bstar=history.floats["BSTAR"][row],
+        tle_line1=line1,
+        tle_line2=line2,
+    )
+
+
+def propagate_row(history: TleHistory, row: int, time_unix: float) -> Optional[HistoricalPosition]:
+    """SGP4 position of one historical element set at `time_unix`, or None if SGP4 fails."""
+    import numpy as np
+    from sgp4.api import Satrec
+
+    satrec = Satrec.twoline2rv(*history.tle(row))
+    jd, fr = julian_dates([time_unix])
+    error, position, _ = satrec.sgp4(jd[0], fr[0])
+    if error:
+        return None
+    ecef = teme_to_ecef(np.array([position]), np.array([time_unix]))[0]
+    lat, lon, height = ecef_to_geodetic(ecef)
+    return HistoricalPosition(
+        latitude=float(lat),
+        longitude=float(lon),
+        height_km=float(height),
+        ecef_km=[float(v) for v in ecef],
+    )
+
+
+def element_set_at(history: TleHistory, norad_id: int, time_unix: float) -> Optional[ElementSetAtResponse]:
+    """The element set in force at `time_unix` (latest epoch not after it) and the position it gives."""
+    row = history.valid_at(norad_id, time_unix)
+    if row is None:
+        return None
+    return ElementSetAtResponse(
+        time_unix=time_unix,
+        age_days=(time_unix - history.epochs[row]) / SECONDS_PER_DAY,
+        element_set=element_set(history, row),
+        position=propagate_row(history, row, time_unix),
+    )
+
+
+def decay_history(
+    history: TleHistory,
+    norad_id: int,
+    start_unix: Optional[float] = None,
+    end_unix: Optional[float] = None,
+    max_points: int = 500
+) -> DecayHistoryResponse:
+    """
+    Mean, perigee and apogee altitude of every element set in the range.
+    The trend uses every element set; `points` is thinned evenly to
+    `max_points` (first and last always kept).
+    """
+    rows = history.between(norad_id, start_unix, end_unix)
+    altitude = [history.floats["SEMIMAJOR_AXIS"][row] - EARTH_RADIUS_KM for row in rows]
+    days = [history.epochs[row] / SECONDS_PER_DAY for row in rows]
+
+    rate = None
+    if len(rows) > 1:
+        mean_day = sum(days) / len(days)
+        mean_altitude = sum(altitude) / len(altitude)
+        spread = sum((day - mean_day) ** 2 for day in days)
+        if spread:
+            rate = sum((day - mean_day) * (alt - mean_altitude) for day, alt in zip(days, altitude)) / spread
+
+    picked: List[int] = list(range(len(rows)))
+    if len(rows) > max_points:
+        step = (len(rows) - 1) / (max_points - 1)
+        picked = sorted({round(i * step) for i in range(max_points)})
+    return DecayHistoryResponse(
+        norad_id=norad_id,
+        element_sets=len(rows),
+        altitude_change_km=altitude[-1] - altitude[0] if rows else None,
+        decay_rate_km_per_day=rate,
+        points=[
+            DecayPoint(
+                epoch_unix=history.epochs[rows[i]],
+                element_set_no=history.element_set[rows[i]],
+                altitude_km=altitude[i],
+                perigee_km=history.floats["PERIAPSIS"][rows[i]],
+                apogee_km=history.floats["APOAPSIS"][rows[i]],
+            )
+            for i in picked
+        ],
+    )
@@ -0,0 +1,234 @@
+import base64
+import json
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.clients.cache import DatasetMirror, Snapshot, mirror
+from app.clients.spacex import OBJECT_ID, SpaceXClient
+from app.core.dates import SECONDS_PER_DAY, civil_from_days
+from app.core.exceptions import ValidationException
+from app.core.log import ErrorBatch
+from app.models.launch import Launch
+
+logger = logging.getLogger(__name__)
+
+SORT_FIELDS = ("date_unix", "flight_number")
+HASH_FIELDS = ("rocket", "launchpad", "year", "success", "upcoming")
+
+
+@dataclass
+class LaunchPage:
+    docs: List[Launch]
+    total: int
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(sort: str, key: Any, launch_id: str) -> str:
+    raw = json.dumps([sort, key, launch_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, key, launch_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValidationException("Invalid cursor")
+    if not isinstance(key, int) or not isinstance(launch_id, str):
+        raise ValidationException("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValidationException(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    return key, launch_id
+
+
+class LaunchQueryEngine:
+    """
+    In-memory query engine over the mirrored launches.
+
+    Keeps one sorted index per sortable field, so a page is found with a
+    bisect on the cursor instead of skipping `offset` rows, plus hash
+    indexes (value -> row set) for the filterable fields.
+    """
+
+    def __init__(self, launches: List[Launch]):
+        self.launches = launches
+        self._by_id: Dict[str, Launch] = {launch.id: launch for launch in launches}
+        self._keys: Dict[str, List[Tuple[Any, str]]] = {}
+        self._rows: Dict[str, List[int]] = {}
+        self._hash: Dict[str, Dict[Any, Set[int]]] = {
+            name: defaultdict(set) for name in HASH_FIELDS
+        }
+
+        for sort in SORT_FIELDS:
+            ordered = sorted(
+                (getattr(launch, sort), launch.id, row)
+                for row, launch in enumerate(launches)
+            )
+            self._keys[sort] = [(key, launch_id) for key, launch_id, _ in ordered]
+            self._rows[sort] = [row for _, _, row in ordered]
+
+        for row, launch in enumerate(launches):
+            self._hash["rocket"][launch.rocket].add(row)
+            self._hash["launchpad"][launch.launchpad].add(row)
+            self._hash["year"][civil_from_days(launch.date_unix // SECONDS_PER_DAY)[0]].add(row)
+            self._hash["success"][launch.success].add(row)
+            self._hash["upcoming"][launch.upcoming].add(row)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "LaunchQueryEngine":
+        launches = []
+        errors = ErrorBatch(logger, "launch_validation")
+        for launch_data in snapshot.docs:
+            try:
+                launches.append(Launch(**launch_data))
+            except Exception as e:
+                errors.add(e, launch_data.get("id"))
+                continue
+        errors.flush()
+        return cls(launches)
+
+    def get(self, launch_id: str) -> Optional[Launch]:
+        return self._by_id.get(launch_id)
+
+    @property
+    def years(self) -> List[int]:
+        return sorted(self._hash["year"])
+
+    def years_between(self, start_year: Optional[int], end_year: Optional[int]) -> List[int]:
+        return [
+            year for year in self.years
+            if (start_year is None or year >= start_year)
+            and (end_year is None or year <= end_year)
+        ]
+
+    def _match(self, filters: Dict[str, Any]) -> Optional[Set[int]]:
+        """
+        Intersect the hash indexes for the given filters. A list value means
+        "any of". Returns None when no filter applies (every row matches).
+        """
+        candidates: Optional[Set[int]] = None
+        postings = []
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name not in self._hash:
+                raise ValidationException(f"Cannot filter launches by '{name}'")
+            index = self._hash[name]
+            if isinstance(value, (list, tuple, set)):
+                rows = set().union(*(index.get(v, set()) for v in value))
+            else:
+                rows = index.get(value, set())
+            postings.append(rows)
+
+        # Empezar por el índice más selectivo hace más baratas las intersecciones
+        for rows in sorted(postings, key=len):
+            candidates = set(rows) if candidates is None else candidates & rows
+            if not candidates:
+                break
+        return candidates
+
+    def filter_rows(self, filters: Dict[str, Any]) -> Optional[Set[int]]:
+        """Rows (positions in `launches`) matching the filters; None when no filter applies."""
+        return self._match(filters)
+
+    def query(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: str = "date_unix",
+        order: str = "desc",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> LaunchPage:
+        if sort not in SORT_FIELDS:
+            raise ValidationException(f"Cannot sort launches by '{sort}'")
+
+        candidates = self._match(filters or {})
+        total = len(self.launches) if candidates is None else len(candidates)
+
+        keys = self._keys[sort]
+        rows = self._rows[sort]
+        after = decode_cursor(cursor, sort) if cursor else None
+
+        if order == "asc":
+            start = bisect_right(keys, tuple(after)) if after else 0
+            positions: Iterable[int] = range(start, len(rows))
+        else:
+            start = bisect_left(keys, tuple(after)) if after else len(rows)
+            positions = range(start - 1, -1, -1)
+
+        docs: List[Launch] = []
+        last_position = None
+        has_next = False
+        skip = max(offset, 0)
+        for position in positions:
+            row = rows[position]
+            if candidates is not None and row not in candidates:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            if len(docs) == limit:
+                has_next = True
+                break
+            docs.append(self.launches[row])
+            last_position = position
+
+        next_cursor = None
+        if has_next and last_position is not None:
+            key, launch_id = keys[last_position]
+            next_cursor = encode_cursor(sort, key, launch_id)
+
+        return LaunchPage(docs=docs, total=total, next_cursor=next_cursor)
+
+
+def launch_engine(snapshot: Snapshot) -> LaunchQueryEngine:
+    """
+    Query engine of a launches snapshot. Structures that store engine rows
+    must be derived from the same snapshot object as the engine they use.
+    """
+    return snapshot.derive("launch_engine", LaunchQueryEngine.from_snapshot)
+
+
+async def get_launch_engine(dataset: DatasetMirror = mirror) -> LaunchQueryEngine:
+    """Query engine for the current launches snapshot (rebuilt only on new versions)."""
+    return launch_engine(await dataset.launches.get())
+
+
+async def get_launches_by_ids(ids: List[str]) -> Dict[str, Launch]:
+    """
+    Resolve launch IDs from the mirror, or with a single upstream `$in` query
+    when the mirror cannot be loaded. Unknown or malformed IDs are absent
+    from the result.
+    """
+    found: Dict[str, Launch] = {}
+    snapshot = await mirror.launches.get_or_none()
+    if snapshot is not None:
+        # El mirror es la colección completa: lo que no está no existe upstream
+        engine = launch_engine(snapshot)
+        for launch_id in ids:
+            launch = engine.get(launch_id)
+            if launch is not None:
+                found[launch_id] = launch
+        return found
+
+    valid = [launch_id for launch_id in ids if OBJECT_ID.match(launch_id)]
+    if valid:
+        async with SpaceXClient() as client:
+            launches_data = await client.get_launches(
+                query={"_id": {"$in": valid}},
+                options={"pagination": False}
+            )
+        errors = ErrorBatch(logger, "launch_validation")
+        for launch_data in launches_data:
+            try:
+                launch = Launch(**launch_data)
+                found[launch.id] = launch
+            except Exception as e:
+                errors.add(e, launch_data.get("id"))
+                continue
+        errors.flush()
+    return found
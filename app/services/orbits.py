@@ -0,0 +1,154 @@
+from typing import Any, Dict, List
+
+from app.clients.cache import DatasetMirror, mirror
+from app.clients.starlink_store import StarlinkStore
+from app.core.exceptions import ValidationException
+from app.models.startlink import ElementDistribution, OrbitalShell
+
+EARTH_RADIUS_KM = 6378.137
+
+SHELL_ELEMENTS = (
+    "SEMIMAJOR_AXIS", "INCLINATION", "PERIOD", "APOAPSIS", "PERIAPSIS", "ECCENTRICITY",
+)
+QUANTILES = (0.25, 0.5, 0.75)
+# Anchos de banda aceptados: un conjunto fijo acota lo que se cachea por versión.
+# Cada uno es múltiplo del primero, así que las distribuciones se agregan desde los sketches finos
+ALTITUDE_STEPS_KM = (5, 10, 25, 50, 100)
+INCLINATION_STEPS_DEG = (0.5, 1, 2, 5, 10)
+
+
+def check_band_steps(altitude_step_km: float, inclination_step_deg: float) -> None:
+    """Raise ValidationException unless both widths are in ALTITUDE_STEPS_KM / INCLINATION_STEPS_DEG."""
+    if altitude_step_km not in ALTITUDE_STEPS_KM:
+        raise ValidationException(f"altitude_step_km must be one of {', '.join(f'{s:g}' for s in ALTITUDE_STEPS_KM)}")
+    if inclination_step_deg not in INCLINATION_STEPS_DEG:
+        raise ValidationException(f"inclination_step_deg must be one of {', '.join(f'{s:g}' for s in INCLINATION_STEPS_DEG)}")
+
+
+class OrbitalElements:
+    """
+    numpy views over the StarlinkStore columns used by the orbital analytics.
+    The float and int columns are wrapped without copying.
+    """
+
+    def __init__(self, store: StarlinkStore):
+        # numpy se importa sólo cuando alguien pide analítica orbital
+        import numpy as np
+
+        def view(column) -> Any:
+            return np.frombuffer(column, dtype=column.typecode) if len(column) else np.empty(0, column.typecode)
+
+        self.size = len(store)
+        self.elements = {name: view(store.floats[name]) for name in SHELL_ELEMENTS}
+        self.altitude_km = self.elements["SEMIMAJOR_AXIS"] - EARTH_RADIUS_KM
+        self.decayed = view(store.ints["DECAYED"]) != 0
+        versions = store.categories["version"]
+        self.version_codes = view(versions.codes).astype(np.int64)
+        self.version_names = list(versions.values)
+
+
+def _grouped_quantiles(np: Any, values: Any, groups: Any, counts: Any, starts: Any) -> Dict[str, Any]:
+    """Per-group min/quantiles/max with linear interpolation, all groups at once."""
+    ordered = values[np.lexsort((values, groups))]
+    result = {
+        "min": ordered[starts],
+        "max": ordered[starts + counts - 1],
+    }
+    for name, q in zip(("p25", "median", "p75"), QUANTILES):
+        position = starts + q * (counts - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        result[name] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+    result["mean"] = np.bincount(groups, weights=values) / counts
+    return result
+
+
+def compute_shells(
+    data: OrbitalElements,
+    altitude_step_km: float,
+    inclination_step_deg: float,
+    include_decayed: bool = False,
+    min_satellites: int = 1
+) -> List[OrbitalShell]:
+    """
+    Cluster satellites into shells: bands of mean altitude (semi-major axis
+    minus Earth radius) crossed with bands of inclination. Every statistic is
+    computed with grouped array operations over the whole constellation.
+    """
+    import numpy as np
+
+    mask = np.ones(data.size, dtype=bool) if include_decayed else ~data.decayed
+    if not mask.any():
+        return []
+
+    altitude_band = np.floor(data.altitude_km[mask] / altitude_step_km).astype(np.int64)
+    inclination_band = np.floor(data.elements["INCLINATION"][mask] / inclination_step_deg).astype(np.int64)
+    bands, groups = np.unique(
+        np.stack([altitude_band, inclination_band], axis=1), axis=0, return_inverse=True
+    )
+    groups = groups.reshape(-1)
+    n_shells = len(bands)
+    counts = np.bincount(groups, minlength=n_shells)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    decayed = np.bincount(groups, weights=data.decayed[mask], minlength=n_shells).astype(np.int64)
+    n_versions = len(data.version_names)
+    by_version = np.bincount(
+        groups * n_versions + data.version_codes[mask], minlength=n_shells * n_versions
+    ).reshape(n_shells, n_versions)
+    stats = {
+        name: _grouped_quantiles(np, column[mask], groups, counts, starts)
+        for name, column in data.elements.items()
+    }
+
+    shells = []
+    for shell in np.argsort(-counts, kind="stable"):
+        if counts[shell] < min_satellites:
+            break
+        altitude, inclination = bands[shell]
+        shells.append(
+            OrbitalShell(
+                altitude_km=[altitude * altitude_step_km, (altitude + 1) * altitude_step_km],
+                inclination_deg=[
+                    round(inclination * inclination_step_deg, 6),
+                    round((inclination + 1) * inclination_step_deg, 6)
+                ],
+                satellites=int(counts[shell]),
+                active=int(counts[shell] - decayed[shell]),
+                decayed=int(decayed[shell]),
+                by_version={
+                    data.version_names[code] or "unknown": int(count)
+                    for code, count in enumerate(by_version[shell]) if count
+                },
+                elements={
+                    name: ElementDistribution(
+                        **{stat: float(values[shell]) for stat, values in element_stats.items()}
+                    )
+                    for name, element_stats in stats.items()
+                }
+            )
+        )
+    return shells
+
+
+async def get_starlink_shells(
+    dataset: DatasetMirror = mirror,
+    altitude_step_km: float = 10,
+    inclination_step_deg: float = 1,
+    include_decayed: bool = False,
+    min_satellites: int = 1
+) -> List[OrbitalShell]:
+    """
+    Shells for the current Starlink snapshot, cached per version and band
+    widths (one of ALTITUDE_STEPS_KM x INCLINATION_STEPS_DEG).
+    """
+    check_band_steps(altitude_step_km, inclination_step_deg)
+    snapshot = await dataset.starlink.get()
+    data = snapshot.derive("orbital_elements", lambda s: OrbitalElements(s.docs))
+    key = f"shells:{altitude_step_km:g}:{inclination_step_deg:g}:{include_decayed}"
+    shells = snapshot.derive(
+        key,
+        lambda _: compute_shells(data, altitude_step_km, inclination_step_deg, include_decayed)
+    )
+    # Ordenadas por satélites: min_satellites sólo corta la lista cacheada
+    return [shell for shell in shells if shell.satellites >= min_satellites]
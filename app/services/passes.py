@@ -0,0 +1,157 @@
+from typing import Any, List, Tuple
+
+from app.models.startlink import SatellitePass
+from app.services.ephemeris import EphemerisCache
+from app.services.propagation import geodetic_to_ecef, teme_to_ecef
+
+# Resolución del refinado exacto de salida/culminación/puesta
+FINE_STEP_SECONDS = 1.0
+
+
+def _enu_basis(np: Any, lat_deg: float, lon_deg: float) -> Any:
+    lat, lon = np.radians(lat_deg), np.radians(lon_deg)
+    return np.array([
+        [-np.sin(lon), np.cos(lon), 0.0],
+        [-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)],
+        [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)],
+    ])
+
+
+def look_angles(np: Any, positions_ecef: Any, observer: Any, basis: Any) -> Tuple[Any, Any]:
+    """Elevation and azimuth (degrees) of Earth-fixed positions shaped (..., 3)."""
+    east, north, up = np.moveaxis((positions_ecef - observer) @ basis.T, -1, 0)
+    elevation = np.degrees(np.arctan2(up, np.hypot(east, north)))
+    azimuth = np.mod(np.degrees(np.arctan2(east, north)), 360.0)
+    return elevation, azimuth
+
+
+def predict_passes(
+    ephemeris: EphemerisCache,
+    lat: float,
+    lon: float,
+    alt_km: float,
+    start_unix: float,
+    end_unix: float,
+    min_elevation: float,
+    limit: int
+) -> Tuple[List[SatellitePass], int]:
+    """
+    Passes above `min_elevation` for an observer, in rise-time order, and the
+    number of satellites that rise at all in the window.
+
+    Elevations of the whole constellation come from the cached Earth-fixed
+    ephemeris in one array operation; only candidate passes, in rise order until
+    `limit` are kept, are propagated again at FINE_STEP_SECONDS to time the events.
+    """
+    import numpy as np
+
+    constellation = ephemeris.constellation
+    observer = geodetic_to_ecef(lat, lon, alt_km)
+    basis = _enu_basis(np, lat, lon)
+
+    times, positions, valid = ephemeris.window(start_unix, end_unix)
+    elevation, _ = look_angles(np, positions, observer.astype(np.float32), basis.astype(np.float32))
+    above = (elevation >= min_elevation) & valid
+
+    # Flancos por satélite: +1 al subir por encima del mínimo, -1 al bajar
+    edges = np.diff(np.pad(above.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    sats, first = np.nonzero(edges == 1)
+    _, after = np.nonzero(edges == -1)
+    n_times = len(times)
+
+    # Descartar pasos que terminan antes de la ventana o empiezan después
+    in_window = (times[after - 1] >= start_unix - ephemeris.step_seconds) & (times[first] <= end_unix)
+    sats, first, after = sats[in_window], first[in_window], after[in_window]
+    visible = len(np.unique(sats))
+
+    order = np.argsort(times[first], kind="stable")
+    passes = []
+    for sat, lo, hi in zip(sats[order].tolist(), first[order].tolist(), after[order].tolist()):
+        peak = lo + int(np.argmax(elevation[sat, lo:hi]))
+        refined = _refine_pass(
+            np, constellation, sat, times, lo, hi, peak, n_times, observer, basis, min_elevation
+        )
+        rise, culmination, setting = refined
+        # El límite se aplica tras descartar los pasos que el refinado deja fuera de la ventana
+        if (setting is not None and setting[0] < start_unix) or (rise is not None and rise[0] > end_unix):
+            continue
+        if rise is not None and rise[0] < start_unix:
+            rise = None
+        if setting is not None and setting[0] > end_unix:
+            setting = None
+        if culmination[0] < start_unix or culmination[0] > end_unix:
+            # El punto más alto dentro de la ventana es uno de sus bordes
+            edge = start_unix if culmination[0] < start_unix else end_unix
+            culmination = _exact_look(np, constellation, sat, np.array([edge]), observer, basis)[0]
+        passes.append(
+            SatellitePass(
+                satellite=constellation.satellite_id(sat),
+                name=constellation.name(sat),
+                rise_unix=rise[0] if rise else None,
+                rise_azimuth=rise[2] if rise else None,
+                culmination_unix=culmination[0],
+                max_elevation=culmination[1],
+                culmination_azimuth=culmination[2],
+                set_unix=setting[0] if setting else None,
+                set_azimuth=setting[2] if setting else None
+            )
+        )
+        if len(passes) == limit:
+            break
+    return passes, visible
+
+
+def _exact_look(np: Any, constellation: Any, sat: int, times: Any, observer: Any, basis: Any) -> List[Tuple[float, float, float]]:
+    positions, ok = constellation.propagate_satellite(sat, times)
+    elevation, azimuth = look_angles(np, teme_to_ecef(positions, times), observer, basis)
+    elevation = np.where(ok, elevation, -90.0)
+    return list(zip(times.tolist(), elevation.tolist(), azimuth.tolist()))
+
+
+def _crossing(samples: List[Tuple[float, float, float]], threshold: float, rising: bool):
+    """Interpolated time/azimuth where elevation crosses `threshold`."""
+    for before, after in zip(samples, samples[1:]):
+        if (before[1] < threshold <= after[1]) if rising else (before[1] >= threshold > after[1]):
+            fraction = (threshold - before[1]) / (after[1] - before[1])
+            return (
+                before[0] + fraction * (after[0] - before[0]),
+                threshold,
+                after[2] if rising else before[2]
+            )
+    return samples[-1] if rising else samples[0]
+
+
+def _refine_pass(
+    np: Any,
+    constellation: Any,
+    sat: int,
+    times: Any,
+    lo: int,
+    hi: int,
+    peak: int,
+    n_times: int,
+    observer: Any,
+    basis: Any,
+    min_elevation: float
+):
+    """Exact rise, culmination and set around the coarse samples, in one propagation."""
+    spans = []
+    if lo > 0:
+        spans.append(("rise", times[lo - 1], times[lo]))
+    spans.append(("peak", times[max(peak - 1, 0)], times[min(peak + 1, n_times - 1)]))
+    if hi < n_times:
+        spans.append(("set", times[hi - 1], times[hi]))
+
+    fine = [np.arange(begin, end + FINE_STEP_SECONDS / 2, FINE_STEP_SECONDS) for _, begin, end in spans]
+    samples = _exact_look(np, constellation, sat, np.concatenate(fine), observer, basis)
+
+    events = {}
+    offset = 0
+    for (name, _, _), span_times in zip(spans, fine):
+        span = samples[offset:offset + len(span_times)]
+        offset += len(span_times)
+        if name == "peak":
+            events[name] = max(span, key=lambda sample: sample[1])
+        else:
+            events[name] = _crossing(span, min_elevation, rising=name == "rise")
+    return events.get("rise"), events["peak"], events.get("set")
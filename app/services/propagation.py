@@ -0,0 +1,163 @@
+import logging
+from typing import Any, List, Tuple
+
+from app.clients.cache import DatasetMirror, mirror
+from app.clients.starlink_store import StarlinkStore
+from app.core.log import ErrorBatch
+
+logger = logging.getLogger(__name__)
+
+# Día juliano del 1970-01-01T00:00:00Z
+JD_UNIX_EPOCH = 2440587.5
+
+# Elipsoide WGS84
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+
+
+def julian_dates(times_unix: Any) -> Tuple[Any, Any]:
+    """Split unix timestamps into the (jd, fraction) pairs SGP4 expects."""
+    import numpy as np
+
+    days = np.asarray(times_unix, dtype=np.float64) / 86400.0
+    whole = np.floor(days)
+    return JD_UNIX_EPOCH + whole, days - whole
+
+
+def gmst(times_unix: Any) -> Any:
+    """Greenwich mean sidereal angle (radians, IAU 1982) at unix timestamps."""
+    import numpy as np
+
+    jd, fr = julian_dates(times_unix)
+    t = ((jd - 2451545.0) + fr) / 36525.0
+    seconds = (
+        67310.54841 + (876600.0 * 3600 + 8640184.812866) * t
+        + 0.093104 * t ** 2 - 6.2e-6 * t ** 3
+    )
+    return np.mod(np.radians(seconds / 240.0), 2 * np.pi)
+
+
+def teme_to_ecef(positions: Any, times_unix: Any) -> Any:
+    """
+    Rotate TEME positions shaped (..., times, 3) into the Earth-fixed frame.
+    Polar motion is ignored (well under a kilometre).
+    """
+    import numpy as np
+
+    theta = gmst(times_unix)
+    cos, sin = np.cos(theta), np.sin(theta)
+    x, y = positions[..., 0], positions[..., 1]
+    return np.stack([cos * x + sin * y, -sin * x + cos * y, positions[..., 2]], axis=-1)
+
+
+def ecef_to_geodetic(positions: Any) -> Tuple[Any, Any, Any]:
+    """Latitude, longitude (degrees) and height (km) of Earth-fixed positions shaped (..., 3)."""
+    import numpy as np
+
+    x, y, z = positions[..., 0], positions[..., 1], positions[..., 2]
+    e2 = WGS84_F * (2 - WGS84_F)
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - e2))
+    # Pocas iteraciones bastan para precisión submétrica en LEO
+    for _ in range(4):
+        n = WGS84_A_KM / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+        height = p / np.cos(lat) - n
+        lat = np.arctan2(z, p * (1 - e2 * n / (n + height)))
+    n = WGS84_A_KM / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+    height = p / np.cos(lat) - n
+    return np.degrees(lat), np.degrees(np.arctan2(y, x)), height
+
+
+def geodetic_to_ecef(lat_deg: float, lon_deg: float, alt_km: float = 0.0) -> Any:
+    import numpy as np
+
+    lat, lon = np.radians(lat_deg), np.radians(lon_deg)
+    e2 = WGS84_F * (2 - WGS84_F)
+    n = WGS84_A_KM / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+    return np.array([
+        (n + alt_km) * np.cos(lat) * np.cos(lon),
+        (n + alt_km) * np.cos(lat) * np.sin(lon),
+        (n * (1 - e2) + alt_km) * np.sin(lat),
+    ])
+
+
+class Constellation:
+    """
+    SGP4 records for every non-decayed satellite of a StarlinkStore, ready
+    for batched propagation. `rows` maps each position back to the store.
+    """
+
+    def __init__(self, store: StarlinkStore):
+        import numpy as np
+        from sgp4.api import Satrec, SatrecArray
+
+        rows: List[int] = []
+        self.satrecs = []
+        decayed = store.ints["DECAYED"]
+        errors = ErrorBatch(logger, "tle_parse")
+        for row in range(len(store)):
+            if decayed[row]:
+                continue
+            try:
+                satrec = Satrec.twoline2rv(store.texts["TLE_LINE1"][row], store.texts["TLE_LINE2"][row])
+            except Exception as e:
+                errors.add(e, store.texts["id"][row])
+                continue
+            self.satrecs.append(satrec)
+            rows.append(row)
+        errors.flush()
+
+        self.store = store
+        self.rows = np.array(rows, dtype=np.int64)
+        self.index = {store.texts["id"][row]: i for i, row in enumerate(rows)}
+        self.array = SatrecArray(self.satrecs) if self.satrecs else None
+        self.perigee_km = np.frombuffer(store.floats["PERIAPSIS"], dtype="d")[self.rows] if rows else np.empty(0)
+        self.apogee_km = np.frombuffer(store.floats["APOAPSIS"], dtype="d")[self.rows] if rows else np.empty(0)
+
+    def __len__(self) -> int:
+        return len(self.satrecs)
+
+    def satellite_id(self, index: int) -> str:
+        return self.store.texts["id"][self.rows[index]]
+
+    def name(self, index: int) -> str:
+        return self.store.texts["OBJECT_NAME"][self.rows[index]]
+
+    def propagate(self, times_unix: Any) -> Tuple[Any, Any, Any]:
+        """
+        TEME positions (km) and velocities (km/s) of every satellite at every
+        time, shaped (satellites, times, 3), plus a (satellites, times) mask
+        of successful propagations.
+        """
+        import numpy as np
+
+        jd, fr = julian_dates(times_unix)
+        if self.array is None:
+            empty = np.empty((0, len(jd), 3))
+            return empty, empty, np.empty((0, len(jd)), dtype=bool)
+        errors, positions, velocities = self.array.sgp4(jd, fr)
+        return positions, velocities, errors == 0
+
+    def propagate_satellite(self, index: int, times_unix: Any) -> Tuple[Any, Any]:
+        """TEME positions of one satellite at many times, plus the success mask."""
+        import numpy as np
+
+        jd, fr = julian_dates(times_unix)
+        errors, positions, _ = self.satrecs[index].sgp4_array(jd, fr)
+        return np.asarray(positions), errors == 0
+
+    def propagate_one(self, index: int, time_unix: float) -> Tuple[Any, Any]:
+        """Position and velocity of a single satellite, or None on error."""
+        import numpy as np
+
+        jd, fr = julian_dates([time_unix])
+        error, position, velocity = self.satrecs[index].sgp4(jd[0], fr[0])
+        if error:
+            return None, None
+        return np.array(position), np.array(velocity)
+
+
+async def get_constellation(dataset: DatasetMirror = mirror) -> Constellation:
+    """SGP4 records for the current Starlink snapshot (parsed once per version)."""
+    snapshot = await dataset.starlink.get()
+    return snapshot.derive("constellation", lambda s: Constellation(s.docs))
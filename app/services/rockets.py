@@ -0,0 +1,43 @@
+import logging
+from typing import Dict, List
+
+from app.clients.cache import mirror
+from app.clients.spacex import OBJECT_ID, SpaceXClient
+from app.core.log import ErrorBatch
+from app.models.rocket import Rocket
+
+logger = logging.getLogger(__name__)
+
+
+async def get_rockets_by_ids(ids: List[str]) -> Dict[str, Rocket]:
+    """
+    Resolve rocket IDs from the mirror, or with a single upstream `$in` query
+    when the mirror cannot be loaded. Unknown or malformed IDs are absent
+    from the result.
+    """
+    docs: Dict[str, Dict] = {}
+    snapshot = await mirror.rockets.get_or_none()
+    if snapshot is not None:
+        # El mirror es la colección completa: lo que no está no existe upstream
+        by_id = snapshot.by_id()
+        docs.update({rocket_id: by_id[rocket_id] for rocket_id in ids if rocket_id in by_id})
+    else:
+        valid = [rocket_id for rocket_id in ids if OBJECT_ID.match(rocket_id)]
+        if valid:
+            async with SpaceXClient() as client:
+                rockets_data = await client.query_rockets(
+                    query={"_id": {"$in": valid}},
+                    options={"pagination": False}
+                )
+            docs.update({rocket["id"]: rocket for rocket in rockets_data if "id" in rocket})
+
+    found: Dict[str, Rocket] = {}
+    errors = ErrorBatch(logger, "rocket_validation")
+    for rocket_id, rocket_data in docs.items():
+        try:
+            found[rocket_id] = Rocket(**rocket_data)
+        except Exception as e:
+            errors.add(e, rocket_id)
+            continue
+    errors.flush()
+    return found
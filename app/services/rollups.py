@@ -0,0 +1,129 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from app.clients.cache import DatasetMirror, mirror
+from app.core.dates import SECONDS_PER_DAY, civil_from_days, days_from_civil
+from app.models.launch import Launch, LaunchRollupBucket
+from app.services.launches import launch_engine
+
+RESOLUTIONS = ("week", "month", "quarter", "year")
+
+
+def bucket_key(resolution: str, days: int) -> int:
+    """Sortable integer key of the bucket containing `days`."""
+    if resolution == "week":
+        # Semanas ISO (lunes); el 1970-01-01 fue jueves
+        return days - (days + 3) % 7
+    year, month, _ = civil_from_days(days)
+    if resolution == "month":
+        return year * 12 + month - 1
+    if resolution == "quarter":
+        return year * 4 + (month - 1) // 3
+    return year
+
+
+def bucket_start(resolution: str, key: int) -> int:
+    """First day (days since epoch) of a bucket."""
+    if resolution == "week":
+        return key
+    if resolution == "month":
+        return days_from_civil(key // 12, key % 12 + 1, 1)
+    if resolution == "quarter":
+        return days_from_civil(key // 4, key % 4 * 3 + 1, 1)
+    return days_from_civil(key, 1, 1)
+
+
+def bucket_label(resolution: str, key: int) -> str:
+    if resolution == "week":
+        year, month, day = civil_from_days(key)
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    if resolution == "month":
+        return f"{key // 12:04d}-{key % 12 + 1:02d}"
+    if resolution == "quarter":
+        return f"{key // 4:04d}-Q{key % 4 + 1}"
+    return f"{key:04d}"
+
+
+class _Series:
+    """Non-empty buckets of one resolution, sorted by key."""
+
+    def __init__(self, counts: Dict[int, Dict[str, List[int]]]):
+        self.keys = sorted(counts)
+        # Por bucket: rocket -> [total, exitosos]
+        self.by_rocket = [
+            {rocket: tuple(pair) for rocket, pair in counts[key].items()}
+            for key in self.keys
+        ]
+        self.totals = [
+            [sum(c[0] for c in rockets.values()), sum(c[1] for c in rockets.values())]
+            for rockets in self.by_rocket
+        ]
+
+
+class LaunchRollups:
+    """
+    Completed-launch counts pre-aggregated at week, month, quarter and year
+    resolution, total and per rocket. Buckets come from `date_unix` with
+    integer arithmetic; range queries are two bisects over the bucket keys.
+    """
+
+    def __init__(self, launches: List[Launch]):
+        counts = {
+            resolution: defaultdict(lambda: defaultdict(lambda: [0, 0]))
+            for resolution in RESOLUTIONS
+        }
+        for launch in launches:
+            if launch.upcoming:
+                continue
+            days = launch.date_unix // SECONDS_PER_DAY
+            for resolution in RESOLUTIONS:
+                entry = counts[resolution][bucket_key(resolution, days)][launch.rocket]
+                entry[0] += 1
+                if launch.success:
+                    entry[1] += 1
+
+        self._series = {resolution: _Series(counts[resolution]) for resolution in RESOLUTIONS}
+
+    def query(
+        self,
+        resolution: str,
+        start_days: Optional[int] = None,
+        end_days: Optional[int] = None,
+        rocket: Optional[str] = None
+    ) -> List[LaunchRollupBucket]:
+        """Buckets overlapping [start_days, end_days] (inclusive, days since epoch)."""
+        series = self._series[resolution]
+        lo = 0 if start_days is None else bisect_left(series.keys, bucket_key(resolution, start_days))
+        hi = len(series.keys) if end_days is None else bisect_right(series.keys, bucket_key(resolution, end_days))
+
+        buckets = []
+        for index in range(lo, hi):
+            if rocket is None:
+                total, successful = series.totals[index]
+                by_rocket = {rocket_id: counts[0] for rocket_id, counts in series.by_rocket[index].items()}
+            else:
+                total, successful = series.by_rocket[index].get(rocket, (0, 0))
+                if not total:
+                    continue
+                # Con ?rocket= el desglose sólo muestra ese cohete, igual que los totales
+                by_rocket = {rocket: total}
+            key = series.keys[index]
+            buckets.append(
+                LaunchRollupBucket(
+                    bucket=bucket_label(resolution, key),
+                    start_unix=bucket_start(resolution, key) * SECONDS_PER_DAY,
+                    total=total,
+                    successful=successful,
+                    rate=successful / total * 100 if total else 0,
+                    by_rocket=by_rocket
+                )
+            )
+        return buckets
+
+
+async def get_launch_rollups(dataset: DatasetMirror = mirror) -> LaunchRollups:
+    """Rollups for the current launches snapshot (rebuilt only on new versions)."""
+    snapshot = await dataset.launches.get()
+    engine = launch_engine(snapshot)
+    return snapshot.derive("launch_rollups", lambda _: LaunchRollups(engine.launches))
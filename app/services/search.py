@@ -0,0 +1,143 @@
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.clients.cache import DatasetMirror, mirror
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+from app.models.launch import Launch
+from app.services.launches import LaunchQueryEngine, launch_engine
+
+TOKEN = re.compile(r"[a-z0-9]+")
+# Peso de cada campo en el ranking: el nombre de la misión pesa más que el texto libre
+FIELD_WEIGHTS = {"name": 3.0, "reason": 2.0, "details": 1.0}
+# Parámetros BM25
+K1 = 1.2
+B = 0.75
+# Un término que sólo coincide por prefijo puntúa menos que la palabra exacta
+PREFIX_PENALTY = 0.5
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase ASCII words and numbers; accents are folded (`Misión` -> `mision`)."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return TOKEN.findall(folded)
+
+
+def launch_text(launch: Launch) -> Tuple[Optional[str], ...]:
+    """The searchable fields of a launch, in FIELD_WEIGHTS order."""
+    reasons = " ".join(failure.reason for failure in launch.failures if failure.reason)
+    return launch.name, reasons, launch.details
+
+
+def weigh_terms(text: Tuple[Optional[str], ...]) -> Dict[str, float]:
+    """term -> field-weighted frequency for one launch."""
+    weights: Dict[str, float] = defaultdict(float)
+    for weight, value in zip(FIELD_WEIGHTS.values(), text):
+        for token in tokenize(value):
+            weights[token] += weight
+    return dict(weights)
+
+
+class _TermCache:
+    """
+    LRU of weigh_terms() results keyed by the launch's searchable text, so
+    a new launches version only tokenizes the launches whose text changed.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: "OrderedDict[Tuple[Optional[str], ...], Dict[str, float]]" = OrderedDict()
+
+    def get(self, text: Tuple[Optional[str], ...]) -> Dict[str, float]:
+        terms = self._entries.get(text)
+        if terms is None:
+            terms = self._entries[text] = weigh_terms(text)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(text)
+        return terms
+
+
+_terms = _TermCache(settings.SEARCH_TERM_CACHE)
+
+
+@dataclass
+class SearchHit:
+    row: int
+    score: float
+
+
+class LaunchSearchIndex:
+    """
+    Inverted index (term -> row -> BM25 weight) over launch name, failure
+    reasons and details. Every query word must match, either exactly or as
+    the prefix of an indexed term; matching rows are ranked by the summed
+    weights. The vocabulary is kept sorted so a prefix is one bisect.
+    """
+
+    def __init__(self, launches: List[Launch]):
+        documents = [_terms.get(launch_text(launch)) for launch in launches]
+        lengths = [sum(terms.values()) for terms in documents]
+        average = sum(lengths) / len(lengths) if lengths else 0.0
+
+        frequencies: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for row, terms in enumerate(documents):
+            for term, frequency in terms.items():
+                frequencies[term][row] = frequency
+
+        # Los pesos se precalculan: una búsqueda sólo suma
+        size = len(documents)
+        self.postings: Dict[str, Dict[int, float]] = {}
+        for term, rows in frequencies.items():
+            idf = math.log(1 + (size - len(rows) + 0.5) / (len(rows) + 0.5))
+            self.postings[term] = {
+                row: idf * frequency * (K1 + 1) / (frequency + K1 * (1 - B + B * lengths[row] / average))
+                for row, frequency in rows.items()
+            }
+        self.vocabulary = sorted(self.postings)
+
+    def expand(self, word: str) -> List[Tuple[str, float]]:
+        """Every indexed term starting with `word` (exact match included), with its score factor."""
+        lo = bisect_left(self.vocabulary, word)
+        hi = bisect_left(self.vocabulary, word + "\uffff", lo)
+        return [
+            (term, 1.0 if term == word else PREFIX_PENALTY)
+            for term in self.vocabulary[lo:hi]
+        ]
+
+    def search(self, query: str, candidates: Optional[Set[int]] = None) -> List[SearchHit]:
+        """Rows matching every word of `query` (restricted to `candidates`), best first."""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            raise ValidationException("Search query has no searchable words")
+
+        scores: Optional[Counter] = None
+        for word in words:
+            # Por palabra, cada fila puntúa por su mejor término
+            best: Dict[int, float] = {}
+            for term, factor in self.expand(word):
+                for row, weight in self.postings[term].items():
+                    if candidates is not None and row not in candidates:
+                        continue
+                    if scores is not None and row not in scores:
+                        continue
+                    if weight * factor > best.get(row, 0.0):
+                        best[row] = weight * factor
+            scores = Counter(best) if scores is None else Counter({row: scores[row] + best[row] for row in best})
+            if not scores:
+                return []
+        return [SearchHit(row, score) for row, score in sorted(scores.items(), key=lambda item: (-item[1], item[0]))]
+
+
+async def get_launch_search(dataset: DatasetMirror = mirror) -> Tuple[LaunchQueryEngine, LaunchSearchIndex]:
+    """Query engine and search index of the current launches snapshot (rebuilt only on new versions)."""
+    snapshot = await dataset.launches.get()
+    engine = launch_engine(snapshot)
+    return engine, snapshot.derive("launch_search", lambda _: LaunchSearchIndex(engine.launches))
@@ -0,0 +1,22 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.log import error_kind
+from app.models.startlink import StarlinkSatellite
+
+
+def encode_satellites(
+    docs: List[Dict[str, Any]]
+) -> Tuple[List[bytes], List[Tuple[str, Optional[str]]]]:
+    """
+    Validate and serialize a batch of raw satellites. Pure, so offload() can
+    run it in a worker: JSON bytes go back, plus (error kind, id) for every
+    satellite that did not validate.
+    """
+    encoded = []
+    failed = []
+    for doc in docs:
+        try:
+            encoded.append(StarlinkSatellite(**doc).model_dump_json().encode())
+        except Exception as e:
+            failed.append((error_kind(e), doc.get("id")))
+    return encoded, failed
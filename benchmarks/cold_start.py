@@ -0,0 +1,54 @@
+"""
+Cold-start time of the API: import + create_app + lifespan startup + first
+/health request, each run in a fresh interpreter.
+
+    python -m benchmarks.cold_start [runs]
+
+Warming and ephemeris precompute are disabled so the numbers do not depend on the SpaceX API.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+from main import create_app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+app = create_app()
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    client.get("/health")
+    first = time.perf_counter()
+    subsystems = client.get("/ready").json()["subsystems"]
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (first - ready) * 1000,
+    "subsystems": subsystems,
+}))
+"""
+
+
+def run_once() -> dict:
+    env = dict(os.environ, WARM_ON_STARTUP="false", EPHEMERIS_PRECOMPUTE="false")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs: int) -> None:
+    results = [run_once() for _ in range(runs)]
+    print(f"{runs} cold starts (median)")
+    for key in ("import_ms", "startup_ms", "first_request_ms"):
+        print(f"{key:<18}{statistics.median(r[key] for r in results):>10.1f}")
+    # Ningún subsistema debería arrancar sólo por levantar la app
+    print("subsystems after start:", results[-1]["subsystems"])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
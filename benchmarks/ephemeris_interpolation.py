@@ -0,0 +1,108 @@
+"""
+Precomputed ephemeris + Lagrange interpolation vs direct SGP4 propagation.
+
+    python -m benchmarks.ephemeris_interpolation [n_satellites]
+
+For several sample steps and interpolation orders it reports the position
+error against direct propagation at random times, and the cost of answering
+a 100-satellite position query either way. Uses a synthetic constellation,
+so it runs without network access.
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from app.clients.starlink_store import StarlinkStore
+from app.services.ephemeris import EphemerisCache
+from app.services.propagation import Constellation, teme_to_ecef
+
+EPOCH_UNIX = 1602806400  # 2020-10-16, época de los TLE sintéticos
+QUERY_SATELLITES = 100
+QUERIES = 200
+
+
+def _checksum(line: str) -> str:
+    return str(sum(int(c) if c.isdigit() else c == "-" for c in line[:68]) % 10)
+
+
+def synthetic_tles(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(n):
+        norad = 44000 + i
+        line1 = f"1 {norad:05d}U 19029K   20290.00000000  .00001000  00000-0  10000-3 0  999"
+        line2 = (
+            f"2 {norad:05d} {rng.choice([53.0, 53.2, 70.0, 97.6]):8.4f} {rng.uniform(0, 360):8.4f} "
+            f"{rng.randint(1000, 3000):07d} {rng.uniform(0, 360):8.4f} {rng.uniform(0, 360):8.4f} "
+            f"{rng.uniform(15.0, 15.4):11.8f}{7775:5d}"
+        )
+        track = {name: 0 for name in (
+            "MEAN_MOTION", "ECCENTRICITY", "INCLINATION", "RA_OF_ASC_NODE", "ARG_OF_PERICENTER",
+            "MEAN_ANOMALY", "BSTAR", "MEAN_MOTION_DOT", "MEAN_MOTION_DDOT", "SEMIMAJOR_AXIS",
+            "PERIOD", "APOAPSIS", "PERIAPSIS", "EPHEMERIS_TYPE", "NORAD_CAT_ID", "ELEMENT_SET_NO",
+            "REV_AT_EPOCH", "DECAYED", "FILE", "GP_ID",
+        )}
+        track.update({name: "x" for name in (
+            "CCSDS_OMM_VERS", "COMMENT", "CREATION_DATE", "ORIGINATOR", "CENTER_NAME", "REF_FRAME",
+            "TIME_SYSTEM", "MEAN_ELEMENT_THEORY", "CLASSIFICATION_TYPE", "OBJECT_TYPE",
+            "OBJECT_NAME", "OBJECT_ID", "EPOCH", "TLE_LINE0",
+        )})
+        track["TLE_LINE1"] = line1 + _checksum(line1)
+        track["TLE_LINE2"] = line2 + _checksum(line2)
+        yield {"spaceTrack": track, "id": f"sat-{i}"}
+
+
+def direct_positions(constellation: Constellation, satellites, time_unix: float):
+    positions = np.array([constellation.propagate_one(s, time_unix)[0] for s in satellites])
+    return teme_to_ecef(positions[:, None, :], np.array([time_unix]))[:, 0]
+
+
+def main(n: int) -> None:
+    constellation = Constellation(StarlinkStore.from_docs(synthetic_tles(n)))
+    rng = np.random.default_rng(0)
+    window = 2 * 3600
+    print(f"{n} satellites, errors over {QUERIES} random times x {QUERY_SATELLITES} satellites")
+    print(f"{'step s':>7}{'points':>7}{'max err m':>11}{'p99 err m':>11}{'s/block':>9}{'MB/hour':>9}")
+
+    for step in (30, 60, 120, 300):
+        for points in (4, 6, 8, 10):
+            cache = EphemerisCache(constellation, max_blocks=8)
+            cache.step_seconds, cache.points = step, points
+            started = time.perf_counter()
+            built = cache.precompute(EPOCH_UNIX - 3600, EPOCH_UNIX + window + 3600)
+            build = (time.perf_counter() - started) / built
+            megabytes = cache.cached(EPOCH_UNIX).positions.nbytes / 1e6
+
+            errors = []
+            for time_unix in rng.uniform(EPOCH_UNIX + 600, EPOCH_UNIX + window, QUERIES // 4):
+                satellites = rng.choice(len(constellation), QUERY_SATELLITES, replace=False)
+                interpolated, _, _ = cache.interpolate(satellites, time_unix)
+                exact = direct_positions(constellation, satellites.tolist(), time_unix)
+                errors.extend(np.linalg.norm(interpolated - exact, axis=1) * 1000)
+            print(
+                f"{step:>7}{points:>7}{max(errors):>11.2f}{np.percentile(errors, 99):>11.2f}"
+                f"{build:>9.2f}{megabytes:>9.1f}"
+            )
+
+    cache = EphemerisCache(constellation, max_blocks=8)
+    cache.precompute(EPOCH_UNIX - 3600, EPOCH_UNIX + window + 3600)
+    times = rng.uniform(EPOCH_UNIX + 600, EPOCH_UNIX + window, QUERIES)
+    satellites = rng.choice(len(constellation), QUERY_SATELLITES, replace=False)
+
+    started = time.perf_counter()
+    for time_unix in times:
+        cache.interpolate(satellites, time_unix)
+    interpolated = (time.perf_counter() - started) / QUERIES
+
+    started = time.perf_counter()
+    for time_unix in times:
+        direct_positions(constellation, satellites.tolist(), time_unix)
+    direct = (time.perf_counter() - started) / QUERIES
+
+    print(f"\n{QUERY_SATELLITES}-satellite query (default settings)")
+    print(f"interpolated: {interpolated * 1000:.2f} ms   direct SGP4: {direct * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,129 @@
+"""
+Event-loop lag and latency of light concurrent requests while dashboards
+are being computed, with OFFLOAD_MODE off, thread and process.
+
+    python -m benchmarks.event_loop_offload [n_satellites]
+
+A ticker measures how late the loop wakes up (lag) and small "requests"
+(a 1 ms await) measure what other in-flight requests see, while several
+dashboards over a big Starlink page run concurrently. Uses synthetic data,
+so it runs without network access.
+"""
+import asyncio
+import copy
+import statistics
+import sys
+import time
+
+from app.clients.cache import DatasetMirror
+from app.clients.starlink_store import StarlinkStore
+from app.core.config import settings
+from app.core.subsystems import subsystems
+from app.models.launch import Launch
+from app.services.dashboard import DashboardService
+from benchmarks.starlink_store_memory import synthetic_constellation
+
+DASHBOARDS = 16
+CONCURRENCY = 4
+TICK_SECONDS = 0.005
+
+
+def synthetic_launches(n: int):
+    example = Launch.model_config["json_schema_extra"]["example"]
+    for i in range(n):
+        launch = copy.deepcopy(example)
+        launch["id"] = f"launch-{i}"
+        launch["flight_number"] = i + 1
+        launch["date_unix"] = example["date_unix"] + i * 86400 * 7
+        yield launch
+
+
+def dataset(n_satellites: int) -> DatasetMirror:
+    data = DatasetMirror()
+    launches = list(synthetic_launches(2000))
+    store = StarlinkStore.from_docs(synthetic_constellation(n_satellites))
+
+    async def load_launches():
+        return launches
+
+    async def load_starlink():
+        return store
+
+    data.launches._loader = load_launches
+    data.starlink._loader = load_starlink
+    return data
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def measure(data: DatasetMirror, n_satellites: int) -> dict:
+    service = DashboardService(data)
+    params = dict(limit=2000, starlink_limit=n_satellites, sections=("launch_metrics", "starlink_data"))
+    # Índices y snapshots ya construidos: se mide sólo el cálculo por petición
+    await service.get_dashboard_data(**params)
+
+    lags, latencies = [], []
+    running = True
+
+    async def ticker():
+        while running:
+            expected = time.perf_counter() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(time.perf_counter() - expected)
+
+    async def light_requests():
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            latencies.append(time.perf_counter() - started)
+
+    async def dashboards():
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def one():
+            async with semaphore:
+                await service.get_dashboard_data(**params)
+
+        await asyncio.gather(*(one() for _ in range(DASHBOARDS)))
+
+    background = [asyncio.create_task(ticker()), asyncio.create_task(light_requests())]
+    started = time.perf_counter()
+    await dashboards()
+    elapsed = time.perf_counter() - started
+    running = False
+    await asyncio.gather(*background)
+    return {
+        "dashboards_s": elapsed,
+        "lag_p99_ms": percentile(lags, 0.99) * 1000,
+        "lag_max_ms": max(lags) * 1000,
+        "light_p50_ms": statistics.median(latencies) * 1000,
+        "light_p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(n_satellites: int) -> None:
+    data = dataset(n_satellites)
+    print(f"{DASHBOARDS} dashboards ({n_satellites} satellites, 2000 launches), {CONCURRENCY} at a time")
+    print(f"{'mode':<9}{'total s':>9}{'lag p99':>10}{'lag max':>10}{'light p50':>11}{'light p99':>11}  (ms)")
+    for mode in ("off", "thread", "process"):
+        settings.OFFLOAD_MODE = mode
+        subsystems.workers.enabled = mode == "process"
+
+        async def run():
+            try:
+                return await measure(data, n_satellites)
+            finally:
+                await subsystems.shutdown()
+
+        result = asyncio.run(run())
+        print(
+            f"{mode:<9}{result['dashboards_s']:>9.2f}{result['lag_p99_ms']:>10.1f}{result['lag_max_ms']:>10.1f}"
+            f"{result['light_p50_ms']:>11.1f}{result['light_p99_ms']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,120 @@
+"""
+Memory per satellite: raw dicts vs pydantic models vs StarlinkStore.
+
+    python -m benchmarks.starlink_store_memory [n_satellites]
+
+Uses a synthetic constellation shaped like /starlink/query documents, so it
+runs without network access.
+"""
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from app.clients.starlink_store import StarlinkStore
+from app.models.startlink import StarlinkSatellite
+
+
+def synthetic_constellation(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(n):
+        norad = 44000 + i
+        yield {
+            "spaceTrack": {
+                "CCSDS_OMM_VERS": "2.0",
+                "COMMENT": "GENERATED VIA SPACE-TRACK.ORG API",
+                "CREATION_DATE": "2020-10-13T04:16:08",
+                "ORIGINATOR": "18 SPCS",
+                "OBJECT_NAME": f"STARLINK-{i}",
+                "OBJECT_ID": f"2019-029{i:04d}",
+                "CENTER_NAME": "EARTH",
+                "REF_FRAME": "TEME",
+                "TIME_SYSTEM": "UTC",
+                "MEAN_ELEMENT_THEORY": "SGP4",
+                "EPOCH": f"2020-10-13T{rng.randint(0, 23):02d}:56:59.566560",
+                "MEAN_MOTION": rng.uniform(15.0, 15.1),
+                "ECCENTRICITY": rng.uniform(0.0001, 0.0003),
+                "INCLINATION": rng.choice([53.0, 53.2, 70.0, 97.6]),
+                "RA_OF_ASC_NODE": rng.uniform(0, 360),
+                "ARG_OF_PERICENTER": rng.uniform(0, 360),
+                "MEAN_ANOMALY": rng.uniform(0, 360),
+                "EPHEMERIS_TYPE": 0,
+                "CLASSIFICATION_TYPE": "U",
+                "NORAD_CAT_ID": norad,
+                "ELEMENT_SET_NO": 999,
+                "REV_AT_EPOCH": rng.randint(1000, 9000),
+                "BSTAR": rng.uniform(0.0001, 0.001),
+                "MEAN_MOTION_DOT": rng.uniform(0, 0.0001),
+                "MEAN_MOTION_DDOT": 0.0,
+                "SEMIMAJOR_AXIS": rng.uniform(6900, 6950),
+                "PERIOD": rng.uniform(95, 96),
+                "APOAPSIS": rng.uniform(540, 560),
+                "PERIAPSIS": rng.uniform(530, 550),
+                "OBJECT_TYPE": "PAYLOAD",
+                "RCS_SIZE": "LARGE",
+                "COUNTRY_CODE": "US",
+                "LAUNCH_DATE": rng.choice(["2019-05-24", "2019-11-11", "2020-01-07"]),
+                "SITE": "AFETR",
+                "DECAY_DATE": None,
+                "DECAYED": 0,
+                "FILE": 2850561,
+                "GP_ID": 163365918 + i,
+                "TLE_LINE0": f"0 STARLINK-{i}",
+                "TLE_LINE1": f"1 {norad:05d}U 19029K   20287.12291165  .00001000  00000-0  10000-3 0  9995",
+                "TLE_LINE2": f"2 {norad:05d}  53.0000 332.0356 0001711 120.7278 242.0157 15.06170483 77756",
+            },
+            "launch": f"5eb87d30ffd86e000604b{rng.randint(0, 60):03d}",
+            "version": rng.choice(["v0.9", "v1.0", "v1.5"]),
+            "height_km": rng.choice([None, rng.uniform(540, 560)]),
+            "latitude": rng.uniform(-53, 53),
+            "longitude": rng.uniform(-180, 180),
+            "velocity_kms": rng.uniform(7.5, 7.7),
+            "id": f"5eed770f096e5900069{i:05d}",
+        }
+
+
+def measure(build):
+    """Bytes retained by build()'s result, and build time (timed without tracing)."""
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main(n: int) -> None:
+    # Ida y vuelta por JSON para que cada string sea un objeto propio, como al parsear la API
+    body = json.dumps(list(synthetic_constellation(n)))
+    docs = json.loads(body)
+
+    rows = [
+        ("raw dicts (json.loads)", lambda: json.loads(body)),
+        ("StarlinkSatellite models", lambda: [StarlinkSatellite(**doc) for doc in json.loads(body)]),
+        ("StarlinkStore", lambda: StarlinkStore.from_docs(docs)),
+    ]
+
+    print(f"{n} satellites")
+    print(f"{'representation':<26}{'bytes/satellite':>16}{'build ms':>10}")
+    for name, build in rows:
+        result, size, elapsed = measure(build)
+        print(f"{name:<26}{size / n:>16.0f}{elapsed * 1000:>10.1f}")
+        del result
+
+    store = StarlinkStore.from_docs(docs)
+    started = time.perf_counter()
+    for row in range(min(n, 1000)):
+        store.satellite(row)
+    print(f"materialize 1 model from store: {(time.perf_counter() - started) / min(n, 1000) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
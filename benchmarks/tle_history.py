@@ -0,0 +1,105 @@
+"""
+Storage growth and lookup cost of the append-only TLE history.
+
+    python -m benchmarks.tle_history [n_satellites] [n_syncs]
+
+Simulates repeated Starlink syncs where about half of the satellites
+publish a new element set each time (the rest are re-sent unchanged and
+must be deduplicated), writing to a temporary log file. Then measures
+"element set valid at t" lookups, propagation from a historical element
+set, decay histories and reopening the log. Uses synthetic data, so it
+runs without network access.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app.clients.starlink_store import StarlinkStore
+from app.clients.tle_history import RECORD, TleHistory, encode_element_sets
+from app.services.history import decay_history, element_set_at
+from benchmarks.starlink_store_memory import synthetic_constellation
+
+UPDATE_FRACTION = 0.5
+SYNC_HOURS = 12
+LOOKUPS = 20_000
+
+
+def syncs(n_satellites: int, n_syncs: int, seed: int = 7):
+    """One StarlinkStore per sync; updated satellites get a later epoch and a lower orbit."""
+    rng = random.Random(seed)
+    docs = list(synthetic_constellation(n_satellites))
+    start = datetime(2020, 10, 13)
+    for doc in docs:
+        doc["spaceTrack"]["EPOCH"] = start.isoformat()
+        doc["spaceTrack"]["ELEMENT_SET_NO"] = 1
+    for sync in range(n_syncs):
+        if sync:
+            for doc in docs:
+                if rng.random() < UPDATE_FRACTION:
+                    track = doc["spaceTrack"]
+                    track["EPOCH"] = (start + timedelta(hours=sync * SYNC_HOURS)).isoformat()
+                    # Set numbers dan la vuelta en 999, como en Space-Track
+                    track["ELEMENT_SET_NO"] = track["ELEMENT_SET_NO"] % 999 + 1
+                    track["SEMIMAJOR_AXIS"] -= rng.uniform(0.0, 0.2)
+        yield StarlinkStore.from_docs(docs)
+
+
+def per_call_us(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main(n_satellites: int, n_syncs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tle_history.bin")
+        history = TleHistory(path)
+        print(f"{n_satellites} satellites, {n_syncs} syncs every {SYNC_HOURS} h, ~{UPDATE_FRACTION:.0%} updated per sync")
+        # encode y write corren en un hilo en el servidor; extend (dedup + índice) en el event loop
+        print(f"{'sync':>5}{'new':>8}{'encode ms':>11}{'extend ms':>11}{'write ms':>10}{'records':>10}{'file MB':>9}")
+        for sync, store in enumerate(syncs(n_satellites, n_syncs)):
+            before = len(history)
+            started = time.perf_counter()
+            records, _ = encode_element_sets(store)
+            encoded = time.perf_counter()
+            payload = history.extend(records)
+            extended = time.perf_counter()
+            history.write(payload)
+            written = time.perf_counter()
+            if sync < 3 or sync == n_syncs - 1 or sync % 10 == 0:
+                print(
+                    f"{sync:>5}{len(history) - before:>8}{(encoded - started) * 1000:>11.1f}"
+                    f"{(extended - encoded) * 1000:>11.1f}{(written - extended) * 1000:>10.1f}"
+                    f"{len(history):>10}{os.path.getsize(path) / 1e6:>9.2f}"
+                )
+        print(
+            f"bytes/record: {RECORD.size} on disk, {history.nbytes() / len(history):.0f} in memory; "
+            f"per satellite: {os.path.getsize(path) / n_satellites / 1024:.1f} KiB after {n_syncs} syncs"
+        )
+
+        rng = random.Random(1)
+        first, last = min(history.epochs), max(history.epochs)
+        queries = [
+            (44000 + rng.randrange(n_satellites), rng.uniform(first, last + 86400))
+            for _ in range(LOOKUPS)
+        ]
+        print(f"valid_at lookup:          {per_call_us(lambda i: history.valid_at(*queries[i]), LOOKUPS):8.2f} us")
+        print(f"element set + SGP4 at t:  {per_call_us(lambda i: element_set_at(history, *queries[i]), 2000):8.1f} us")
+        print(f"decay history (all sets): {per_call_us(lambda i: decay_history(history, queries[i][0]), 2000):8.1f} us")
+
+        history.close()
+        started = time.perf_counter()
+        reopened = TleHistory(path)
+        print(f"reopen + index {len(reopened)} records: {(time.perf_counter() - started) * 1000:.0f} ms")
+        reopened.close()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 60,
+    )
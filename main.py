@@ -1,27 +1,124 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware  # Add this import
+from fastapi.responses import JSONResponse
 from app.core.config import settings
-from app.api.v1 import  rockets, launches, starlink, dashboard
-
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],  # Frontend URL
-    allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods
-    allow_headers=["*"],  # Allows all headers
-)
-
-app.include_router(rockets.router, prefix=settings.API_V1_STR)
-app.include_router(launches.router, prefix=settings.API_V1_STR)
-app.include_router(starlink.router, prefix=settings.API_V1_STR)
-app.include_router(dashboard.router, prefix=settings.API_V1_STR)
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+from app.api.v1 import  rockets, launches, starlink, dashboard, cores
+from app.clients.cache import mirror
+from app.clients.spacex import breaker
+from app.core.admission import AdaptiveLimiter, AdmissionControlMiddleware
+from app.core.log import configure_logging, metrics, shutdown_logging
+from app.core.subsystems import subsystems
+from app.services.ephemeris import run_ephemeris_precompute
+from app.services.history import record_starlink_history
+
+
+def create_app() -> FastAPI:
+    """
+    Build the application. Nothing is connected here: the HTTP pool, Redis
+    and S3 start on first use, and the dataset mirror warms in the background.
+    """
+    created_at = time.perf_counter()
+    configure_logging()
+    warm_task = None
+    background = []
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        nonlocal warm_task
+        app.state.startup_ms = (time.perf_counter() - created_at) * 1000
+        app.state.started_at = time.time()
+        # Cada sincronización nueva de la constelación queda en el histórico, se consulte o no
+        mirror.starlink.on_refresh(record_starlink_history)
+        if settings.WARM_ON_STARTUP:
+            # No bloquea el arranque; /ready avisa cuando termina
+            warm_task = asyncio.create_task(mirror.warm())
+        if settings.EPHEMERIS_PRECOMPUTE:
+            background.append(asyncio.create_task(run_ephemeris_precompute()))
+        yield
+        for task in background + [warm_task]:
+            if task is not None:
+                task.cancel()
+        await subsystems.shutdown()
+        shutdown_logging()
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
+    )
+
+    # Admisión por ruta: con el upstream lento se sirve lo cacheado o un 503 rápido
+    limiters = [
+        AdaptiveLimiter(
+            prefix,
+            max_limit=max_limit,
+            min_limit=settings.ADMISSION_MIN_LIMIT,
+            queue_depth=settings.ADMISSION_QUEUE_DEPTH,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+        )
+        for prefix, max_limit in settings.ADMISSION_ROUTES.items()
+    ]
+    if settings.ADMISSION_CONTROL:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            limiters=limiters,
+            fallbacks={f"{settings.API_V1_STR}/dashboard": dashboard.serve_stale},
+            exempt=settings.ADMISSION_EXEMPT
+        )
+
+    # Add CORS middleware (added last so it wraps admission control and its fallbacks)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],  # Frontend URL
+        allow_credentials=True,
+        allow_methods=["*"],  # Allows all methods
+        allow_headers=["*"],  # Allows all headers
+    )
+
+    app.include_router(rockets.router, prefix=settings.API_V1_STR)
+    app.include_router(launches.router, prefix=settings.API_V1_STR)
+    app.include_router(starlink.router, prefix=settings.API_V1_STR)
+    app.include_router(dashboard.router, prefix=settings.API_V1_STR)
+    app.include_router(cores.router, prefix=settings.API_V1_STR)
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    @app.get("/ready")
+    async def readiness_check():
+        """
+        Ready only when every mirrored collection is loaded and not too old
+        and the upstream breaker is not open. A cold instance starts warming
+        here so the load balancer can retry it shortly.
+        """
+        nonlocal warm_task
+        datasets = mirror.status()
+        warm = all(
+            status["warm"] and status["age_seconds"] <= settings.READY_MAX_DATASET_AGE_SECONDS
+            for status in datasets.values()
+        )
+        if not warm and (warm_task is None or warm_task.done()):
+            warm_task = asyncio.create_task(mirror.warm())
+
+        ready = warm and breaker.state != "open"
+        body = {
+            "status": "ready" if ready else "not_ready",
+            "upstream": {"breaker": breaker.state, "consecutive_failures": breaker.failures},
+            "datasets": datasets,
+            "subsystems": subsystems.status(),
+            "admission": {limiter.prefix: limiter.status() for limiter in limiters}
+            if settings.ADMISSION_CONTROL else {},
+            "counters": metrics.snapshot(),
+            "startup_ms": round(getattr(app.state, "startup_ms", 0), 2),
+            "uptime_seconds": round(time.time() - getattr(app.state, "started_at", time.time()), 1),
+        }
+        return JSONResponse(status_code=200 if ready else 503, content=body)
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,18 @@
+import copy
+from typing import Any, Callable
+
+import pytest
+
+from app.models.launch import Launch
+
+EXAMPLE_LAUNCH = Launch.model_config["json_schema_extra"]["example"]
+
+
+@pytest.fixture
+def make_launch() -> Callable[..., Launch]:
+    """Launch built from the model's example, with some fields overridden."""
+    def make(**overrides: Any) -> Launch:
+        data = copy.deepcopy(EXAMPLE_LAUNCH)
+        data.update(overrides)
+        return Launch(**data)
+    return make
@@ -0,0 +1,64 @@
+import asyncio
+
+from app.core.admission import AdaptiveLimiter, AdmissionControlMiddleware
+
+
+def run(app, limiter, path="/api/v1/starlink/export"):
+    middleware = AdmissionControlMiddleware(app, [limiter])
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""}
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+def test_slot_released_when_the_response_starts():
+    limiter = AdaptiveLimiter("/api/v1", max_limit=4)
+    during_body = []
+
+    async def streaming(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for _ in range(3):
+            await asyncio.sleep(0.05)
+            during_body.append(limiter.in_flight)
+            await send({"type": "http.response.body", "body": b"x", "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    run(streaming, limiter)
+    assert during_body == [0, 0, 0]
+    # La latencia registrada es hasta los headers, no los 150 ms del cuerpo
+    assert limiter.latency < 0.05
+
+
+def test_error_before_the_response_releases_as_failure():
+    limiter = AdaptiveLimiter("/api/v1", max_limit=4)
+
+    async def failing(scope, receive, send):
+        raise RuntimeError("boom")
+
+    try:
+        run(failing, limiter)
+    except RuntimeError:
+        pass
+    assert limiter.in_flight == 0
+    assert limiter.latency is not None
+
+
+def test_exempt_paths_skip_the_limiter():
+    limiter = AdaptiveLimiter("/api/v1", max_limit=1)
+
+    async def ok(scope, receive, send):
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = AdmissionControlMiddleware(ok, [limiter], exempt=["/api/v1/dashboard/stream"])
+    assert middleware._limiter("/api/v1/dashboard/stream") is None
+    assert middleware._limiter("/api/v1/launches") is limiter
+    run(ok, limiter)
+    assert limiter.in_flight == 0
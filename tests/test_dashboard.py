@@ -0,0 +1,20 @@
+import pytest
+
+from app.api.v1.dashboard import _accepts_gzip
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.8", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, identity", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("identity", False),
+    ("", False),
+    ("x-gzip", True),
+])
+def test_accepts_gzip(header, expected):
+    assert _accepts_gzip(header) is expected
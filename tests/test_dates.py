@@ -0,0 +1,31 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from app.core.dates import civil_from_days, days_from_civil, unix_seconds
+
+EPOCH = date(1970, 1, 1)
+
+
+def test_civil_from_days_matches_datetime():
+    rng = random.Random(3)
+    # Bordes de siglo/bisiesto más una muestra aleatoria entre los años 1 y 9999
+    days = [0, -1, 59, 60, 11016, 11017, -25509, 47540]
+    days += [rng.randint(date(1, 1, 1).toordinal(), date(9999, 12, 31).toordinal()) - EPOCH.toordinal() for _ in range(5000)]
+    for count in days:
+        expected = EPOCH + timedelta(days=count)
+        assert civil_from_days(count) == (expected.year, expected.month, expected.day)
+        assert days_from_civil(expected.year, expected.month, expected.day) == count
+
+
+def test_every_day_of_a_leap_cycle():
+    start = days_from_civil(1999, 12, 25)
+    for count in range(start, start + 4 * 366):
+        year, month, day = civil_from_days(count)
+        assert date(year, month, day) == EPOCH + timedelta(days=count)
+        assert days_from_civil(year, month, day) == count
+
+
+def test_unix_seconds_treats_naive_as_utc():
+    aware = datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+    assert unix_seconds(aware.replace(tzinfo=None)) == aware.timestamp()
+    assert unix_seconds(aware.astimezone(timezone(timedelta(hours=-5)))) == aware.timestamp()
@@ -0,0 +1,47 @@
+import numpy as np
+
+from app.services.ephemeris import EphemerisBlock, EphemerisCache
+
+HOUR = 3600
+
+
+def make_cache(monkeypatch, max_blocks=2):
+    cache = EphemerisCache(constellation=None, max_blocks=max_blocks)
+    cache.step_seconds, cache.block_seconds = 600, HOUR
+    built = []
+
+    def build(start_unix):
+        built.append(start_unix)
+        samples = HOUR // 600
+        return EphemerisBlock(start_unix, 600, np.zeros((1, samples, 3), np.float32), np.ones((1, samples), bool))
+
+    monkeypatch.setattr(cache, "_build", build)
+    return cache, built
+
+
+def test_requests_do_not_evict_the_horizon(monkeypatch):
+    cache, built = make_cache(monkeypatch)
+    assert cache.precompute(0, 3 * HOUR) == 4
+    # Un día después: cabe en el LRU de peticiones y no toca el horizonte
+    for _ in range(3):
+        cache.window(24 * HOUR, 25 * HOUR)
+    assert built == [0, HOUR, 2 * HOUR, 3 * HOUR, 24 * HOUR, 25 * HOUR]
+    assert all(cache.cached(start * HOUR) is not None for start in range(4))
+
+
+def test_windows_larger_than_the_lru_are_not_kept(monkeypatch):
+    cache, built = make_cache(monkeypatch)
+    cache.window(24 * HOUR, 25 * HOUR)
+    cache.window(48 * HOUR, 52 * HOUR)
+    assert cache.cached(24 * HOUR) is not None
+    assert cache.cached(48 * HOUR) is None
+
+
+def test_precompute_drops_past_blocks_and_adopts_requested_ones(monkeypatch):
+    cache, built = make_cache(monkeypatch)
+    cache.precompute(0, 2 * HOUR)
+    cache.window(3 * HOUR, 3 * HOUR)
+    assert cache.precompute(HOUR, 3 * HOUR) == 0
+    assert cache.cached(0) is None
+    assert sorted(cache._horizon) == [HOUR, 2 * HOUR, 3 * HOUR]
+    assert not cache._blocks
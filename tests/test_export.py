@@ -0,0 +1,51 @@
+import copy
+import csv
+import io
+
+import pytest
+
+from app.clients.starlink_store import StarlinkStore
+from app.core.config import settings
+from app.models.startlink import StarlinkResponse
+from app.services.export import LaunchTable, StarlinkTable, export_chunks, select_columns
+
+EXAMPLE_SATELLITE = StarlinkResponse.Config.schema_extra["example"]
+CHUNK_ROWS = 5
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_ROWS", CHUNK_ROWS)
+
+
+def starlink_table(size: int) -> StarlinkTable:
+    docs = []
+    for i in range(size):
+        doc = copy.deepcopy(EXAMPLE_SATELLITE)
+        doc["id"] = f"sat{i}"
+        doc["spaceTrack"]["NORAD_CAT_ID"] = 44000 + i
+        docs.append(doc)
+    return StarlinkTable(StarlinkStore.from_docs(docs))
+
+
+def read(table, format):
+    body = b"".join(export_chunks(table, format, select_columns(table, None)))
+    if format == "csv":
+        return list(csv.DictReader(io.StringIO(body.decode())))
+    import pyarrow as pa
+    return pa.ipc.open_stream(body).read_all().to_pylist()
+
+
+@pytest.mark.parametrize("format", ["csv", "arrow"])
+@pytest.mark.parametrize("size", [7, CHUNK_ROWS, 0])
+def test_starlink_export_partial_final_chunk(format, size):
+    rows = read(starlink_table(size), format)
+    assert [row["id"] for row in rows] == [f"sat{i}" for i in range(size)]
+    assert [int(row["spaceTrack.NORAD_CAT_ID"]) for row in rows] == [44000 + i for i in range(size)]
+
+
+@pytest.mark.parametrize("format", ["csv", "arrow"])
+def test_launch_export_partial_final_chunk(make_launch, format):
+    launches = [make_launch(id=f"l{i}", flight_number=i).model_dump(mode="json") for i in range(7)]
+    rows = read(LaunchTable(launches), format)
+    assert [row["id"] for row in rows] == [f"l{i}" for i in range(7)]
@@ -0,0 +1,28 @@
+import pytest
+
+from app.core.exceptions import ValidationException
+from app.core.fields import FieldSet
+from app.models.launch import Launch
+
+
+def test_select_drops_children_of_selected_parents():
+    fields = FieldSet.parse("links.patch.small,links,cores.core,name", Launch)
+    assert fields.select == {"links": 1, "cores.core": 1, "name": 1, "id": 1}
+
+
+def test_parent_wins_in_include_and_project():
+    fields = FieldSet.parse("links,links.patch.small", Launch)
+    doc = {"id": "x", "name": "n", "links": {"patch": {"small": "s", "large": "l"}, "webcast": "w"}}
+    assert fields.project(doc) == {"id": "x", "links": doc["links"]}
+    assert fields.include["links"] is True
+
+
+def test_project_lists_of_documents():
+    fields = FieldSet.parse("cores.core", Launch)
+    doc = {"id": "x", "cores": [{"core": "a", "flight": 1}, {"core": "b", "flight": 2}]}
+    assert fields.project(doc) == {"id": "x", "cores": [{"core": "a"}, {"core": "b"}]}
+
+
+def test_unknown_field():
+    with pytest.raises(ValidationException):
+        FieldSet.parse("links.nope", Launch)
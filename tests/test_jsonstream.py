@@ -0,0 +1,60 @@
+import json
+import random
+
+import pytest
+
+from app.clients.jsonstream import DocsStreamParser
+from app.core.exceptions import SpaceXAPIException
+
+PAGE = {
+    "docs": [
+        {"id": "a", "name": "Misión ñ ☃", "values": [1, 2.5, -3e-4], "nested": {"ok": True, "none": None}},
+        {"id": "b", "name": "quote \" and \\ backslash", "values": []},
+        12345,
+        "text",
+        None,
+    ],
+    "totalDocs": 5,
+    "page": 1,
+    "hasNextPage": False,
+}
+
+
+def parse(body: bytes, splits):
+    parser = DocsStreamParser()
+    docs = []
+    start = 0
+    for end in sorted(splits) + [len(body)]:
+        docs += parser.feed(body[start:end])
+        start = end
+    docs += parser.close()
+    return docs, parser.meta
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_chunk_splits(seed):
+    body = json.dumps(PAGE, ensure_ascii=False, indent=seed % 3 or None).encode()
+    rng = random.Random(seed)
+    # Cortes en cualquier byte, incluso en medio de un carácter UTF-8 o de un número
+    splits = rng.sample(range(1, len(body)), rng.randint(1, min(40, len(body) - 1)))
+    docs, meta = parse(body, splits)
+    assert docs == PAGE["docs"]
+    assert meta == {"totalDocs": 5, "page": 1, "hasNextPage": False}
+
+
+def test_byte_by_byte_bare_array():
+    body = json.dumps(PAGE["docs"]).encode()
+    docs, meta = parse(body, list(range(1, len(body))))
+    assert docs == PAGE["docs"]
+    assert meta == {}
+
+
+def test_truncated_body():
+    body = json.dumps(PAGE).encode()
+    with pytest.raises(SpaceXAPIException):
+        parse(body[:-10], [])
+
+
+def test_trailing_data():
+    with pytest.raises(SpaceXAPIException):
+        parse(b'{"docs": []} []', [])
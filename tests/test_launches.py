@@ -0,0 +1,42 @@
+import pytest
+
+from app.core.exceptions import ValidationException
+from app.services.launches import LaunchQueryEngine, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("date_unix", 1143239400, "5eb87cd9ffd86e000604b32a")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "date_unix") == (1143239400, "5eb87cd9ffd86e000604b32a")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor("date_unix", "x", "id")])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValidationException):
+        decode_cursor(cursor, "date_unix")
+
+
+def test_cursor_for_another_sort():
+    with pytest.raises(ValidationException):
+        decode_cursor(encode_cursor("flight_number", 3, "id"), "date_unix")
+
+
+@pytest.mark.parametrize("sort", ["date_unix", "flight_number"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_cover_every_launch_once(make_launch, sort, order):
+    # Fechas repetidas: el id desempata y ninguna fila se pierde entre páginas
+    launches = [
+        make_launch(id=f"id{i:03d}", flight_number=i % 7, date_unix=1_600_000_000 + (i % 5) * 86400, rocket=f"r{i % 2}")
+        for i in range(23)
+    ]
+    engine = LaunchQueryEngine(launches)
+    seen = []
+    cursor = None
+    while True:
+        page = engine.query(filters={"rocket": "r1"}, sort=sort, order=order, limit=4, cursor=cursor)
+        seen += [launch.id for launch in page.docs]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    expected = sorted((l for l in launches if l.rocket == "r1"), key=lambda l: (getattr(l, sort), l.id), reverse=order == "desc")
+    assert seen == [launch.id for launch in expected]
@@ -0,0 +1,19 @@
+import pytest
+
+from app.core.exceptions import ValidationException
+from app.services.orbits import ALTITUDE_STEPS_KM, INCLINATION_STEPS_DEG, check_band_steps
+
+
+def test_accepted_band_steps():
+    for altitude in ALTITUDE_STEPS_KM:
+        for inclination in INCLINATION_STEPS_DEG:
+            check_band_steps(altitude, inclination)
+    # Los anchos gruesos se agregan desde el más fino
+    assert all(step % ALTITUDE_STEPS_KM[0] == 0 for step in ALTITUDE_STEPS_KM)
+    assert all(step % INCLINATION_STEPS_DEG[0] == 0 for step in INCLINATION_STEPS_DEG)
+
+
+@pytest.mark.parametrize("altitude, inclination", [(11, 1), (10, 0.3), (10.000001, 1)])
+def test_other_band_steps_are_rejected(altitude, inclination):
+    with pytest.raises(ValidationException):
+        check_band_steps(altitude, inclination)
@@ -0,0 +1,31 @@
+from app.services.rollups import LaunchRollups, bucket_key, bucket_label
+
+DAY = 86400
+# 2020-01-01
+START = 18262 * DAY
+
+
+def test_bucket_keys_and_labels():
+    days = START // DAY
+    assert bucket_label("week", bucket_key("week", days)) == "2019-12-30"
+    assert bucket_label("month", bucket_key("month", days)) == "2020-01"
+    assert bucket_label("quarter", bucket_key("quarter", days + 100)) == "2020-Q2"
+
+
+def test_rocket_filter_restricts_breakdown(make_launch):
+    launches = [
+        make_launch(id="a", rocket="f9", date_unix=START, success=True, upcoming=False),
+        make_launch(id="b", rocket="f9", date_unix=START + DAY, success=False, upcoming=False),
+        make_launch(id="c", rocket="fh", date_unix=START + 2 * DAY, success=True, upcoming=False),
+        make_launch(id="d", rocket="fh", date_unix=START + 40 * DAY, success=True, upcoming=False),
+        make_launch(id="e", rocket="f9", date_unix=START + 3 * DAY, success=None, upcoming=True),
+    ]
+    rollups = LaunchRollups(launches)
+
+    everything = rollups.query("month")
+    assert [(b.bucket, b.total, b.successful, b.by_rocket) for b in everything] == [
+        ("2020-01", 3, 2, {"f9": 2, "fh": 1}),
+        ("2020-02", 1, 1, {"fh": 1}),
+    ]
+    falcon = rollups.query("month", rocket="f9")
+    assert [(b.bucket, b.total, b.successful, b.by_rocket) for b in falcon] == [("2020-01", 2, 1, {"f9": 2})]
@@ -0,0 +1,56 @@
+import pytest
+
+from app.core.exceptions import ValidationException
+from app.services.launches import LaunchQueryEngine
+from app.services.search import LaunchSearchIndex, tokenize
+
+
+@pytest.fixture
+def launches(make_launch):
+    return [
+        make_launch(id="a", name="Starlink 1", details="Falcon 9 carried 60 satellites", rocket="f9", failures=[]),
+        make_launch(id="b", name="Starlink 2", details=None, rocket="f9", failures=[]),
+        make_launch(id="c", name="Demo", details="Misión de prueba", rocket="f1",
+                    failures=[{"time": 33, "altitude": None, "reason": "engine failure"}]),
+        make_launch(id="d", name="Starship", details="Star party", rocket="ss", failures=[]),
+    ] + [make_launch(id=f"s{i:03d}", name=f"sat{i:03d}", details=None, rocket="f9", failures=[]) for i in range(60)]
+
+
+def ids(index, launches, query, candidates=None):
+    return [launches[hit.row].id for hit in index.search(query, candidates)]
+
+
+def test_tokenize_folds_accents():
+    assert tokenize("Misión CRS-21") == ["mision", "crs", "21"]
+
+
+def test_exact_word_ranks_above_prefix(launches):
+    index = LaunchSearchIndex(launches)
+    found = ids(index, launches, "star")
+    assert found[0] == "d"
+    assert set(found) == {"a", "b", "d"}
+
+
+def test_prefix_expands_to_every_matching_term(launches):
+    index = LaunchSearchIndex(launches)
+    assert len(index.expand("sat")) == 61
+    assert set(ids(index, launches, "sat")) == {"a"} | {f"s{i:03d}" for i in range(60)}
+
+
+def test_every_word_must_match(launches):
+    index = LaunchSearchIndex(launches)
+    assert ids(index, launches, "starlink 2") == ["b"]
+    assert ids(index, launches, "mision engine") == ["c"]
+    assert ids(index, launches, "starlink engine") == []
+
+
+def test_filters_restrict_candidates(launches):
+    index = LaunchSearchIndex(launches)
+    candidates = LaunchQueryEngine(launches).filter_rows({"rocket": "ss"})
+    assert ids(index, launches, "star", candidates) == ["d"]
+    assert ids(index, launches, "starlink", candidates) == []
+
+
+def test_query_without_words(launches):
+    with pytest.raises(ValidationException):
+        LaunchSearchIndex(launches).search("¿?")
@@ -0,0 +1,65 @@
+import pickle
+import random
+
+import pytest
+
+from app.core.sketch import QuantileSketch
+
+ACCURACY = 0.01
+QUANTILES = (0.05, 0.5, 0.95, 0.99)
+
+
+def exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def sample(seed, size=20000):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(6, 0.4) for _ in range(size)] + [rng.uniform(0.5, 2) for _ in range(size // 50)]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_relative_error_bound(seed):
+    values = sample(seed)
+    sketch = QuantileSketch(ACCURACY)
+    sketch.extend(values)
+    for q in QUANTILES:
+        expected = exact(values, q)
+        assert abs(sketch.quantile(q) - expected) <= ACCURACY * expected * 1.0001
+
+
+def test_merge_equals_single_sketch():
+    values = sample(7)
+    whole = QuantileSketch(ACCURACY)
+    whole.extend(values)
+    parts = [QuantileSketch(ACCURACY) for _ in range(3)]
+    for i, value in enumerate(values):
+        parts[i % 3].add(value)
+    merged = QuantileSketch(ACCURACY)
+    for part in parts:
+        # Los chunks vuelven de un worker process serializados
+        merged.merge(pickle.loads(pickle.dumps(part)))
+    summary, expected = merged.summary(), whole.summary()
+    # La media sólo difiere por el orden de las sumas
+    assert summary.pop("mean") == pytest.approx(expected.pop("mean"))
+    assert summary == expected
+
+
+def test_quantiles_stay_within_observed_range():
+    sketch = QuantileSketch(ACCURACY)
+    sketch.extend([24.0, 24.0, 25.0, 30.0])
+    summary = sketch.summary()
+    assert summary["min"] <= summary["p5"] <= summary["p99"] <= summary["max"]
+
+
+def test_negative_and_zero_values():
+    sketch = QuantileSketch(ACCURACY)
+    sketch.extend([-5, -1, 0, 0, 3])
+    assert sketch.quantile(0.0) == pytest.approx(-5, rel=ACCURACY)
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(1.0) == pytest.approx(3, rel=ACCURACY)
+
+
+def test_empty_sketch():
+    assert QuantileSketch(ACCURACY).quantile(0.5) is None
@@ -0,0 +1,57 @@
+from app.clients.tle_history import HISTORY_FLOATS, MAGIC, RECORD, TLE_LINE_LENGTH, TleHistory
+
+
+def record(norad, element_set, epoch):
+    line1 = f"1 {norad:05d}U".ljust(TLE_LINE_LENGTH).encode()
+    line2 = f"2 {norad:05d} {element_set}".ljust(TLE_LINE_LENGTH).encode()
+    return (norad, element_set, epoch, *(float(i) for i in range(len(HISTORY_FLOATS))), line1, line2)
+
+
+def test_extend_deduplicates_and_indexes_by_epoch():
+    history = TleHistory()
+    payload = history.extend([record(44000, 1, 100.0), record(44000, 3, 300.0), record(44000, 1, 100.0)])
+    assert len(payload) == 2 * RECORD.size
+    # Un element set que llega tarde se inserta en orden; el número se repite tras dar la vuelta en 999
+    history.extend([record(44000, 2, 200.0), record(44000, 1, 400.0)])
+    assert [history.epochs[row] for row in history.rows(44000)] == [100.0, 200.0, 300.0, 400.0]
+    assert history.valid_at(44000, 250.0) == 2
+    assert history.valid_at(44000, 50.0) is None
+    assert history.between(44000, 150.0, 300.0) == [2, 1]
+    assert history.tle(1)[1].startswith("2 44000 3")
+
+
+def test_reopen_drops_torn_record(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = TleHistory(path)
+    history.write(history.extend([record(44000, 1, 100.0), record(44001, 1, 100.0)]))
+    history.close()
+    # Un proceso que muere a mitad de escritura deja medio registro al final
+    with open(path, "ab") as f:
+        f.write(RECORD.pack(*record(44002, 1, 100.0))[:RECORD.size // 2])
+
+    reopened = TleHistory(path)
+    assert len(reopened) == 2
+    assert reopened.satellites == 2
+    reopened.write(reopened.extend([record(44002, 1, 100.0)]))
+    reopened.close()
+    with open(path, "rb") as f:
+        assert len(f.read()) == len(MAGIC) + 3 * RECORD.size
+    assert TleHistory(path).valid_at(44002, 100.0) == 2
+
+
+def test_unpackable_record_is_not_indexed():
+    history = TleHistory()
+    payload = history.extend([record(44000, 1, 100.0), record(2 ** 32, 1, 100.0), record(44001, 1, 100.0)])
+    assert len(payload) == 2 * RECORD.size
+    assert len(history) == 2
+    assert history.valid_at(2 ** 32, 100.0) is None
+
+
+def test_late_insert_publishes_new_index_arrays():
+    history = TleHistory()
+    history.extend([record(44000, 1, 100.0), record(44000, 3, 300.0)])
+    # Un lector que ya tomó el índice (event loop) sigue viendo arrays consistentes
+    epochs, rows = history._index[44000]
+    history.extend([record(44000, 2, 200.0)])
+    assert (epochs.tolist(), rows.tolist()) == ([100.0, 300.0], [0, 1])
+    assert history.rows(44000) == [0, 2, 1]